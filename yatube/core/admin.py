@@ -0,0 +1,19 @@
+from django.contrib import admin
+from .models import Task
+
+
+class TaskAdmin(admin.ModelAdmin):
+    list_display = (
+        'pk',
+        'name',
+        'status',
+        'attempts',
+        'run_at',
+        'locked_by',
+    )
+    list_filter = ('status', 'name')
+    # Аргументы задачи выполняются воркером, правке не подлежат.
+    readonly_fields = ('created', 'payload', 'locked_at', 'last_error')
+
+
+admin.site.register(Task, TaskAdmin)
@@ -0,0 +1,162 @@
+"""Предохранитель для лент при перегрузке базы.
+
+Предохранитель размыкается, когда подряд BREAKER_FAILURES запросов
+к ленте завершились ошибкой базы или выполнялись дольше
+BREAKER_SLOW_SECONDS. Пока он разомкнут (BREAKER_RESET_SECONDS),
+view не вызывается: отдаётся последняя удачная анонимная копия
+страницы с плашкой об устаревании. Затем пропускается один пробный
+запрос: удачный замыкает предохранитель, неудачный снова размыкает.
+Исключения, не связанные с базой (например, Http404), считаются
+удачным обращением: база ответила.
+
+Копия обновляется не чаще раза в FEED_STALE_REFRESH_SECONDS, а не на
+каждый ответ (в том числе из cache_page), и хранится в кэше
+FEED_STALE_TIMEOUT секунд после обновления — дольше устаревшую
+страницу не показываем. Состояние
+предохранителя своё у каждого процесса.
+"""
+import threading
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError
+from django.http import HttpResponse
+from django.shortcuts import render
+
+from . import metrics
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+# Место в base.html, куда вставляется плашка устаревшей копии.
+STALE_MARKER = b'<!-- stale-banner -->'
+STALE_BANNER = (
+    '<div class="alert alert-warning">Сайт перегружен, показана '
+    'сохранённая версия страницы. Новые посты могут не отображаться.'
+    '</div>'
+).encode()
+
+
+class CircuitBreaker:
+    def __init__(self, name):
+        self.name = name
+        self.lock = threading.Lock()
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+
+    def allow(self) -> bool:
+        '''Можно ли сейчас обращаться к базе'''
+        with self.lock:
+            if self.state == CLOSED:
+                return True
+            now = time.monotonic()
+            if now - self.opened_at < settings.BREAKER_RESET_SECONDS:
+                return False
+            # Один пробный запрос; остальные ждут его результата.
+            # Если результат пробы так и не записан, через тот же
+            # интервал пропускается следующая.
+            self.state = HALF_OPEN
+            self.opened_at = now
+            return True
+
+    def success(self):
+        with self.lock:
+            self.failures = 0
+            if self.state != CLOSED:
+                self.state = CLOSED
+                metrics.BREAKER_OPEN.set(0, breaker=self.name)
+
+    def failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or (
+                self.failures >= settings.BREAKER_FAILURES
+            ):
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+                metrics.BREAKER_OPEN.set(1, breaker=self.name)
+
+
+_breakers = {}
+
+
+def get_breaker(name) -> CircuitBreaker:
+    return _breakers.setdefault(name, CircuitBreaker(name))
+
+
+def stale_key(name, request) -> str:
+    return f'stale:{name}:{request.get_full_path()}'
+
+
+def refresh_key(name, request) -> str:
+    return f'stale-refresh:{name}:{request.get_full_path()}'
+
+
+def stale_response(name, request):
+    '''Сохранённая копия страницы с плашкой или 503, если копии нет'''
+    content = cache.get(stale_key(name, request))
+    if content is None:
+        response = render(request, 'core/503.html', status=503)
+        response['Retry-After'] = str(settings.BREAKER_RESET_SECONDS)
+        return response
+    metrics.STALE_RESPONSES.inc(breaker=name)
+    response = HttpResponse(content.replace(STALE_MARKER, STALE_BANNER, 1))
+    response['Warning'] = '110 - "Response is Stale"'
+    return response
+
+
+def _cacheable(request, response) -> bool:
+    return (
+        request.method == 'GET'
+        and not request.user.is_authenticated
+        and response.status_code == 200
+        and not response.streaming
+    )
+
+
+def degrade(name):
+    '''Оборачивает ленту предохранителем name'''
+    breaker = get_breaker(name)
+
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapped(request, *args, **kwargs):
+            if not breaker.allow():
+                return stale_response(name, request)
+            started = time.monotonic()
+            failed = False
+            try:
+                response = view_func(request, *args, **kwargs)
+            except DatabaseError:
+                failed = True
+                return stale_response(name, request)
+            else:
+                failed = (
+                    time.monotonic() - started
+                    > settings.BREAKER_SLOW_SECONDS
+                )
+            finally:
+                # Исход записывается для любого запроса, иначе пробный
+                # запрос с исключением оставил бы предохранитель
+                # полуоткрытым.
+                if failed:
+                    breaker.failure()
+                else:
+                    breaker.success()
+            # add() удаётся, только если метки обновления нет.
+            if _cacheable(request, response) and cache.add(
+                refresh_key(name, request), True,
+                settings.FEED_STALE_REFRESH_SECONDS,
+            ):
+                cache.set(
+                    stale_key(name, request),
+                    response.content,
+                    settings.FEED_STALE_TIMEOUT,
+                )
+            return response
+        return wrapped
+    return decorator
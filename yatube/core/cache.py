@@ -0,0 +1,34 @@
+from django.core.cache.backends.locmem import LocMemCache
+
+from . import metrics, performance
+
+_MISSING = object()
+# Ключи cache_page: views.decorators.cache.cache_page.<key_prefix>....
+_VIEW_CACHE_PREFIX = 'views.decorators.cache.'
+
+
+def key_prefix(key) -> str:
+    '''Префикс ключа для группировки в метриках'''
+    if key.startswith(_VIEW_CACHE_PREFIX):
+        parts = key[len(_VIEW_CACHE_PREFIX):].split('.')
+        return parts[1] if len(parts) > 1 and parts[1] else parts[0]
+    return key.replace('.', ':').split(':', 1)[0]
+
+
+class InstrumentedCacheMixin:
+    '''Учитывает попадания и промахи кэша в статистике запроса
+       и в метриках'''
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, _MISSING, version)
+        hit = value is not _MISSING
+        performance.record_cache(hit)
+        metrics.CACHE_REQUESTS.inc(
+            prefix=key_prefix(key),
+            result='hit' if hit else 'miss',
+        )
+        return value if hit else default
+
+
+class InstrumentedLocMemCache(InstrumentedCacheMixin, LocMemCache):
+    pass
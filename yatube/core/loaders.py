@@ -0,0 +1,36 @@
+"""Загрузчики шаблонов, убирающие отступы из исходника.
+
+Минификация выполняется один раз при загрузке шаблона, а не на
+каждый ответ: при кэширующем загрузчике шаблон компилируется уже
+без лишних пробелов. Одиночные пустые строки сохраняются: через эти
+же загрузчики читаются текстовые письма (например,
+registration/password_reset_email.html), где они разделяют абзацы.
+"""
+import re
+
+from django.template.loaders import app_directories, filesystem
+
+_LINE_BREAK = re.compile(r'[ \t]*\n[ \t]*')
+_BLANK_LINES = re.compile(r'\n{3,}')
+_PREFORMATTED = re.compile(r'<(pre|textarea)\b', re.IGNORECASE)
+
+
+def minify(source) -> str:
+    '''Убирает отступы, хвостовые пробелы и повторные пустые строки'''
+    if _PREFORMATTED.search(source):
+        return source
+    source = _LINE_BREAK.sub('\n', source)
+    return _BLANK_LINES.sub('\n\n', source).strip()
+
+
+class MinifyingLoaderMixin:
+    def get_contents(self, origin):
+        return minify(super().get_contents(origin))
+
+
+class FilesystemLoader(MinifyingLoaderMixin, filesystem.Loader):
+    pass
+
+
+class AppDirectoriesLoader(MinifyingLoaderMixin, app_directories.Loader):
+    pass
@@ -0,0 +1,82 @@
+"""Нагрузочное сравнение WSGI- и ASGI-запуска приложения.
+
+Оба варианта выполняются в текущем процессе с одинаковым числом
+потоков: WSGI — пулом потоков, как у gunicorn --threads; ASGI — через
+core.asgi с пулом того же размера. Сеть не участвует, поэтому
+сравнивается пропускная способность самих обработчиков.
+"""
+import asyncio
+import io
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from wsgiref.util import setup_testing_defaults
+
+from .asgi import WsgiToAsgi
+
+
+def _split(url):
+    parts = urlsplit(url)
+    return parts.path, parts.query
+
+
+def wsgi_load(application, url, requests, concurrency):
+    '''Запросов в секунду и статусы ответов WSGI-приложения'''
+    path, query = _split(url)
+    statuses = Counter()
+
+    def call(_):
+        environ = {'PATH_INFO': path, 'QUERY_STRING': query}
+        setup_testing_defaults(environ)
+        environ['wsgi.input'] = io.BytesIO()
+
+        def start_response(status, headers, exc_info=None):
+            statuses[int(status.split(' ', 1)[0])] += 1
+
+        result = application(environ, start_response)
+        try:
+            b''.join(result)
+        finally:
+            result.close()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        list(pool.map(call, range(requests)))
+    return requests / (time.perf_counter() - start), statuses
+
+
+def asgi_load(application, url, requests, concurrency):
+    '''То же для WSGI-приложения, запущенного через core.asgi'''
+    path, query = _split(url)
+    handler = WsgiToAsgi(application, concurrency)
+    statuses = Counter()
+    scope = {
+        'type': 'http',
+        'method': 'GET',
+        'path': path,
+        'query_string': query.encode(),
+        'headers': [(b'host', b'127.0.0.1')],
+        'server': ('127.0.0.1', 80),
+    }
+
+    async def call():
+        async def receive():
+            return {'type': 'http.request', 'body': b''}
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                statuses[message['status']] += 1
+
+        await handler(scope, receive, send)
+
+    async def run():
+        await asyncio.gather(*(call() for _ in range(requests)))
+
+    start = time.perf_counter()
+    try:
+        asyncio.run(run())
+    finally:
+        handler.executor.shutdown()
+    return requests / (time.perf_counter() - start), statuses
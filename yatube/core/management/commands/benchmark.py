@@ -0,0 +1,111 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.loadtest import asgi_load, wsgi_load
+from core.startup import cold_start
+from posts.models import Group, Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет основные страницы на текущей базе: время ответа, '
+        'число SQL-запросов и размер ответа до и после сжатия'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repeat', type=int, default=20,
+            help='Сколько раз запрашивать каждую страницу',
+        )
+        parser.add_argument(
+            '--cold-start', type=int, default=0, metavar='N',
+            help='Замерить N запусков приложения до первого ответа',
+        )
+        parser.add_argument(
+            '--load', type=int, default=0, metavar='N',
+            help='Сравнить WSGI и ASGI на N запросах к главной',
+        )
+        parser.add_argument(
+            '--concurrency', type=int, default=8,
+            help='Потоков для --load в обоих вариантах',
+        )
+
+    def pages(self):
+        pages = {'index': reverse('posts:index')}
+        group = Group.objects.first()
+        if group:
+            pages['group_list'] = reverse(
+                'posts:group_list', args=[group.slug]
+            )
+        post = Post.objects.select_related('author').first()
+        if post:
+            pages['profile'] = reverse(
+                'posts:profile', args=[post.author.username]
+            )
+            pages['post_detail'] = reverse(
+                'posts:post_detail', args=[post.pk]
+            )
+        return pages
+
+    def measure(self, client, url, repeat):
+        timings = []
+        for _ in range(repeat):
+            with CaptureQueriesContext(connection) as queries:
+                start = time.perf_counter()
+                response = client.get(url)
+                timings.append(time.perf_counter() - start)
+        return response, timings, len(queries)
+
+    def cold_start(self, runs):
+        results = [cold_start() for _ in range(runs)]
+        load, first_response = (
+            statistics.median(result[key] for result in results) * 1000
+            for key in ('load', 'first_response')
+        )
+        self.stdout.write(
+            f'Холодный старт, медиана из {runs} ({results[-1]["status"]}): '
+            f'загрузка {load:.0f} мс, первый ответ {first_response:.0f} мс'
+        )
+
+    def load(self, requests, concurrency):
+        # Импорт запускает приложение так же, как сервер.
+        from yatube.wsgi import application
+        url = reverse('posts:index')
+        for name, load in (('WSGI', wsgi_load), ('ASGI', asgi_load)):
+            rps, statuses = load(application, url, requests, concurrency)
+            self.stdout.write(
+                f'{name}, потоков {concurrency}: {rps:.0f} запросов/с, '
+                f'статусы {dict(statuses)}'
+            )
+
+    def handle(self, *args, **options):
+        if options['cold_start']:
+            self.cold_start(options['cold_start'])
+        if options['load']:
+            self.load(options['load'], options['concurrency'])
+        repeat = options['repeat']
+        plain_client = Client()
+        client = Client(HTTP_ACCEPT_ENCODING='gzip, deflate, br')
+        self.stdout.write(
+            f'{"страница":<12} {"медиана, мс":>12} {"p95, мс":>9} '
+            f'{"SQL":>4} {"байт":>8} {"по сети":>8}'
+        )
+        for name, url in self.pages().items():
+            raw_size = len(plain_client.get(url).content)
+            response, timings, queries = self.measure(client, url, repeat)
+            timings.sort()
+            p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+            self.stdout.write(
+                f'{name:<12} '
+                f'{statistics.median(timings) * 1000:>12.1f} '
+                f'{p95 * 1000:>9.1f} '
+                f'{queries:>4} '
+                f'{raw_size:>8} '
+                f'{len(response.content):>8}'
+            )
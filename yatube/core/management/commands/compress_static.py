@@ -0,0 +1,17 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.static import compress_file
+
+
+class Command(BaseCommand):
+    help = 'Создаёт сжатые копии (.gz, .br) файлов в STATIC_ROOT'
+
+    def handle(self, *args, **options):
+        created = 0
+        for root, _, filenames in os.walk(settings.STATIC_ROOT):
+            for filename in filenames:
+                created += len(compress_file(os.path.join(root, filename)))
+        self.stdout.write(f'Создано сжатых файлов: {created}')
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from core.startup import import_times
+
+
+class Command(BaseCommand):
+    help = 'Показывает, какие модули дольше всего импортируются при запуске'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--module', default='yatube.wsgi',
+            help='Импортируемый модуль',
+        )
+        parser.add_argument(
+            '--top', type=int, default=30,
+            help='Сколько самых долгих модулей показать',
+        )
+        parser.add_argument(
+            '--own', action='store_true',
+            help='Сортировать по собственному времени, без вложенных',
+        )
+
+    def handle(self, *args, **options):
+        times = import_times(options['module'])
+        column = 1 if options['own'] else 2
+        times.sort(key=lambda row: row[column], reverse=True)
+        self.stdout.write(f'{"своё, мс":>9} {"всего, мс":>10}  модуль')
+        for name, own, cumulative in times[:options['top']]:
+            self.stdout.write(
+                f'{own / 1000:>9.1f} {cumulative / 1000:>10.1f}  {name}'
+            )
+        total = sum(own for _, own, _ in times)
+        self.stdout.write(
+            f'Модулей: {len(times)}, всего {total / 1000:.1f} мс'
+        )
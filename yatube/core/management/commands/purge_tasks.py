@@ -0,0 +1,23 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.tasks import purge_done
+
+
+class Command(BaseCommand):
+    help = 'Стирает из очереди давно выполненные задачи'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than', type=int, default=settings.TASKS_KEEP_DONE_DAYS,
+            help='Сколько дней хранить выполненные задачи',
+        )
+
+    def handle(self, *args, **options):
+        purged = purge_done(
+            timezone.now() - timedelta(days=options['older_than'])
+        )
+        self.stdout.write(f'Стёрто задач: {purged}')
@@ -0,0 +1,45 @@
+import multiprocessing
+import os
+import socket
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.utils.module_loading import autodiscover_modules
+
+from core.tasks import work
+
+
+def _work(burst):
+    work(f'{socket.gethostname()}:{os.getpid()}', burst=burst)
+
+
+class Command(BaseCommand):
+    help = 'Запускает пул процессов, выполняющих фоновые задачи'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes', type=int, default=multiprocessing.cpu_count(),
+            help='Число процессов-воркеров',
+        )
+        parser.add_argument(
+            '--burst', action='store_true',
+            help='Выполнить готовые задачи и завершиться',
+        )
+
+    def handle(self, *args, **options):
+        # Задачи регистрируются при импорте модулей tasks приложений.
+        autodiscover_modules('tasks')
+        # Соединения с базой нельзя делить между процессами.
+        connections.close_all()
+        workers = [
+            multiprocessing.Process(target=_work, args=(options['burst'],))
+            for _ in range(options['processes'])
+        ]
+        for worker in workers:
+            worker.start()
+        try:
+            for worker in workers:
+                worker.join()
+        except KeyboardInterrupt:
+            for worker in workers:
+                worker.terminate()
@@ -0,0 +1,49 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.warmup import warm_up
+
+
+class Command(BaseCommand):
+    help = (
+        'Прогревает кэш страниц и миниатюры: первые страницы главной, '
+        'крупнейшие группы и популярные профили'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--pages', type=int, default=settings.WARMUP_PAGES,
+            help='Сколько первых страниц главной запросить',
+        )
+        parser.add_argument(
+            '--groups', type=int, default=settings.WARMUP_GROUPS,
+            help='Сколько групп с наибольшим числом постов',
+        )
+        parser.add_argument(
+            '--profiles', type=int, default=settings.WARMUP_PROFILES,
+            help='Сколько профилей с наибольшим числом подписчиков',
+        )
+        parser.add_argument(
+            '--thumbnails', type=int, default=settings.WARMUP_THUMBNAILS,
+            help='Для скольких свежих постов создать миниатюры',
+        )
+        parser.add_argument(
+            '--workers', type=int, default=settings.WARMUP_WORKERS,
+            help='Число параллельных потоков',
+        )
+
+    def handle(self, *args, **options):
+        report = warm_up(
+            options['pages'],
+            options['groups'],
+            options['profiles'],
+            options['thumbnails'],
+            options['workers'],
+        )
+        for url, status, duration in report['pages']:
+            self.stdout.write(f'{status} {duration * 1000:>8.1f} мс  {url}')
+        self.stdout.write(
+            f'Страниц: {len(report["pages"])}, '
+            f'миниатюр: {report["thumbnails"]}, '
+            f'всего {report["duration"]:.2f} с'
+        )
@@ -0,0 +1,128 @@
+"""Раздача загруженных файлов (MEDIA_ROOT): картинок постов
+и миниатюр sorl.
+
+С фронт-сервером Django только проверяет путь и условные заголовки,
+а сам файл отдаёт сервер: nginx по X-Accel-Redirect на внутренний
+location MEDIA_ACCEL_PREFIX или Apache/lighttpd по X-Sendfile.
+Без него файл отдаёт FileResponse, который WSGI-сервер передаёт
+через wsgi.file_wrapper (sendfile). Поддерживаются запросы одного
+диапазона байтов (Range, If-Range), ETag и Last-Modified; имена
+файлов не переиспользуются, поэтому ответы кэшируются надолго.
+"""
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import (
+    FileResponse, Http404, HttpResponse, StreamingHttpResponse,
+)
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, parse_http_date_safe
+
+_RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+BLOCK_SIZE = 64 * 1024
+
+
+def parse_range(header, size):
+    '''Диапазон (start, end) включительно из заголовка Range.
+
+    None — заголовка нет или он не поддерживается (несколько
+    диапазонов): отдаётся весь файл. ValueError — диапазон вне файла.
+    '''
+    match = _RANGE.match(header.strip()) if header else None
+    if not match:
+        return None
+    start, end = match.groups()
+    if not start and not end:
+        return None
+    if not start:
+        # Последние end байтов.
+        start, end = max(size - int(end), 0), size - 1
+    else:
+        start = int(start)
+        end = min(int(end), size - 1) if end else size - 1
+    if start > end or start >= size:
+        raise ValueError('Диапазон вне файла')
+    return start, end
+
+
+def _if_range_passes(request, etag, mtime):
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if not if_range:
+        return True
+    if if_range.startswith(('"', 'W/')):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == int(mtime)
+
+
+def _read_range(path, start, end):
+    with open(path, 'rb') as file:
+        file.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = file.read(min(BLOCK_SIZE, remaining))
+            if not chunk:
+                return
+            remaining -= len(chunk)
+            yield chunk
+
+
+def _accel_response(path, fullpath):
+    response = HttpResponse()
+    if settings.MEDIA_ACCEL == 'x-accel-redirect':
+        response['X-Accel-Redirect'] = (
+            settings.MEDIA_ACCEL_PREFIX + quote(path)
+        )
+    else:
+        response['X-Sendfile'] = fullpath
+    return response
+
+
+def _file_response(request, fullpath, size, etag, mtime):
+    try:
+        byte_range = parse_range(request.META.get('HTTP_RANGE'), size)
+    except ValueError:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+    if byte_range and _if_range_passes(request, etag, mtime):
+        start, end = byte_range
+        response = StreamingHttpResponse(
+            _read_range(fullpath, start, end), status=206
+        )
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = str(end - start + 1)
+        return response
+    return FileResponse(open(fullpath, 'rb'))
+
+
+def serve(request, path):
+    '''Отдаёт файл из MEDIA_ROOT'''
+    # Путь за пределами MEDIA_ROOT safe_join отклоняет с ответом 400.
+    fullpath = safe_join(settings.MEDIA_ROOT, path)
+    if not os.path.isfile(fullpath):
+        raise Http404
+    stat = os.stat(fullpath)
+    etag = f'"{int(stat.st_mtime):x}-{stat.st_size:x}"'
+    response = get_conditional_response(
+        request, etag=etag, last_modified=int(stat.st_mtime)
+    )
+    if response is None:
+        if settings.MEDIA_ACCEL:
+            response = _accel_response(path, fullpath)
+        else:
+            response = _file_response(
+                request, fullpath, stat.st_size, etag, stat.st_mtime
+            )
+        content_type, _ = mimetypes.guess_type(fullpath)
+        response['Content-Type'] = content_type or 'application/octet-stream'
+        response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    patch_cache_control(
+        response, public=True, max_age=settings.MEDIA_CACHE_MAX_AGE
+    )
+    return response
@@ -0,0 +1,255 @@
+"""Метрики процесса в текстовом формате Prometheus.
+
+Каждый процесс копит значения в памяти и периодически сбрасывает
+снимок в файл ``METRICS_DIR/<pid>.json``. Эндпоинт ``/metrics/``
+складывает снимки всех процессов, поэтому видит картину по всем
+воркерам сразу. Счётчики и гистограммы завершившихся процессов
+продолжают учитываться, иначе суммы уменьшались бы; значения gauge —
+только живых процессов (их pid проверяется на этом же хосте).
+"""
+import atexit
+import json
+import os
+import threading
+import time
+
+from django.conf import settings
+
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+BYTES_BUCKETS = (
+    10 * 1024, 100 * 1024, 512 * 1024, 1024 ** 2, 5 * 1024 ** 2,
+    10 * 1024 ** 2,
+)
+
+
+def _labels_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    pairs = ','.join(
+        '{}="{}"'.format(
+            name,
+            str(value).replace('\\', r'\\').replace('"', r'\"')
+            .replace('\n', r'\n'),
+        )
+        for name, value in labels
+    )
+    return '{' + pairs + '}'
+
+
+class Counter:
+    kind = 'counter'
+    # Учитывать значения только работающих процессов.
+    live_only = False
+
+    def __init__(self, name, documentation, registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.samples = {}
+        (registry or REGISTRY).register(self)
+
+    def inc(self, amount=1, **labels):
+        key = _labels_key(labels)
+        with self.registry.lock:
+            self.samples[key] = self.samples.get(key, 0) + amount
+
+    @staticmethod
+    def merge(left, right):
+        return left + right
+
+    def render(self, samples):
+        for labels, value in samples:
+            yield f'{self.name}{_format_labels(labels)} {value}'
+
+
+class Histogram(Counter):
+    '''Гистограмма с накопительными корзинами, как в Prometheus'''
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, buckets=DEFAULT_BUCKETS,
+                 registry=None):
+        self.buckets = tuple(buckets)
+        super().__init__(name, documentation, registry)
+
+    def observe(self, value, **labels):
+        key = _labels_key(labels)
+        with self.registry.lock:
+            sample = self.samples.get(key)
+            if sample is None:
+                # Корзины, затем сумма и количество наблюдений.
+                sample = self.samples[key] = [0] * (len(self.buckets) + 2)
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    sample[index] += 1
+            sample[-2] += value
+            sample[-1] += 1
+
+    @staticmethod
+    def merge(left, right):
+        return [a + b for a, b in zip(left, right)]
+
+    def render(self, samples):
+        for labels, sample in samples:
+            bounds = [str(bound) for bound in self.buckets] + ['+Inf']
+            counts = sample[:-2] + [sample[-1]]
+            for bound, count in zip(bounds, counts):
+                bucket_labels = labels + (('le', bound),)
+                yield (
+                    f'{self.name}_bucket{_format_labels(bucket_labels)} '
+                    f'{count}'
+                )
+            yield f'{self.name}_sum{_format_labels(labels)} {sample[-2]}'
+            yield f'{self.name}_count{_format_labels(labels)} {sample[-1]}'
+
+
+class Gauge(Counter):
+    '''Текущее значение; значения работающих процессов
+       складываются'''
+    kind = 'gauge'
+    live_only = True
+
+    def set(self, value, **labels):
+        key = _labels_key(labels)
+        with self.registry.lock:
+            self.samples[key] = value
+
+
+def _alive(pid) -> bool:
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Процесс есть, но принадлежит другому пользователю.
+        return True
+    return True
+
+
+class Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.metrics = {}
+        self.flushed = 0.0
+
+    def register(self, metric):
+        metric.registry = self
+        self.metrics[metric.name] = metric
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {
+                name: [
+                    [dict(labels), value]
+                    for labels, value in metric.samples.items()
+                ]
+                for name, metric in self.metrics.items()
+            }
+
+    def _path(self, directory):
+        return os.path.join(directory, f'{os.getpid()}.json')
+
+    def flush(self):
+        '''Сбрасывает снимок процесса в общий каталог'''
+        directory = settings.METRICS_DIR
+        if not directory:
+            return
+        os.makedirs(directory, exist_ok=True)
+        path = self._path(directory)
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w') as file:
+            json.dump(self.snapshot(), file)
+        os.replace(tmp_path, path)
+        self.flushed = time.monotonic()
+
+    def maybe_flush(self):
+        interval = settings.METRICS_FLUSH_INTERVAL
+        if time.monotonic() - self.flushed >= interval:
+            self.flush()
+
+    def _snapshots(self):
+        '''Пары (снимок, процесс жив)'''
+        directory = settings.METRICS_DIR
+        if not directory:
+            return [(self.snapshot(), True)]
+        self.flush()
+        snapshots = []
+        for filename in os.listdir(directory):
+            pid, extension = os.path.splitext(filename)
+            if extension != '.json':
+                continue
+            alive = pid.isdigit() and _alive(int(pid))
+            try:
+                with open(os.path.join(directory, filename)) as file:
+                    snapshots.append((json.load(file), alive))
+            except (OSError, ValueError):
+                continue
+        return snapshots
+
+    def collect(self) -> dict:
+        '''Складывает снимки всех процессов'''
+        merged = {name: {} for name in self.metrics}
+        for snapshot, alive in self._snapshots():
+            for name, samples in snapshot.items():
+                metric = self.metrics.get(name)
+                if metric is None or (metric.live_only and not alive):
+                    continue
+                for labels, value in samples:
+                    key = _labels_key(labels)
+                    if key in merged[name]:
+                        value = metric.merge(merged[name][key], value)
+                    merged[name][key] = value
+        return merged
+
+    def render(self) -> str:
+        lines = []
+        for name, samples in self.collect().items():
+            metric = self.metrics[name]
+            lines.append(f'# HELP {name} {metric.documentation}')
+            lines.append(f'# TYPE {name} {metric.kind}')
+            lines.extend(metric.render(sorted(samples.items())))
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+atexit.register(REGISTRY.flush)
+
+VIEW_DURATION = Histogram(
+    'yatube_view_duration_seconds',
+    'Время обработки запроса по имени view.',
+)
+DB_QUERIES = Counter(
+    'yatube_db_queries_total',
+    'Количество SQL-запросов по имени view.',
+)
+CACHE_REQUESTS = Counter(
+    'yatube_cache_requests_total',
+    'Обращения к кэшу по префиксу ключа и результату.',
+)
+THUMBNAIL_DURATION = Histogram(
+    'yatube_thumbnail_seconds',
+    'Время генерации миниатюры.',
+)
+RATELIMITED = Counter(
+    'yatube_ratelimited_total',
+    'Запросы, отклонённые ограничением частоты, по имени лимита.',
+)
+BREAKER_OPEN = Gauge(
+    'yatube_breaker_open',
+    'Число процессов, в которых разомкнут предохранитель ленты.',
+)
+STALE_RESPONSES = Counter(
+    'yatube_stale_responses_total',
+    'Ответы из сохранённой копии ленты при перегрузке базы.',
+)
+IMAGE_UPLOAD_BYTES = Histogram(
+    'yatube_image_upload_bytes',
+    'Размер загруженных изображений.',
+    buckets=BYTES_BUCKETS,
+)
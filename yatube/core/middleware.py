@@ -0,0 +1,165 @@
+import json
+import logging
+import random
+import re
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.http import FileResponse
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+
+from . import metrics, performance
+from .queries import QueryBudgetExceeded, QueryInspector, RepeatedQueries
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger('yatube.performance')
+queries_logger = logging.getLogger('yatube.queries')
+
+_ACCEPTS_BROTLI = re.compile(r'\bbr\b')
+# Типы содержимого, которые имеет смысл сжимать.
+COMPRESSIBLE_TYPES = re.compile(
+    r'^(text/|application/(json|javascript|xml|x-ndjson)|image/svg\+xml)'
+)
+
+
+def compressible(response) -> bool:
+    '''Файлы (их отдаёт sendfile), части файлов и двоичные данные
+       не сжимаются'''
+    return not (
+        isinstance(response, FileResponse)
+        or response.status_code == 206
+        or response.has_header('Content-Range')
+        or not COMPRESSIBLE_TYPES.match(response.get('Content-Type', ''))
+    )
+
+
+class PerformanceMiddleware:
+    '''Замеряет время ответа, SQL, шаблоны, кэш и миниатюры.
+
+    В метрики попадает доля METRICS_SAMPLE_RATE запросов, строка в логе
+    и заголовок Server-Timing пишутся для доли PERFORMANCE_SAMPLE_RATE.'''
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        sampled = random.random() < settings.PERFORMANCE_SAMPLE_RATE
+        observed = settings.METRICS_ENABLED and (
+            random.random() < settings.METRICS_SAMPLE_RATE
+        )
+        if not (sampled or observed):
+            return self.get_response(request)
+        with performance.collect() as stats:
+            response = self.get_response(request)
+        match = request.resolver_match
+        view_name = match.view_name if match else None
+        if observed:
+            self.observe(view_name or 'unmatched', stats)
+        if sampled:
+            response['Server-Timing'] = stats.server_timing()
+            record = {
+                'method': request.method,
+                'path': request.path,
+                'view': view_name,
+                'status': response.status_code,
+            }
+            record.update(stats.as_dict())
+            logger.info(json.dumps(record, ensure_ascii=False))
+        return response
+
+    @staticmethod
+    def observe(view_name, stats):
+        metrics.VIEW_DURATION.observe(stats.total, view=view_name)
+        metrics.DB_QUERIES.inc(stats.counts['sql'], view=view_name)
+        metrics.REGISTRY.maybe_flush()
+
+
+class QueryInspectionMiddleware:
+    '''Ищет N+1 и превышение бюджета запросов view.
+
+    В разработке и CI включается настройкой QUERY_INSPECTION_ENABLED;
+    с QUERY_INSPECTION_RAISE нарушения превращаются в исключения,
+    и тесты падают.'''
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.QUERY_INSPECTION_ENABLED:
+            return self.get_response(request)
+        inspector = QueryInspector(queries_logger)
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(inspector))
+            response = self.get_response(request)
+        self.check(request, inspector)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.query_budget = getattr(view_func, 'query_budget', None)
+
+    @staticmethod
+    def check(request, inspector):
+        errors = []
+        threshold = settings.N_PLUS_ONE_THRESHOLD
+        for sql, count, locations in inspector.repeated(threshold):
+            message = (
+                f'{request.path}: запрос выполнен {count} раз '
+                f'({", ".join(locations)}): {sql}'
+            )
+            queries_logger.warning(message)
+            errors.append(RepeatedQueries(message))
+        budget = getattr(request, 'query_budget', None)
+        if budget is not None and inspector.count > budget:
+            message = (
+                f'{request.path}: {inspector.count} SQL-запросов '
+                f'при бюджете {budget}'
+            )
+            queries_logger.warning(message)
+            errors.append(QueryBudgetExceeded(message))
+        if errors and settings.QUERY_INSPECTION_RAISE:
+            raise errors[-1]
+
+
+class CompressionMiddleware(GZipMiddleware):
+    '''Сжимает ответы от COMPRESSION_MIN_SIZE байт.
+
+    Если установлен brotli и клиент его принимает, используется он,
+    иначе gzip. Файлы, диапазоны и двоичные ответы не сжимаются
+    (см. compressible).'''
+
+    def process_response(self, request, response):
+        if not compressible(response):
+            return response
+        if (
+            not response.streaming
+            and len(response.content) < settings.COMPRESSION_MIN_SIZE
+        ):
+            return response
+        accept_encoding = request.META.get('HTTP_ACCEPT_ENCODING', '')
+        if (
+            brotli is None
+            or response.streaming
+            or response.has_header('Content-Encoding')
+            or not _ACCEPTS_BROTLI.search(accept_encoding)
+        ):
+            return super().process_response(request, response)
+        patch_vary_headers(response, ('Accept-Encoding',))
+        compressed_content = brotli.compress(
+            response.content, quality=settings.BROTLI_QUALITY
+        )
+        if len(compressed_content) >= len(response.content):
+            return response
+        response.content = compressed_content
+        response['Content-Length'] = str(len(response.content))
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = 'br'
+        return response
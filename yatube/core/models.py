@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 
 
 class CreatedModel(models.Model):
@@ -10,3 +11,102 @@ class CreatedModel(models.Model):
 
     class Meta:
         abstract = True
+
+
+class LiveManager(models.Manager):
+    """Менеджер без записей, помеченных удалёнными."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(is_deleted=False)
+
+
+class SoftDeleteModel(models.Model):
+    """Абстрактная модель. delete() только помечает запись удалённой,
+    строки физически удаляются позже фоновой очисткой."""
+    is_deleted = models.BooleanField(
+        'Удалено',
+        default=False,
+    )
+    deleted_at = models.DateTimeField(
+        'Дата удаления',
+        null=True,
+        blank=True,
+    )
+
+    objects = LiveManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        abstract = True
+
+    def delete(self, using=None, keep_parents=False):
+        self.is_deleted = True
+        self.deleted_at = timezone.now()
+        self.save(using=using, update_fields=('is_deleted', 'deleted_at'))
+        return 1, {self._meta.label: 1}
+
+    def hard_delete(self, using=None, keep_parents=False):
+        return super().delete(using=using, keep_parents=keep_parents)
+
+
+class Task(CreatedModel):
+    """Отложенная задача фоновой очереди (см. core.tasks)."""
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUSES = (
+        (PENDING, 'Ожидает'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Выполнена'),
+        (FAILED, 'Ошибка'),
+    )
+
+    name = models.CharField(
+        'Имя задачи',
+        max_length=200,
+    )
+    payload = models.TextField(
+        'Аргументы в JSON',
+        default='{}',
+    )
+    status = models.CharField(
+        'Статус',
+        max_length=10,
+        choices=STATUSES,
+        default=PENDING,
+    )
+    attempts = models.PositiveIntegerField(
+        'Попыток',
+        default=0,
+    )
+    max_attempts = models.PositiveIntegerField(
+        'Максимум попыток',
+        default=3,
+    )
+    run_at = models.DateTimeField(
+        'Запустить не раньше',
+        default=timezone.now,
+    )
+    locked_by = models.CharField(
+        'Воркер',
+        max_length=100,
+        blank=True,
+    )
+    locked_at = models.DateTimeField(
+        'Взята в работу',
+        null=True,
+        blank=True,
+    )
+    last_error = models.TextField(
+        'Последняя ошибка',
+        blank=True,
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'run_at']),
+        ]
+
+    def __str__(self):
+        return f'{self.name} ({self.status})'
@@ -0,0 +1,118 @@
+"""Сбор показателей производительности текущего запроса."""
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+
+from django.db import connections
+
+_local = threading.local()
+
+
+class RequestStats:
+    '''Время и счётчики одного запроса.
+
+    Экземпляр служит и обёрткой для ``connection.execute_wrapper``:
+    каждый SQL-запрос проходит через ``__call__``.
+    '''
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.timings = {'sql': 0.0, 'template': 0.0, 'thumbnail': 0.0}
+        self.counts = {
+            'sql': 0,
+            'thumbnail': 0,
+            'cache_hit': 0,
+            'cache_miss': 0,
+        }
+        self._depth = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.timings['sql'] += time.perf_counter() - start
+            self.counts['sql'] += 1
+
+    @property
+    def total(self) -> float:
+        return time.perf_counter() - self.started
+
+    def as_dict(self) -> dict:
+        data = {
+            f'{name}_ms': round(value * 1000, 2)
+            for name, value in self.timings.items()
+        }
+        data['total_ms'] = round(self.total * 1000, 2)
+        data.update(self.counts)
+        return data
+
+    def server_timing(self) -> str:
+        '''Значение заголовка Server-Timing'''
+        timings = self.timings
+        counts = self.counts
+        return ', '.join((
+            f'sql;dur={timings["sql"] * 1000:.1f};'
+            f'desc="{counts["sql"]} queries"',
+            f'tpl;dur={timings["template"] * 1000:.1f}',
+            f'thumb;dur={timings["thumbnail"] * 1000:.1f};'
+            f'desc="{counts["thumbnail"]} generated"',
+            f'cache;desc="hit={counts["cache_hit"]} '
+            f'miss={counts["cache_miss"]}"',
+            f'total;dur={self.total * 1000:.1f}',
+        ))
+
+
+def current():
+    '''Статистика текущего запроса или None, если он не замеряется'''
+    return getattr(_local, 'stats', None)
+
+
+@contextmanager
+def collect():
+    '''Включает сбор статистики для кода внутри блока'''
+    stats = RequestStats()
+    _local.stats = stats
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(stats))
+            yield stats
+    finally:
+        _local.stats = None
+
+
+@contextmanager
+def timer(name):
+    '''Добавляет время выполнения блока к показателю name.
+
+    Вложенные блоки с тем же именем (например, include внутри
+    шаблона) не учитываются повторно.
+    '''
+    stats = current()
+    if stats is None:
+        yield
+        return
+    depth = stats._depth.get(name, 0)
+    stats._depth[name] = depth + 1
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats._depth[name] = depth
+        if not depth:
+            stats.timings[name] += time.perf_counter() - start
+
+
+def record_cache(hit):
+    '''Учитывает попадание или промах кэша'''
+    stats = current()
+    if stats is not None:
+        stats.counts['cache_hit' if hit else 'cache_miss'] += 1
+
+
+def record_thumbnail():
+    '''Учитывает сгенерированную миниатюру'''
+    stats = current()
+    if stats is not None:
+        stats.counts['thumbnail'] += 1
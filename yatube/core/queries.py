@@ -0,0 +1,111 @@
+"""Инспекция SQL-запросов: медленные запросы, N+1 и бюджеты view.
+
+Запросы одного HTTP-запроса группируются по «форме» SQL
+(без конкретных значений). Форма, повторившаяся больше порога,
+считается N+1 и сообщается вместе с местом в шаблоне или в коде,
+откуда пришли запросы.
+"""
+import os
+import re
+import sys
+import time
+
+from django.conf import settings
+from django.template.base import Node
+
+_IN_LIST = re.compile(r'IN \((?:%s, )*%s\)')
+_LITERAL = re.compile(r"'[^']*'|\b\d+\b")
+
+
+class QueryInspectionError(AssertionError):
+    '''View нарушила ограничения на SQL-запросы'''
+
+
+class QueryBudgetExceeded(QueryInspectionError):
+    pass
+
+
+class RepeatedQueries(QueryInspectionError):
+    pass
+
+
+def query_budget(max_queries):
+    '''Объявляет максимальное число SQL-запросов для view.
+
+    Бюджет считается на весь HTTP-запрос: для авторизованного
+    пользователя в него входят чтение сессии и пользователя, а для
+    ленты с картинкой — поиск миниатюры в thumbnail_kvstore при
+    холодном кэше.
+    '''
+    def decorator(view_func):
+        view_func.query_budget = max_queries
+        return view_func
+    return decorator
+
+
+def normalize(sql) -> str:
+    '''Форма запроса: без литералов и с одинаковыми списками IN'''
+    return _LITERAL.sub('?', _IN_LIST.sub('IN (...)', sql))
+
+
+def caller_location():
+    '''Место, откуда выполняется запрос.
+
+    Для запросов из шаблона — имя шаблона и строка тега, иначе —
+    первая строка кода проекта в стеке вызовов.
+    '''
+    frame = sys._getframe(1)
+    code_location = None
+    while frame is not None:
+        if frame.f_code.co_name == 'render_annotated':
+            node = frame.f_locals.get('self')
+            origin = getattr(node, 'origin', None)
+            token = getattr(node, 'token', None)
+            if isinstance(node, Node) and origin and token:
+                return f'{origin.template_name}:{token.lineno}'
+        filename = frame.f_code.co_filename
+        if (
+            code_location is None
+            and filename.startswith(settings.BASE_DIR)
+            and f'{os.sep}core{os.sep}queries.py' not in filename
+        ):
+            code_location = (
+                f'{os.path.relpath(filename, settings.BASE_DIR)}:'
+                f'{frame.f_lineno}'
+            )
+        frame = frame.f_back
+    return code_location or '?'
+
+
+class QueryInspector:
+    '''Обёртка для connection.execute_wrapper, собирающая запросы'''
+
+    def __init__(self, logger):
+        self.logger = logger
+        self.count = 0
+        self.shapes = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            location = caller_location()
+            self.count += 1
+            shape = self.shapes.setdefault(normalize(sql), [0, set()])
+            shape[0] += 1
+            shape[1].add(location)
+            if duration * 1000 >= settings.SLOW_QUERY_MS:
+                self.logger.warning(
+                    'Медленный запрос %.1f мс (%s): %s',
+                    duration * 1000, location, sql,
+                )
+
+    def repeated(self, threshold):
+        '''Формы запросов, выполненные threshold раз и больше'''
+        return [
+            (sql, count, sorted(locations))
+            for sql, (count, locations) in self.shapes.items()
+            if count >= threshold
+        ]
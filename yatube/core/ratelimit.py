@@ -0,0 +1,78 @@
+"""Ограничение частоты запросов к view, которые пишут в базу.
+
+Лимиты задаются в settings.RATELIMITS: имя лимита -> (запросов, секунд).
+Запросы считаются в кэше по окнам фиксированной длины: ключ окна
+включает пользователя (или IP для анонимов) и номер окна, счётчик
+увеличивается атомарным incr. Обычно это одно обращение к кэшу
+на запрос; второе нужно, только когда окно начинается.
+"""
+import math
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.shortcuts import render
+
+from . import metrics
+
+
+def client_ident(request) -> str:
+    '''Чей это запрос: пользователь, а для анонима — IP'''
+    if request.user.is_authenticated:
+        return f'user:{request.user.pk}'
+    return f'ip:{request.META.get("REMOTE_ADDR", "")}'
+
+
+def _incr(key, timeout) -> int:
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # Окно только началось; если ключ успел добавить другой
+        # запрос, увеличиваем его.
+        if cache.add(key, 1, timeout):
+            return 1
+        return cache.incr(key)
+
+
+def hit(name, request):
+    '''Учитывает запрос в лимите name.
+
+    Возвращает, через сколько секунд повторить запрос, если лимит
+    превышен, иначе None.
+    '''
+    limit = settings.RATELIMITS.get(name)
+    if not limit:
+        return None
+    rate, period = limit
+    now = time.time()
+    window = int(now // period)
+    key = f'ratelimit:{name}:{client_ident(request)}:{window}'
+    # Запас в секунду, чтобы счётчик не истёк до конца окна.
+    if _incr(key, period + 1) <= rate:
+        return None
+    return max(1, math.ceil((window + 1) * period - now))
+
+
+def ratelimit(name, methods=('POST',)):
+    '''Отвечает 429 на запросы methods сверх лимита name'''
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapped(request, *args, **kwargs):
+            if request.method in methods:
+                retry_after = hit(name, request)
+                if retry_after is not None:
+                    metrics.RATELIMITED.inc(name=name)
+                    return too_many_requests(request, retry_after)
+            return view_func(request, *args, **kwargs)
+        return wrapped
+    return decorator
+
+
+def too_many_requests(request, retry_after):
+    template = 'core/429.html'
+    response = render(
+        request, template, {'retry_after': retry_after}, status=429
+    )
+    response['Retry-After'] = str(retry_after)
+    return response
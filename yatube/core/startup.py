@@ -0,0 +1,84 @@
+"""Время запуска процесса: импорты и первый ответ.
+
+Замеры выполняются в отдельном интерпретаторе, чтобы модули текущего
+процесса уже не были загружены.
+"""
+import json
+import os
+import subprocess
+import sys
+
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.urls import URLResolver, get_resolver
+
+# Загрузка WSGI-приложения и первый запрос к главной в чистом процессе.
+COLD_START_SCRIPT = '''
+import io, json, time
+from wsgiref.util import setup_testing_defaults
+start = time.perf_counter()
+from yatube.wsgi import application
+loaded = time.perf_counter()
+environ = {'PATH_INFO': '/', 'wsgi.errors': io.StringIO()}
+setup_testing_defaults(environ)
+status = []
+body = application(environ, lambda s, h, e=None: status.append(s))
+b''.join(body)
+done = time.perf_counter()
+print(json.dumps({
+    'status': status[0],
+    'load': loaded - start,
+    'first_response': done - start,
+}))
+'''
+
+
+def populate_url_resolvers(resolver=None):
+    '''Заполняет таблицы reverse() всех URLconf заранее, а не
+       на первом запросе, который их использует'''
+    resolver = resolver or get_resolver()
+    resolver.reverse_dict
+    for pattern in resolver.url_patterns:
+        if isinstance(pattern, URLResolver):
+            populate_url_resolvers(pattern)
+
+
+def load_static_manifest():
+    '''Создаёт хранилище статики заранее: манифест с именами файлов
+       читается при загрузке воркера, а не на первой странице'''
+    staticfiles_storage.base_url
+
+
+def _run(args):
+    env = dict(os.environ)
+    env.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+    return subprocess.run(
+        [sys.executable, *args],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def import_times(module='yatube.wsgi'):
+    '''Время импорта модулей (python -X importtime), микросекунды:
+       [(модуль, собственное, с вложенными), ...]'''
+    result = _run(['-X', 'importtime', '-c', f'import {module}'])
+    times = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        try:
+            own, cumulative = int(fields[0]), int(fields[1])
+        except ValueError:
+            # Строка заголовка.
+            continue
+        times.append((fields[2].strip(), own, cumulative))
+    return times
+
+
+def cold_start():
+    '''Загрузка приложения и первый ответ в новом процессе, секунды'''
+    result = _run(['-c', COLD_START_SCRIPT])
+    return json.loads(result.stdout.splitlines()[-1])
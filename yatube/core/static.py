@@ -0,0 +1,138 @@
+"""Раздача статики с заранее сжатыми копиями файлов.
+
+Команда ``compress_static`` кладёт рядом с файлами из STATIC_ROOT
+копии ``.gz`` (и ``.br``, если установлен brotli). View ``serve``
+отдаёт сжатую копию, если клиент её принимает, поэтому статика не
+сжимается на каждый запрос.
+
+Хранилище ``CompressedManifestStaticFilesStorage`` при collectstatic
+добавляет к именам файлов хэш содержимого и сразу сжимает их. Файлы
+с хэшем в имени не меняются, поэтому отдаются как immutable.
+"""
+import gzip
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.storage import FileSystemStorage
+from django.http import FileResponse, Http404, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.svg', '.html', '.txt', '.json')
+# Порядок важен: brotli предпочтительнее gzip.
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+# Имя с хэшем содержимого от ManifestStaticFilesStorage: name.<12>.ext
+HASHED_NAME = re.compile(r'\.[0-9a-f]{12}\.[^/.]+$')
+IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
+
+
+def _compress(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data)
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def compress_file(path):
+    '''Создаёт сжатые копии файла, если они меньше оригинала.
+
+    Возвращает список созданных файлов.
+    '''
+    if not path.endswith(COMPRESSIBLE_EXTENSIONS):
+        return []
+    with open(path, 'rb') as file:
+        data = file.read()
+    created = []
+    for encoding, extension in ENCODINGS:
+        if encoding == 'br' and brotli is None:
+            continue
+        compressed = _compress(data, encoding)
+        if len(compressed) >= len(data):
+            continue
+        with open(path + extension, 'wb') as file:
+            file.write(compressed)
+        created.append(path + extension)
+    return created
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    '''Имена с хэшем содержимого и сжатые копии файлов.
+
+    Манифест читается один раз при создании хранилища. Без манифеста
+    (collectstatic не запускался, например при разработке и в тестах)
+    адреса строятся по исходным именам. Если манифест есть, файл,
+    которого в нём нет, — ошибка, как в ManifestStaticFilesStorage.
+    '''
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.manifest_missing = not self.exists(self.manifest_name)
+
+    def url(self, name, force=False):
+        if self.manifest_missing:
+            return FileSystemStorage.url(self, name)
+        return super().url(name, force)
+
+    def post_process(self, paths, dry_run=False, **options):
+        processed_files = super().post_process(paths, dry_run, **options)
+        for name, hashed_name, processed in processed_files:
+            if not dry_run and hashed_name and not isinstance(
+                processed, Exception
+            ):
+                compress_file(self.path(hashed_name))
+            yield name, hashed_name, processed
+
+
+def _accepted_encodings(request):
+    accept = request.META.get('HTTP_ACCEPT_ENCODING', '')
+    return {
+        encoding for encoding, _ in ENCODINGS
+        if re.search(rf'\b{encoding}\b', accept)
+    }
+
+
+def serve(request, path):
+    '''Отдаёт файл из STATIC_ROOT, предпочитая сжатую копию'''
+    try:
+        fullpath = safe_join(settings.STATIC_ROOT, path)
+    except ValueError:
+        raise Http404
+    if not os.path.isfile(fullpath):
+        raise Http404
+    content_type, _ = mimetypes.guess_type(fullpath)
+    accepted = _accepted_encodings(request)
+    content_encoding = None
+    for encoding, extension in ENCODINGS:
+        if encoding in accepted and os.path.isfile(fullpath + extension):
+            content_encoding = encoding
+            fullpath += extension
+            break
+    stat = os.stat(fullpath)
+    if not was_modified_since(
+        request.META.get('HTTP_IF_MODIFIED_SINCE'),
+        stat.st_mtime,
+        stat.st_size,
+    ):
+        return HttpResponseNotModified()
+    response = FileResponse(
+        open(fullpath, 'rb'),
+        content_type=content_type or 'application/octet-stream',
+    )
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    if HASHED_NAME.search(path):
+        patch_cache_control(
+            response, public=True, max_age=IMMUTABLE_MAX_AGE, immutable=True
+        )
+    if content_encoding:
+        response['Content-Encoding'] = content_encoding
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
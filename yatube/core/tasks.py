@@ -0,0 +1,133 @@
+"""Фоновая очередь задач с брокером в базе данных.
+
+Задача — функция, помеченная декоратором ``@task``. Вызов
+``func.delay(...)`` сохраняет строку Task в той же транзакции, что и
+вызывающий код, поэтому воркер увидит задачу только вместе с
+закоммиченными данными. Воркеры (``manage.py runworker``) забирают
+задачи атомарным UPDATE и повторяют упавшие с экспоненциальной
+задержкой. Выполненные задачи стирает ``manage.py purge_tasks``.
+"""
+import json
+import logging
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Task
+
+logger = logging.getLogger('yatube.tasks')
+
+_registry = {}
+
+
+def task(func=None, *, max_attempts=3):
+    '''Регистрирует функцию как фоновую задачу'''
+    def decorator(func):
+        name = f'{func.__module__}.{func.__name__}'
+        _registry[name] = func
+
+        def delay(*args, **kwargs):
+            return enqueue(name, args, kwargs, max_attempts=max_attempts)
+        func.task_name = name
+        func.delay = delay
+        return func
+    return decorator(func) if func else decorator
+
+
+def enqueue(name, args=(), kwargs=None, max_attempts=3):
+    '''Ставит задачу в очередь (или выполняет сразу
+       при TASKS_ALWAYS_EAGER)'''
+    payload = json.dumps({'args': list(args), 'kwargs': kwargs or {}})
+    if settings.TASKS_ALWAYS_EAGER:
+        _registry[name](*args, **(kwargs or {}))
+        return None
+    return Task.objects.create(
+        name=name,
+        payload=payload,
+        max_attempts=max_attempts,
+    )
+
+
+def claim(worker_id):
+    '''Забирает следующую готовую задачу или возвращает None.
+
+    Зависшие задачи (воркер умер, не завершив их) забираются снова
+    через TASKS_LOCK_TIMEOUT секунд.
+    '''
+    now = timezone.now()
+    ready = Q(status=Task.PENDING, run_at__lte=now) | Q(
+        status=Task.RUNNING,
+        locked_at__lt=now - timedelta(seconds=settings.TASKS_LOCK_TIMEOUT),
+    )
+    candidates = Task.objects.filter(ready).order_by('run_at')
+    for pk in candidates.values_list('pk', flat=True)[:10]:
+        claimed = Task.objects.filter(ready, pk=pk).update(
+            status=Task.RUNNING,
+            locked_by=worker_id,
+            locked_at=now,
+            attempts=F('attempts') + 1,
+        )
+        if claimed:
+            return Task.objects.get(pk=pk)
+    return None
+
+
+def run(task_obj):
+    '''Выполняет задачу и сохраняет результат или план повтора'''
+    payload = json.loads(task_obj.payload)
+    try:
+        func = _registry[task_obj.name]
+        func(*payload['args'], **payload['kwargs'])
+    except Exception:
+        task_obj.last_error = traceback.format_exc()
+        if task_obj.attempts >= task_obj.max_attempts:
+            task_obj.status = Task.FAILED
+            logger.error('Задача %s не выполнена', task_obj)
+        else:
+            task_obj.status = Task.PENDING
+            delay = settings.TASKS_RETRY_DELAY * 2 ** (task_obj.attempts - 1)
+            task_obj.run_at = timezone.now() + timedelta(seconds=delay)
+            logger.warning('Задача %s будет повторена', task_obj)
+    else:
+        task_obj.status = Task.DONE
+    task_obj.locked_by = ''
+    task_obj.locked_at = None
+    task_obj.save(update_fields=(
+        'status', 'run_at', 'locked_by', 'locked_at', 'last_error',
+    ))
+    return task_obj
+
+
+def work(worker_id, burst=False):
+    '''Цикл воркера; с burst=True выходит, когда очередь пуста.
+
+    Возвращает число обработанных задач.
+    '''
+    processed = 0
+    while True:
+        close_old_connections()
+        task_obj = claim(worker_id)
+        if task_obj is None:
+            if burst:
+                return processed
+            time.sleep(settings.TASKS_POLL_INTERVAL)
+            continue
+        run(task_obj)
+        processed += 1
+
+
+def purge_done(before, size=1000):
+    '''Стирает выполненные задачи, созданные до before, пачками
+       по size строк. Возвращает число стёртых задач.'''
+    done = Task.objects.filter(status=Task.DONE, created__lt=before)
+    purged = 0
+    while True:
+        batch = list(done.values_list('pk', flat=True)[:size])
+        if not batch:
+            return purged
+        purged += Task.objects.filter(pk__in=batch).delete()[0]
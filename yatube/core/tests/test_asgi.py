@@ -0,0 +1,90 @@
+import asyncio
+
+from django.core.wsgi import get_wsgi_application
+from django.test import SimpleTestCase
+
+from core.asgi import WsgiToAsgi, build_environ
+
+
+def echo(environ, start_response):
+    '''WSGI-приложение, возвращающее тело запроса частями'''
+    start_response('201 Created', [('Content-Type', 'text/plain')])
+    body = environ['wsgi.input'].read()
+    return [environ['PATH_INFO'].encode('latin-1'), b'', body]
+
+
+def request(application, path, body=b'', **scope):
+    '''Выполняет HTTP-запрос к ASGI-приложению, возвращает сообщения
+       ответа'''
+    chunks = [body[:2], body[2:]]
+    messages = []
+
+    async def receive():
+        chunk = chunks.pop(0)
+        return {
+            'type': 'http.request',
+            'body': chunk,
+            'more_body': bool(chunks),
+        }
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        'type': 'http',
+        'method': 'POST' if body else 'GET',
+        'path': path,
+        'query_string': b'',
+        'headers': [(b'host', b'localhost')],
+        **scope,
+    }
+    handler = WsgiToAsgi(application, 2)
+    try:
+        asyncio.run(handler(scope, receive, send))
+    finally:
+        handler.executor.shutdown()
+    return messages
+
+
+class WsgiToAsgiTests(SimpleTestCase):
+    def test_build_environ(self) -> None:
+        environ = build_environ({
+            'method': 'GET',
+            'path': '/поиск/',
+            'query_string': b'q=1',
+            'headers': [
+                (b'content-type', b'text/plain'),
+                (b'accept', b'text/html'),
+                (b'accept', b'*/*'),
+                (b'cookie', b'sessionid=abc'),
+                (b'cookie', b'csrftoken=def'),
+            ],
+            'client': ('10.0.0.1', 5000),
+        }, None)
+        self.assertEqual(
+            environ['PATH_INFO'].encode('latin-1').decode(), '/поиск/'
+        )
+        self.assertEqual(environ['QUERY_STRING'], 'q=1')
+        self.assertEqual(environ['CONTENT_TYPE'], 'text/plain')
+        self.assertEqual(environ['HTTP_ACCEPT'], 'text/html,*/*')
+        self.assertEqual(
+            environ['HTTP_COOKIE'], 'sessionid=abc; csrftoken=def'
+        )
+        self.assertEqual(environ['REMOTE_ADDR'], '10.0.0.1')
+
+    def test_streamed_response(self) -> None:
+        '''Тело запроса собирается из частей, ответ передаётся
+           частями без пустых'''
+        messages = request(echo, '/echo/', b'hello')
+        self.assertEqual(messages[0]['status'], 201)
+        self.assertIn((b'content-type', b'text/plain'), messages[0]['headers'])
+        self.assertEqual(
+            [m['body'] for m in messages[1:]], [b'/echo/', b'hello', b'']
+        )
+        self.assertFalse(messages[-1].get('more_body'))
+
+    def test_django_application(self) -> None:
+        messages = request(get_wsgi_application(), '/about/author/')
+        self.assertEqual(messages[0]['status'], 200)
+        body = b''.join(m['body'] for m in messages[1:])
+        self.assertIn('Об авторе проекта'.encode(), body)
@@ -0,0 +1,119 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import OperationalError
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core import metrics
+from core.breaker import (
+    CLOSED, HALF_OPEN, OPEN, STALE_BANNER, get_breaker,
+)
+from posts.models import Post
+
+User = get_user_model()
+
+
+@override_settings(BREAKER_FAILURES=2)
+class CircuitBreakerTests(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='TestAuthor')
+        cls.post = Post.objects.create(text='Тестовый пост', author=cls.author)
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.breaker = get_breaker('index')
+        self.addCleanup(self.breaker.success)
+        self.url = reverse('posts:index')
+
+    def fail(self):
+        with mock.patch(
+            'posts.views.paginator', side_effect=OperationalError
+        ):
+            return self.client.get(self.url)
+
+    def test_db_errors_open_breaker(self) -> None:
+        '''Ошибки базы отдают сохранённую копию с плашкой
+           и размыкают предохранитель'''
+        self.client.get(self.url)
+        # Остаётся только копия страницы, иначе ответ отдаст cache_page.
+        key = f'stale:index:{self.url}'
+        content = cache.get(key)
+        cache.clear()
+        cache.set(key, content)
+        response = self.fail()
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(STALE_BANNER, response.content)
+        self.assertIn('Тестовый пост'.encode(), response.content)
+        self.fail()
+        self.assertEqual(self.breaker.state, OPEN)
+        self.assertEqual(
+            metrics.BREAKER_OPEN.samples[(('breaker', 'index'),)], 1
+        )
+
+    def test_copy_refreshed_periodically(self) -> None:
+        '''Копия страницы пишется не на каждый ответ'''
+        key = f'stale:index:{self.url}'
+        self.client.get(self.url)
+        cache.set(key, b'old')
+        self.client.get(self.url)
+        self.assertEqual(cache.get(key), b'old')
+        cache.delete(f'stale-refresh:index:{self.url}')
+        self.client.get(self.url)
+        self.assertIn('Тестовый пост'.encode(), cache.get(key))
+
+    def test_open_breaker_skips_view(self) -> None:
+        '''Пока предохранитель разомкнут, база не запрашивается'''
+        self.client.get(self.url)
+        self.breaker.failure()
+        self.breaker.failure()
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertIn(STALE_BANNER, response.content)
+
+    @override_settings(BREAKER_RESET_SECONDS=0)
+    def test_half_open_success_closes(self) -> None:
+        self.breaker.failure()
+        self.breaker.failure()
+        response = self.client.get(self.url)
+        self.assertNotIn(STALE_BANNER, response.content)
+        self.assertEqual(self.breaker.failures, 0)
+
+    @override_settings(BREAKER_RESET_SECONDS=0)
+    def test_not_found_probe_closes(self) -> None:
+        '''Пробный запрос, завершившийся 404, замыкает предохранитель'''
+        breaker = get_breaker('group_posts')
+        self.addCleanup(breaker.success)
+        breaker.failure()
+        breaker.failure()
+        url = reverse('posts:group_list', args=['missing-slug'])
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.assertEqual(breaker.state, CLOSED)
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_lost_probe_times_out(self) -> None:
+        '''Если исход пробы не записан, через интервал пропускается
+           следующая проба'''
+        self.breaker.failure()
+        self.breaker.failure()
+        with override_settings(BREAKER_RESET_SECONDS=0):
+            self.assertTrue(self.breaker.allow())
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+        self.assertFalse(self.breaker.allow())
+        with override_settings(BREAKER_RESET_SECONDS=0):
+            self.assertTrue(self.breaker.allow())
+
+    def test_no_copy(self) -> None:
+        '''Без сохранённой копии отдаётся 503 с Retry-After'''
+        response = self.fail()
+        self.assertEqual(response.status_code, 503)
+        self.assertIn('Retry-After', response)
+
+    @override_settings(BREAKER_SLOW_SECONDS=-1)
+    def test_slow_requests_count_as_failures(self) -> None:
+        self.client.get(self.url)
+        self.client.get(self.url)
+        self.assertEqual(self.breaker.state, OPEN)
@@ -0,0 +1,136 @@
+import gzip
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.template.loader import get_template
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from django.test import override_settings
+from django.urls import reverse
+
+from core import static
+from core.loaders import minify
+
+TEMP_STATIC_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+class MinifyTests(SimpleTestCase):
+    def test_indentation_removed(self) -> None:
+        '''Отступы и повторные пустые строки убираются, переводы
+           строк остаются'''
+        source = '<ul>\n  <li>\n    {{ post }}  \n\n \n\n  </li>\n</ul>\n'
+        self.assertEqual(
+            minify(source), '<ul>\n<li>\n{{ post }}\n\n</li>\n</ul>'
+        )
+
+    def test_paragraphs_kept(self) -> None:
+        '''Абзацы текстового письма о сбросе пароля не сливаются'''
+        source = get_template(
+            'registration/password_reset_email.html'
+        ).template.source
+        self.assertIn('\n\n', source)
+
+    def test_preformatted_untouched(self) -> None:
+        '''Шаблоны с <pre> не изменяются'''
+        source = '<pre>\n  код\n</pre>'
+        self.assertEqual(minify(source), source)
+
+
+class CompressionMiddlewareTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+
+    def test_large_response_gzipped(self) -> None:
+        '''Страница больше порога сжимается gzip'''
+        response = self.client.get(
+            reverse('posts:index'), HTTP_ACCEPT_ENCODING='gzip'
+        )
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn(b'<html', gzip.decompress(response.content))
+
+    @override_settings(COMPRESSION_MIN_SIZE=10 ** 6)
+    def test_small_response_not_compressed(self) -> None:
+        '''Ответ меньше порога не сжимается'''
+        response = self.client.get(
+            reverse('posts:index'), HTTP_ACCEPT_ENCODING='gzip'
+        )
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+
+@override_settings(STATIC_ROOT=TEMP_STATIC_ROOT)
+class PrecompressedStaticTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.path = os.path.join(TEMP_STATIC_ROOT, 'site.css')
+        with open(cls.path, 'w') as file:
+            file.write('body { margin: 0; }\n' * 100)
+        static.compress_file(cls.path)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_STATIC_ROOT, ignore_errors=True)
+
+    def test_precompressed_copy_served(self) -> None:
+        '''Клиенту, принимающему gzip, отдаётся готовая сжатая копия'''
+        request = RequestFactory().get(
+            '/static/site.css', HTTP_ACCEPT_ENCODING='gzip'
+        )
+        response = static.serve(request, 'site.css')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Content-Type'], 'text/css')
+        content = gzip.decompress(b''.join(response.streaming_content))
+        with open(self.path, 'rb') as file:
+            self.assertEqual(content, file.read())
+
+    def test_plain_file_served(self) -> None:
+        '''Без Accept-Encoding отдаётся исходный файл'''
+        request = RequestFactory().get('/static/site.css')
+        response = static.serve(request, 'site.css')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        # Имя без хэша: файл может измениться.
+        self.assertFalse(response.has_header('Cache-Control'))
+
+
+class ManifestStorageTests(SimpleTestCase):
+    def setUp(self) -> None:
+        self.root = tempfile.mkdtemp(dir=settings.BASE_DIR)
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+
+    def storage(self):
+        return static.CompressedManifestStaticFilesStorage(
+            location=self.root, base_url='/static/'
+        )
+
+    def test_hashed_and_compressed(self) -> None:
+        '''collectstatic создаёт сжатые файлы с хэшем в имени,
+           а шаблоны получают их адреса'''
+        with override_settings(STATIC_ROOT=self.root):
+            call_command('collectstatic', '--noinput', verbosity=0)
+        url = self.storage().url('css/bootstrap.min.css')
+        self.assertRegex(url, r'^/static/css/bootstrap\.min\.\w{12}\.css$')
+        path = url[len('/static/'):]
+        self.assertTrue(os.path.isfile(os.path.join(self.root, path + '.gz')))
+
+        with override_settings(STATIC_ROOT=self.root):
+            response = static.serve(RequestFactory().get(url), path)
+        self.assertIn('immutable', response['Cache-Control'])
+
+    def test_missing_manifest(self) -> None:
+        '''Без манифеста адрес строится по исходному имени'''
+        self.assertEqual(
+            self.storage().url('css/bootstrap.min.css'),
+            '/static/css/bootstrap.min.css',
+        )
+
+    def test_missing_file_with_manifest(self) -> None:
+        '''При собранном манифесте ссылка на отсутствующий
+           в нём файл — ошибка'''
+        with open(os.path.join(self.root, 'staticfiles.json'), 'w') as file:
+            file.write('{"paths": {}, "version": "1.0"}')
+        with self.assertRaises(ValueError):
+            self.storage().url('css/missing.css')
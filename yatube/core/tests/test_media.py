@@ -0,0 +1,102 @@
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.http import FileResponse
+from django.test import SimpleTestCase, override_settings
+
+from core.media import parse_range
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+CONTENT = bytes(range(256)) * 4
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, MEDIA_ACCEL=None)
+class MediaServeTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        os.makedirs(os.path.join(TEMP_MEDIA_ROOT, 'posts'), exist_ok=True)
+        with open(os.path.join(TEMP_MEDIA_ROOT, 'posts', 'a.gif'), 'wb') as f:
+            f.write(CONTENT)
+        cls.url = settings.MEDIA_URL + 'posts/a.gif'
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def test_full_file(self) -> None:
+        '''Файл отдаётся целиком с заголовками кэширования'''
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), CONTENT)
+        self.assertEqual(response['Content-Type'], 'image/gif')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertIn('max-age', response['Cache-Control'])
+        self.assertTrue(response.has_header('ETag'))
+
+    def test_not_modified(self) -> None:
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_range(self) -> None:
+        '''Запрос диапазона получает 206 с частью файла'''
+        response = self.client.get(self.url, HTTP_RANGE='bytes=10-19')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 10-19/1024')
+        self.assertEqual(
+            b''.join(response.streaming_content), CONTENT[10:20]
+        )
+
+    def test_not_compressed(self) -> None:
+        '''Файлы и диапазоны отдаются без сжатия даже клиенту,
+           принимающему gzip'''
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        # FileResponse отдаётся через wsgi.file_wrapper.
+        self.assertIsInstance(response, FileResponse)
+        response = self.client.get(
+            self.url, HTTP_RANGE='bytes=0-9', HTTP_ACCEPT_ENCODING='gzip'
+        )
+        self.assertEqual(response.status_code, 206)
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(b''.join(response.streaming_content), CONTENT[:10])
+
+    def test_if_range_mismatch(self) -> None:
+        '''Если файл изменился (If-Range), отдаётся целиком'''
+        response = self.client.get(
+            self.url, HTTP_RANGE='bytes=10-19', HTTP_IF_RANGE='"old"'
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_unsatisfiable_range(self) -> None:
+        response = self.client.get(self.url, HTTP_RANGE='bytes=5000-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */1024')
+
+    def test_missing_file(self) -> None:
+        response = self.client.get(settings.MEDIA_URL + 'posts/missing.gif')
+        self.assertEqual(response.status_code, 404)
+
+    def test_path_outside_media_root(self) -> None:
+        response = self.client.get(settings.MEDIA_URL + '../settings.py')
+        self.assertEqual(response.status_code, 400)
+
+    @override_settings(MEDIA_ACCEL='x-accel-redirect')
+    def test_accel_redirect(self) -> None:
+        '''С nginx Django отдаёт только заголовки'''
+        response = self.client.get(self.url)
+        self.assertEqual(
+            response['X-Accel-Redirect'], '/protected-media/posts/a.gif'
+        )
+        self.assertEqual(response.content, b'')
+
+    def test_parse_range(self) -> None:
+        self.assertEqual(parse_range('bytes=0-', 10), (0, 9))
+        self.assertEqual(parse_range('bytes=-3', 10), (7, 9))
+        self.assertEqual(parse_range('bytes=5-100', 10), (5, 9))
+        self.assertIsNone(parse_range('bytes=0-1,3-4', 10))
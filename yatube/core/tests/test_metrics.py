@@ -0,0 +1,120 @@
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from core.cache import key_prefix
+from core.metrics import Counter, Gauge, Histogram, Registry
+
+TEMP_METRICS_DIR = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(METRICS_DIR=TEMP_METRICS_DIR)
+class RegistryTests(SimpleTestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_METRICS_DIR, ignore_errors=True)
+
+    def test_snapshots_are_merged(self) -> None:
+        '''Значения из снимков разных процессов складываются'''
+        registry = Registry()
+        counter = Counter('test_total', 'Тестовый счётчик', registry)
+        histogram = Histogram(
+            'test_seconds', 'Тестовая гистограмма', (0.1, 1), registry
+        )
+        counter.inc(2, view='posts:index')
+        histogram.observe(0.05, view='posts:index')
+        registry.flush()
+        # Снимок «другого» процесса с теми же метриками.
+        other = {
+            'test_total': [[{'view': 'posts:index'}, 3]],
+            'test_seconds': [[{'view': 'posts:index'}, [0, 1, 0.5, 1]]],
+        }
+        with open(f'{TEMP_METRICS_DIR}/other.json', 'w') as file:
+            file.write(str(other).replace("'", '"'))
+        text = registry.render()
+        self.assertIn('test_total{view="posts:index"} 5', text)
+        self.assertIn(
+            'test_seconds_bucket{view="posts:index",le="0.1"} 1', text
+        )
+        self.assertIn(
+            'test_seconds_bucket{view="posts:index",le="+Inf"} 2', text
+        )
+        self.assertIn('test_seconds_count{view="posts:index"} 2', text)
+
+    def test_dead_process_gauges_dropped(self) -> None:
+        '''Gauge завершившегося процесса не учитывается,
+           его счётчики — учитываются'''
+        registry = Registry()
+        counter = Counter('dead_total', 'Тестовый счётчик', registry)
+        gauge = Gauge('dead_open', 'Тестовый gauge', registry)
+        counter.inc(1)
+        gauge.set(0)
+        process = subprocess.Popen(['true'])
+        process.wait()
+        dead = {'dead_total': [[{}, 2]], 'dead_open': [[{}, 1]]}
+        with open(f'{TEMP_METRICS_DIR}/{process.pid}.json', 'w') as file:
+            json.dump(dead, file)
+        self.addCleanup(os.remove, f'{TEMP_METRICS_DIR}/{process.pid}.json')
+        text = registry.render()
+        self.assertIn('dead_total 3', text)
+        self.assertIn('dead_open 0', text)
+
+    def test_key_prefix(self) -> None:
+        '''Ключи cache_page группируются по key_prefix'''
+        keys = {
+            'views.decorators.cache.cache_page.index_page.GET.abc.def':
+            'index_page',
+            'views.decorators.cache.cache_header..abc': 'cache_header',
+            'following:1': 'following',
+        }
+        for key, expected in keys.items():
+            with self.subTest(key=key):
+                self.assertEqual(key_prefix(key), expected)
+
+
+class MetricsViewTests(TestCase):
+    def test_metrics_endpoint(self) -> None:
+        '''Эндпоинт отдаёт гистограмму по имени view'''
+        self.client.get(reverse('about:author'))
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(
+            'yatube_view_duration_seconds_count{view="about:author"}',
+            response.content.decode(),
+        )
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_metrics_access(self) -> None:
+        '''С внешнего адреса метрики видны только по токену
+           и сотрудникам'''
+        url = reverse('metrics')
+        remote = {'REMOTE_ADDR': '10.0.0.1'}
+        self.assertEqual(self.client.get(url, **remote).status_code, 404)
+        response = self.client.get(
+            url, HTTP_AUTHORIZATION='Bearer wrong', **remote
+        )
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get(
+            url, HTTP_AUTHORIZATION='Bearer secret', **remote
+        )
+        self.assertEqual(response.status_code, 200)
+        staff = get_user_model().objects.create_user(
+            username='staff', is_staff=True
+        )
+        self.client.force_login(staff)
+        self.assertEqual(self.client.get(url, **remote).status_code, 200)
+
+    @override_settings(METRICS_SAMPLE_RATE=0)
+    def test_sample_rate(self) -> None:
+        '''При нулевой доле запросы в метрики не попадают'''
+        before = self.client.get(reverse('metrics')).content
+        self.client.get(reverse('about:tech'))
+        self.assertEqual(self.client.get(reverse('metrics')).content, before)
@@ -0,0 +1,55 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Post
+
+User = get_user_model()
+
+
+class PerformanceMiddlewareTests(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='TestUser')
+        cls.post = Post.objects.create(
+            text='Тестовый пост',
+            author=cls.user,
+        )
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    @override_settings(PERFORMANCE_SAMPLE_RATE=1)
+    def test_sampled_request_has_server_timing(self) -> None:
+        '''Замеренный запрос получает заголовок Server-Timing
+           и строку в логе'''
+        with self.assertLogs('yatube.performance', 'INFO') as logs:
+            response = self.client.get(
+                reverse('posts:post_detail', args=[self.post.pk])
+            )
+        self.assertIn('sql;dur=', response['Server-Timing'])
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['view'], 'posts:post_detail')
+        self.assertEqual(record['status'], 200)
+        self.assertGreater(record['sql'], 0)
+        self.assertGreater(record['template_ms'], 0)
+
+    @override_settings(PERFORMANCE_SAMPLE_RATE=1)
+    def test_cache_hits_are_counted(self) -> None:
+        '''Повторный запрос к кэшируемой странице учитывается как попадание'''
+        self.client.get(reverse('posts:index'))
+        with self.assertLogs('yatube.performance', 'INFO') as logs:
+            self.client.get(reverse('posts:index'))
+        record = json.loads(logs.records[0].getMessage())
+        self.assertGreater(record['cache_hit'], 0)
+        self.assertEqual(record['sql'], 0)
+
+    @override_settings(PERFORMANCE_SAMPLE_RATE=0)
+    def test_unsampled_request_is_not_measured(self) -> None:
+        '''Запрос вне выборки не замеряется'''
+        response = self.client.get(reverse('posts:index'))
+        self.assertFalse(response.has_header('Server-Timing'))
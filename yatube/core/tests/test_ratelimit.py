@@ -0,0 +1,67 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Post
+
+User = get_user_model()
+
+
+@override_settings(RATELIMITS={
+    'add_comment': (2, 60),
+    'profile_follow': (1, 60),
+})
+class RateLimitTests(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='TestUser')
+        cls.author = User.objects.create_user(username='TestAuthor')
+        cls.post = Post.objects.create(text='Тестовый пост', author=cls.author)
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def comment(self, client=None):
+        return (client or self.client).post(
+            reverse('posts:add_comment', args=[self.post.pk]),
+            {'text': 'Комментарий'},
+        )
+
+    def test_limit_exceeded(self) -> None:
+        '''Запрос сверх лимита получает 429 с Retry-After
+           и ничего не записывает'''
+        for _ in range(2):
+            self.assertEqual(self.comment().status_code, 302)
+        response = self.comment()
+        self.assertEqual(response.status_code, 429)
+        self.assertTrue(1 <= int(response['Retry-After']) <= 60)
+        self.assertEqual(Comment.objects.count(), 2)
+
+    def test_limit_per_user(self) -> None:
+        '''У каждого пользователя свой счётчик'''
+        for _ in range(3):
+            self.comment()
+        self.client.force_login(self.author)
+        self.assertEqual(self.comment().status_code, 302)
+
+    @override_settings(RATELIMITS={'post_create': (0, 60)})
+    def test_get_not_limited(self) -> None:
+        '''По умолчанию ограничиваются только POST-запросы'''
+        url = reverse('posts:post_create')
+        self.assertEqual(self.client.get(url).status_code, 200)
+        response = self.client.post(url, {'text': 'Новый пост'})
+        self.assertEqual(response.status_code, 429)
+
+    def test_follow_limited(self) -> None:
+        url = reverse('posts:profile_follow', args=[self.author.username])
+        self.client.get(url)
+        self.assertEqual(self.client.get(url).status_code, 429)
+        self.assertEqual(Follow.objects.count(), 1)
+
+    @override_settings(RATELIMITS={})
+    def test_disabled(self) -> None:
+        for _ in range(3):
+            self.assertEqual(self.comment().status_code, 302)
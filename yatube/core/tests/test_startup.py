@@ -0,0 +1,23 @@
+from django.test import SimpleTestCase
+from django.urls import get_resolver
+
+from core.startup import import_times, populate_url_resolvers
+
+
+class StartupTests(SimpleTestCase):
+    def test_populate_url_resolvers(self) -> None:
+        '''Таблицы reverse() вложенных URLconf заполнены заранее'''
+        resolver = get_resolver()
+        populate_url_resolvers(resolver)
+        _, posts_resolver = resolver.namespace_dict['posts']
+        self.assertTrue(posts_resolver._populated)
+
+    def test_import_times(self) -> None:
+        '''Время импорта модуля и его зависимостей'''
+        times = {
+            name: (own, cumulative)
+            for name, own, cumulative in import_times('json')
+        }
+        self.assertIn('json', times)
+        own, cumulative = times['json']
+        self.assertLessEqual(own, cumulative)
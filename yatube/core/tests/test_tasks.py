@@ -0,0 +1,135 @@
+import io
+import json
+import shutil
+import tempfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core import tasks
+from core.models import Task
+from posts.models import Post
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+calls = []
+
+
+@tasks.task
+def remember(value):
+    calls.append(value)
+
+
+@tasks.task(max_attempts=2)
+def explode():
+    raise RuntimeError('boom')
+
+
+class TaskQueueTests(TestCase):
+    def setUp(self) -> None:
+        calls.clear()
+
+    def test_task_done(self) -> None:
+        '''Воркер выполняет задачу и помечает её выполненной'''
+        task = remember.delay(42)
+        self.assertEqual(tasks.work('test', burst=True), 1)
+        task.refresh_from_db()
+        self.assertEqual(task.status, Task.DONE)
+        self.assertEqual(calls, [42])
+
+    def test_task_retried_then_failed(self) -> None:
+        '''Упавшая задача откладывается, а после max_attempts
+           помечается ошибочной'''
+        task = explode.delay()
+        tasks.work('test', burst=True)
+        task.refresh_from_db()
+        self.assertEqual(task.status, Task.PENDING)
+        self.assertGreater(task.run_at, timezone.now())
+        self.assertIn('RuntimeError', task.last_error)
+        Task.objects.filter(pk=task.pk).update(run_at=timezone.now())
+        tasks.work('test', burst=True)
+        task.refresh_from_db()
+        self.assertEqual(task.status, Task.FAILED)
+        self.assertEqual(task.attempts, 2)
+
+    def test_claimed_task_not_claimed_twice(self) -> None:
+        '''Взятую задачу не может забрать другой воркер'''
+        remember.delay(1)
+        self.assertIsNotNone(tasks.claim('first'))
+        self.assertIsNone(tasks.claim('second'))
+
+    @override_settings(TASKS_LOCK_TIMEOUT=0)
+    def test_stale_task_reclaimed(self) -> None:
+        '''Задачу зависшего воркера забирают снова'''
+        remember.delay(1)
+        tasks.claim('dead')
+        self.assertEqual(tasks.claim('alive').locked_by, 'alive')
+
+    def test_purge_tasks(self) -> None:
+        '''purge_tasks стирает только давно выполненные задачи'''
+        old, fresh = remember.delay(1), remember.delay(2)
+        pending = remember.delay(3)
+        tasks.work('test', burst=True)
+        Task.objects.filter(pk__in=[old.pk, pending.pk]).update(
+            created=timezone.now() - timedelta(days=2)
+        )
+        Task.objects.filter(pk=pending.pk).update(status=Task.PENDING)
+        out = io.StringIO()
+        call_command('purge_tasks', stdout=out)
+        self.assertIn('Стёрто задач: 1', out.getvalue())
+        self.assertEqual(
+            set(Task.objects.values_list('pk', flat=True)),
+            {fresh.pk, pending.pk},
+        )
+
+    @override_settings(TASKS_ALWAYS_EAGER=True)
+    def test_eager_mode(self) -> None:
+        '''В режиме TASKS_ALWAYS_EAGER задача выполняется сразу'''
+        remember.delay(7)
+        self.assertEqual(calls, [7])
+        self.assertFalse(Task.objects.exists())
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class PostProcessingTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def test_post_with_image_enqueued(self) -> None:
+        '''Создание поста ставит в очередь его обработку,
+           правка текста — нет'''
+        user = User.objects.create_user(username='author')
+        image = SimpleUploadedFile(
+            name='small.gif',
+            content=(
+                b'\x47\x49\x46\x38\x39\x61\x02\x00'
+                b'\x01\x00\x80\x00\x00\x00\x00\x00'
+                b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+                b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+                b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+                b'\x0A\x00\x3B'
+            ),
+            content_type='image/gif',
+        )
+        post = Post.objects.create(text='Текст', author=user, image=image)
+        task = Task.objects.get()
+        self.assertEqual(task.name, 'posts.tasks.process_saved_post')
+        self.assertEqual(json.loads(task.payload)['args'], [post.pk])
+        post.text = 'Новый текст'
+        post.save()
+        self.assertEqual(Task.objects.count(), 1)
+
+    def test_post_without_image_not_enqueued(self) -> None:
+        '''Пост без картинки обработки не требует'''
+        user = User.objects.create_user(username='author')
+        Post.objects.create(text='Текст', author=user)
+        self.assertFalse(Task.objects.exists())
@@ -0,0 +1,69 @@
+import io
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+
+from core.warmup import urls, warm_up
+from posts.models import Follow, Group, Post
+
+User = get_user_model()
+
+
+class WarmUpTests(TransactionTestCase):
+    # Страницы запрашиваются из других потоков, данные должны
+    # быть закоммичены.
+    def setUp(self) -> None:
+        cache.clear()
+        self.author = User.objects.create_user(username='TestAuthor')
+        self.reader = User.objects.create_user(username='TestReader')
+        self.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        Post.objects.create(
+            text='Тестовый пост', author=self.author, group=self.group
+        )
+        Follow.objects.create(user=self.reader, author=self.author)
+
+    def test_urls(self) -> None:
+        '''Существующие страницы главной, крупнейшие группы
+           и популярные профили'''
+        self.assertEqual(urls(pages=2, groups=1, profiles=1), [
+            reverse('posts:index'),
+            reverse('posts:group_list', args=[self.group.slug]),
+            reverse('posts:profile', args=[self.author.username]),
+        ])
+
+    def test_deleted_posts_not_counted(self) -> None:
+        '''Удалённые посты не поднимают группу в списке'''
+        other = Group.objects.create(title='Другая группа', slug='other')
+        for i in range(2):
+            Post.objects.create(
+                text=f'Удалённый пост №{i}', author=self.author, group=other
+            ).delete()
+        self.assertEqual(urls(pages=0, groups=1, profiles=0), [
+            reverse('posts:index'),
+            reverse('posts:group_list', args=[self.group.slug]),
+        ])
+
+    @override_settings(ALLOWED_HOSTS=['example.com'])
+    def test_pages_cached(self) -> None:
+        '''После прогрева главная отдаётся из кэша без запросов'''
+        report = warm_up(pages=1, groups=1, profiles=1, thumbnails=0)
+        self.assertEqual(
+            [status for _, status, _ in report['pages']], [200, 200, 200]
+        )
+        with self.assertNumQueries(0):
+            response = self.client.get(
+                reverse('posts:index'), SERVER_NAME='example.com'
+            )
+        self.assertEqual(response.status_code, 200)
+
+    def test_command(self) -> None:
+        out = io.StringIO()
+        call_command('warmup', '--thumbnails=0', stdout=out)
+        self.assertIn('Страниц: 4', out.getvalue())
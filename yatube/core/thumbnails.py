@@ -0,0 +1,18 @@
+import time
+
+from sorl.thumbnail.base import ThumbnailBackend
+
+from . import metrics, performance
+
+
+class TimedThumbnailBackend(ThumbnailBackend):
+    '''Бэкенд sorl-thumbnail, замеряющий генерацию миниатюр'''
+
+    def _create_thumbnail(self, *args, **kwargs):
+        performance.record_thumbnail()
+        start = time.perf_counter()
+        try:
+            with performance.timer('thumbnail'):
+                return super()._create_thumbnail(*args, **kwargs)
+        finally:
+            metrics.THUMBNAIL_DURATION.observe(time.perf_counter() - start)
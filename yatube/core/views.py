@@ -1,4 +1,11 @@
+import hmac
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
 from django.shortcuts import render
+from django.views.decorators.cache import never_cache
+
+from .metrics import REGISTRY
 
 
 def page_not_found(request, exception):
@@ -14,3 +21,26 @@ def permission_denied_view(request, exception):
 def internal_server_error(request):
     template = 'core/500.html'
     return render(request, template, {'path': request.path}, status=403)
+
+
+def metrics_allowed(request) -> bool:
+    '''Метрики видны с адресов INTERNAL_IPS, сотрудникам
+       и по токену METRICS_TOKEN в заголовке Authorization'''
+    if request.META.get('REMOTE_ADDR') in settings.INTERNAL_IPS:
+        return True
+    token = settings.METRICS_TOKEN
+    if token and hmac.compare_digest(
+        request.META.get('HTTP_AUTHORIZATION', ''), f'Bearer {token}'
+    ):
+        return True
+    return request.user.is_staff
+
+
+@never_cache
+def metrics(request):
+    if not metrics_allowed(request):
+        raise Http404
+    return HttpResponse(
+        REGISTRY.render(),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
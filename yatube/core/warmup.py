@@ -0,0 +1,140 @@
+"""Прогрев кэшей и миниатюр после запуска.
+
+Первые страницы главной, самые большие группы и профили с наибольшим
+числом подписчиков запрашиваются в пуле потоков анонимными запросами
+напрямую через WSGI-обработчик, как от веб-сервера: ответы попадают
+в cache_page и версии лент, а шаблоны создают недостающие миниатюры.
+Миниатюры свежих постов за пределами этих страниц создаются отдельно.
+
+LocMem-кэш у каждого процесса свой, поэтому команда warmup прогревает
+только общие миниатюры; кэш воркера прогревает WARMUP_ON_STARTUP
+(см. yatube/wsgi.py).
+"""
+import logging
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIHandler
+from django.db import connections
+from django.db.models import Count, Q
+from django.test import RequestFactory
+from django.urls import reverse
+from sorl.thumbnail import get_thumbnail
+
+from posts.models import Group, Post, User
+from posts.tasks import POST_THUMBNAIL_GEOMETRY, POST_THUMBNAIL_OPTIONS
+
+logger = logging.getLogger('yatube.warmup')
+
+
+def urls(pages, groups, profiles):
+    '''Адреса страниц для прогрева'''
+    index = reverse('posts:index')
+    pages = min(pages, math.ceil(Post.objects.count() / settings.POSTS_COUNT))
+    result = [index] + [f'{index}?page={n}' for n in range(2, pages + 1)]
+    slugs = Group.objects.annotate(
+        posts_count=Count('posts', filter=Q(posts__is_deleted=False))
+    ).order_by('-posts_count').values_list('slug', flat=True)[:groups]
+    result += [reverse('posts:group_list', args=[slug]) for slug in slugs]
+    usernames = User.objects.annotate(
+        followers=Count('following')
+    ).order_by('-followers').values_list('username', flat=True)[:profiles]
+    result += [
+        reverse('posts:profile', args=[username]) for username in usernames
+    ]
+    return result
+
+
+def _host():
+    '''Хост для запросов прогрева — первый из ALLOWED_HOSTS.
+
+    Ключ cache_page включает хост, поэтому первым в ALLOWED_HOSTS
+    должен стоять адрес, по которому сайт открывают посетители.
+    '''
+    for host in settings.ALLOWED_HOSTS:
+        host = host.lstrip('.')
+        if host and host != '*':
+            return host
+    return 'localhost'
+
+
+def _start_response(status, headers, exc_info=None):
+    pass
+
+
+def _get(handler, url):
+    # Тестовый Client не годится: он отключает сигнал request_started
+    # для всего процесса, а его хост testserver может быть запрещён.
+    request = RequestFactory(SERVER_NAME=_host()).get(url)
+    response = handler(request.environ, _start_response)
+    response.close()
+    return response
+
+
+def _timed(func, *args):
+    start = time.perf_counter()
+    try:
+        result = func(*args)
+    finally:
+        connections.close_all()
+    return result, time.perf_counter() - start
+
+
+def fetch(handler, url):
+    response, duration = _timed(_get, handler, url)
+    return url, response.status_code, duration
+
+
+def make_thumbnail(name):
+    _, duration = _timed(
+        get_thumbnail, name, POST_THUMBNAIL_GEOMETRY,
+        **POST_THUMBNAIL_OPTIONS
+    )
+    return name, duration
+
+
+def warm_up(pages=None, groups=None, profiles=None, thumbnails=None,
+            workers=None):
+    '''Прогревает страницы и миниатюры.
+
+    Возвращает отчёт: время каждой страницы, число миниатюр
+    и общее время прогрева.
+    '''
+    pages = settings.WARMUP_PAGES if pages is None else pages
+    groups = settings.WARMUP_GROUPS if groups is None else groups
+    profiles = settings.WARMUP_PROFILES if profiles is None else profiles
+    if thumbnails is None:
+        thumbnails = settings.WARMUP_THUMBNAILS
+    start = time.perf_counter()
+    names = Post.objects.exclude(image='').values_list(
+        'image', flat=True
+    )[:thumbnails]
+    with ThreadPoolExecutor(workers or settings.WARMUP_WORKERS) as pool:
+        responses = list(pool.map(
+            partial(fetch, WSGIHandler()), urls(pages, groups, profiles)
+        ))
+        images = list(pool.map(make_thumbnail, names))
+    report = {
+        'pages': responses,
+        'thumbnails': len(images),
+        'duration': time.perf_counter() - start,
+    }
+    logger.info(
+        'Прогрев: страниц %d, миниатюр %d за %.2f с',
+        len(responses), len(images), report['duration'],
+    )
+    return report
+
+
+def warm_up_in_background():
+    '''Прогрев воркера после запуска, не задерживающий его старт'''
+    def run():
+        try:
+            warm_up()
+        except Exception:
+            logger.exception('Прогрев не удался')
+    threading.Thread(target=run, name='warmup', daemon=True).start()
@@ -1,8 +1,106 @@
-from django.contrib import admin
+from datetime import datetime, time, timedelta
+
+from django import forms
+from django.conf import settings
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ActionForm
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.utils import timezone
+
 from .models import Post, Group, Comment
+from . import moderation, search, tasks
+from .utils import EstimatedCountPaginator
+
+
+class PeriodActionForm(ActionForm):
+    '''Период для массовых действий в админке'''
+    date_from = forms.DateField(
+        required=False,
+        label='С',
+        widget=forms.DateInput(attrs={'type': 'date'}),
+    )
+    date_to = forms.DateField(
+        required=False,
+        label='По',
+        widget=forms.DateInput(attrs={'type': 'date'}),
+    )
+
+
+class PostActionForm(PeriodActionForm):
+    group = forms.ModelChoiceField(
+        Group.objects.all(),
+        required=False,
+        label='Группа',
+        widget=AutocompleteSelect(
+            Post._meta.get_field('group').remote_field, admin.site
+        ),
+    )
+
 
+class ModerationMixin:
+    '''Массовые действия пачками SQL-запросов (см. posts.moderation)'''
+    action_form = PeriodActionForm
+    date_field = None
+    # Операция moderation, которой удаляются выбранные записи.
+    delete_operation = None
 
-class PostAdmin(admin.ModelAdmin):
+    def action_params(self, request):
+        form = self.action_form(request.POST)
+        form.is_valid()
+        return form.cleaned_data
+
+    def run_moderation(self, request, queryset, operation, *args,
+                       task_args=()):
+        '''Выполняет операцию сразу или, для большой выборки, в фоне'''
+        count = queryset.count()
+        if count >= settings.MODERATION_BACKGROUND_THRESHOLD:
+            # Задаче передаются id: выборка фиксируется в момент действия.
+            ids = list(queryset.order_by('pk').values_list('pk', flat=True))
+            getattr(tasks, operation).delay(ids, *task_args)
+            self.message_user(
+                request,
+                f'Записей: {count}. Операция выполняется в фоне.',
+            )
+            return
+        done = getattr(moderation, operation)(queryset, *args)
+        self.message_user(request, f'Обработано записей: {done}.')
+
+    def delete_queryset(self, request, queryset):
+        '''«Удалить выбранные» помечает записи удалёнными'''
+        getattr(moderation, self.delete_operation)(queryset)
+
+    def in_date_range(self, request, queryset):
+        '''Сужает выборку до периода из формы действия'''
+        params = self.action_params(request)
+        date_from, date_to = params.get('date_from'), params.get('date_to')
+        if not date_from and not date_to:
+            self.message_user(
+                request, 'Укажите период.', level=messages.ERROR
+            )
+            return None
+        if date_from:
+            queryset = queryset.filter(**{
+                f'{self.date_field}__gte': timezone.make_aware(
+                    datetime.combine(date_from, time.min)
+                ),
+            })
+        if date_to:
+            queryset = queryset.filter(**{
+                f'{self.date_field}__lt': timezone.make_aware(
+                    datetime.combine(date_to + timedelta(days=1), time.min)
+                ),
+            })
+        return queryset
+
+    def by_selected_authors(self, queryset):
+        '''Все записи авторов выбранных записей'''
+        author_ids = set(
+            queryset.order_by().values_list('author_id', flat=True)
+        )
+        return self.model.objects.filter(author_id__in=author_ids)
+
+
+class PostAdmin(ModerationMixin, admin.ModelAdmin):
     list_display = (
         'pk',
         'text',
@@ -11,11 +109,98 @@ class PostAdmin(admin.ModelAdmin):
         'group',
     )
     search_fields = ('text',)
+    # Фильтр с готовыми периодами не выполняет запросов.
     list_filter = ('pub_date',)
     empty_value_display = '-пусто-'
     list_editable = ('group',)
+    list_select_related = ('author', 'group')
+    # Без выпадающих списков всех пользователей и групп в каждой строке.
+    raw_id_fields = ('author',)
+    autocomplete_fields = ('group',)
+    # Навигация по датам использует индекс pub_date.
+    date_hierarchy = 'pub_date'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    action_form = PostActionForm
+    actions = (
+        'reassign_group',
+        'delete_authors_posts',
+        'purge_by_date',
+    )
+    date_field = 'pub_date'
+    delete_operation = 'delete_posts'
+
+    def get_search_results(self, request, queryset, search_term):
+        '''Поиск по полнотекстовому индексу вместо LIKE по всей таблице'''
+        if not search_term:
+            return queryset, False
+        return search.search(search_term, queryset), False
+
+    def reassign_group(self, request, queryset):
+        group = self.action_params(request).get('group')
+        self.run_moderation(
+            request, queryset, 'reassign_group', group,
+            task_args=(group.pk if group else None,),
+        )
+    reassign_group.short_description = (
+        'Перенести выбранные посты в группу (пустая — убрать из группы)'
+    )
+
+    def delete_authors_posts(self, request, queryset):
+        self.run_moderation(
+            request, self.by_selected_authors(queryset), 'delete_posts'
+        )
+    delete_authors_posts.short_description = (
+        'Удалить все посты авторов выбранных постов'
+    )
+
+    def purge_by_date(self, request, queryset):
+        queryset = self.in_date_range(request, queryset)
+        if queryset is not None:
+            self.run_moderation(request, queryset, 'delete_posts')
+    purge_by_date.short_description = 'Удалить выбранные посты за период'
+
+
+class GroupAdmin(admin.ModelAdmin):
+    search_fields = ('title', 'slug')
+
+
+class CommentAdmin(ModerationMixin, admin.ModelAdmin):
+    list_display = (
+        'pk',
+        'text',
+        'created',
+        'author',
+        'post',
+    )
+    list_select_related = ('author', 'post')
+    raw_id_fields = ('author', 'post')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = (
+        'delete_authors_comments',
+        'purge_by_date',
+    )
+    date_field = 'created'
+    delete_operation = 'delete_comments'
+
+    def delete_authors_comments(self, request, queryset):
+        self.run_moderation(
+            request, self.by_selected_authors(queryset), 'delete_comments'
+        )
+    delete_authors_comments.short_description = (
+        'Удалить все комментарии авторов выбранных комментариев'
+    )
+
+    def purge_by_date(self, request, queryset):
+        queryset = self.in_date_range(request, queryset)
+        if queryset is not None:
+            self.run_moderation(request, queryset, 'delete_comments')
+    purge_by_date.short_description = (
+        'Удалить выбранные комментарии за период'
+    )
 
 
 admin.site.register(Post, PostAdmin)
-admin.site.register(Group)
-admin.site.register(Comment)
+admin.site.register(Group, GroupAdmin)
+admin.site.register(Comment, CommentAdmin)
@@ -0,0 +1,231 @@
+"""JSON API только для чтения: те же ленты, что и HTML-страницы.
+
+Ответы строятся из .values() без создания объектов моделей,
+страницы листаются курсором (?cursor=), набор полей задаётся
+параметром ?fields=. Кэширование и условные запросы — те же, что
+у HTML-страниц (см. posts.versions). Как и HTML-страницы, профиль,
+пост и его комментарии читают и архив (см. posts.archive).
+"""
+from functools import wraps
+
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.cache import cache_page
+
+from core.queries import query_budget
+from . import export, follows, versions
+from .models import (
+    ArchivedComment, ArchivedPost, Comment, Group, Post, User,
+)
+from .serializers import (
+    COMMENT_FIELDS, POST_CURSOR_FIELDS, POST_FIELDS, InvalidParameter,
+    parse_fields, serialize_comments, serialize_posts, values,
+)
+from .utils import comments_page, decode_cursor, posts_page
+
+
+def error(message, status=400):
+    return JsonResponse({'error': message}, status=status)
+
+
+def api_view(view_func):
+    '''Неверные параметры запроса — ответ 400 с описанием ошибки'''
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        try:
+            return view_func(request, *args, **kwargs)
+        except InvalidParameter as exc:
+            return error(str(exc))
+    return wrapper
+
+
+def api_login_required(view_func):
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return error('Требуется авторизация', status=401)
+        return view_func(request, *args, **kwargs)
+    return wrapper
+
+
+def api_staff_required(view_func):
+    @wraps(view_func)
+    @api_login_required
+    def wrapper(request, *args, **kwargs):
+        if not request.user.is_staff:
+            return error('Недостаточно прав', status=403)
+        return view_func(request, *args, **kwargs)
+    return wrapper
+
+
+def int_param(request, name, default):
+    try:
+        return int(request.GET.get(name, default))
+    except ValueError:
+        raise InvalidParameter(f'{name} должен быть числом')
+
+
+def cursor_param(request):
+    cursor = request.GET.get('cursor')
+    if not cursor:
+        return None
+    try:
+        return decode_cursor(cursor)
+    except ValueError as exc:
+        raise InvalidParameter(str(exc))
+
+
+def posts_response(request, posts, **extra):
+    '''Страница постов; posts — запрос или список запросов,
+       которые сливаются по дате'''
+    fields = parse_fields(request.GET.get('fields'), POST_FIELDS)
+    if not isinstance(posts, list):
+        posts = [posts]
+    rows, next_cursor = posts_page(
+        [
+            values(queryset, fields, POST_FIELDS, POST_CURSOR_FIELDS)
+            for queryset in posts
+        ],
+        cursor_param(request),
+        max(1, min(
+            int_param(request, 'limit', settings.POSTS_COUNT),
+            settings.API_MAX_LIMIT,
+        )),
+    )
+    return JsonResponse({
+        **extra,
+        'results': serialize_posts(rows, fields),
+        'next': next_cursor,
+    })
+
+
+@query_budget(3)
+@versions.conditional(versions.index_key)
+@cache_page(20, key_prefix='api_index')
+@versions.stamp(versions.index_key)
+@api_view
+def index(request):
+    return posts_response(request, Post.objects.all())
+
+
+@query_budget(4)
+@versions.conditional(versions.group_key)
+@api_view
+def group_posts(request, slug):
+    group_id = Group.objects.filter(slug=slug).values_list(
+        'id', flat=True
+    ).first()
+    if group_id is None:
+        return error('Группа не найдена', status=404)
+    return posts_response(request, Post.objects.filter(group_id=group_id))
+
+
+@query_budget(7)
+@versions.conditional(versions.profile_key)
+@api_view
+def profile(request, username):
+    author = User.objects.filter(username=username).values(
+        'id', 'username', 'first_name', 'last_name'
+    ).first()
+    if author is None:
+        return error('Автор не найден', status=404)
+    author['followers_count'] = follows.followers_count(author['id'])
+    if request.user.is_authenticated:
+        author['following'] = (
+            author['id'] in follows.following_ids(request.user.pk)
+        )
+    author_id = author.pop('id')
+    return posts_response(
+        request,
+        [
+            Post.objects.filter(author_id=author_id),
+            ArchivedPost.objects.filter(author_id=author_id),
+        ],
+        author=author,
+    )
+
+
+@query_budget(5)
+@api_login_required
+@api_view
+def follow_index(request):
+    return posts_response(request, Post.objects.filter(
+        author__following__user=request.user
+    ))
+
+
+@query_budget(7)
+@versions.conditional(versions.post_detail_keys)
+@api_view
+def post_detail(request, post_id):
+    fields = parse_fields(request.GET.get('fields'), POST_FIELDS)
+    for post_model, comment_model in (
+        (Post, Comment), (ArchivedPost, ArchivedComment),
+    ):
+        row = values(
+            post_model.objects.filter(pk=post_id), fields, POST_FIELDS
+        ).first()
+        if row is not None:
+            break
+    else:
+        return error('Пост не найден', status=404)
+    comments, next_cursor = comments_page(
+        comment_model.objects.filter(post_id=post_id).values(
+            *COMMENT_FIELDS.values()
+        )
+    )
+    return JsonResponse({
+        'post': serialize_posts([row], fields)[0],
+        'comments': serialize_comments(comments, list(COMMENT_FIELDS)),
+        'comments_next': next_cursor,
+    })
+
+
+@query_budget(6)
+@versions.conditional(versions.post_key)
+@api_view
+def post_comments(request, post_id):
+    fields = parse_fields(request.GET.get('fields'), COMMENT_FIELDS)
+    after = int_param(request, 'after', 0)
+
+    def page(model):
+        return comments_page(
+            values(
+                model.objects.filter(post_id=post_id),
+                fields, COMMENT_FIELDS, ('id',),
+            ),
+            after,
+        )
+
+    comments, next_cursor = page(Comment)
+    if not comments:
+        # Пустая страница — возможно, пост уже в архиве или удалён.
+        comments, next_cursor = page(ArchivedComment)
+        if not comments and not (
+            Post.objects.filter(pk=post_id).exists()
+            or ArchivedPost.objects.filter(pk=post_id).exists()
+        ):
+            return error('Пост не найден', status=404)
+    return JsonResponse({
+        'results': serialize_comments(comments, fields),
+        'next': next_cursor,
+    })
+
+
+@api_staff_required
+@api_view
+def export_ndjson(request):
+    '''Выгрузка постов и комментариев потоком NDJSON
+       (для сотрудников, ?since= — только новые записи)'''
+    since = request.GET.get('since')
+    if since:
+        try:
+            since = export.parse_since(since)
+        except ValueError as exc:
+            raise InvalidParameter(str(exc))
+    response = StreamingHttpResponse(
+        export.ndjson(since or None),
+        content_type='application/x-ndjson; charset=utf-8',
+    )
+    response['Content-Disposition'] = 'attachment; filename="yatube.ndjson"'
+    return response
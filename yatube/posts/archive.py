@@ -0,0 +1,60 @@
+"""Архив старых постов.
+
+Посты старше ARCHIVE_AFTER_DAYS переносятся командой archive_posts
+вместе с комментариями в таблицы ArchivedPost и ArchivedComment
+с теми же id. Таблицы Post и Comment, по которым строятся главная
+лента, группы и подписки, остаются небольшими. Страница поста
+и профиль автора читают архив прозрачно.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import moderation, search, versions
+from .models import ArchivedComment, ArchivedPost, Comment, Post
+
+POST_FIELDS = ('id', 'text', 'pub_date', 'group_id', 'author_id', 'image')
+COMMENT_FIELDS = ('id', 'post_id', 'author_id', 'text', 'created')
+
+
+def cutoff(days=None):
+    days = settings.ARCHIVE_AFTER_DAYS if days is None else days
+    return timezone.now() - timedelta(days=days)
+
+
+def archive_posts(before, batch_size=None):
+    '''Переносит в архив посты, опубликованные раньше before.
+
+    Возвращает число перенесённых постов и комментариев.
+    '''
+    posts_count = comments_count = 0
+    old_posts = Post.objects.filter(pub_date__lt=before)
+    for batch in moderation.batches(old_posts, batch_size):
+        with transaction.atomic():
+            keys = moderation.feed_keys(batch)
+            ArchivedPost.objects.bulk_create(
+                ArchivedPost(**row)
+                for row in Post.objects.filter(pk__in=batch).values(
+                    *POST_FIELDS
+                )
+            )
+            comments = Comment.objects.filter(post_id__in=batch)
+            comments_count += len(ArchivedComment.objects.bulk_create(
+                (
+                    ArchivedComment(**row)
+                    for row in comments.values(*COMMENT_FIELDS).iterator()
+                ),
+                batch_size=settings.MODERATION_BATCH_SIZE,
+            ))
+            # Удалённые комментарии в архив не попадают.
+            moderation.raw_delete(
+                Comment.all_objects.filter(post_id__in=batch)
+            )
+            posts_count += moderation.raw_delete(
+                Post.objects.filter(pk__in=batch)
+            )
+            search.remove_posts(batch)
+            versions.touch(*keys)
+    return posts_count, comments_count
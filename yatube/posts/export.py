@@ -0,0 +1,106 @@
+"""Потоковая выгрузка постов и комментариев в NDJSON.
+
+Каждая строка — JSON-объект одной записи с полем "model". Записи
+читаются диапазонами первичного ключа, внутри диапазона — через
+.iterator(), так что память не зависит от размера таблиц.
+Инкрементальная выгрузка берёт только записи новее метки since
+(pub_date для постов, created для комментариев).
+
+Архивные посты и комментарии (см. posts.archive) выгружаются вместе
+с остальными, с полем "archived": true; id у них прежние.
+"""
+import json
+import zlib
+from datetime import datetime, time
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import ArchivedComment, ArchivedPost, Comment, Post
+
+BATCH_SIZE = 2000
+
+POST_FIELDS = (
+    'id', 'text', 'pub_date', 'author_id', 'author__username',
+    'group_id', 'group__slug', 'image',
+)
+COMMENT_FIELDS = (
+    'id', 'post_id', 'author_id', 'author__username', 'text', 'created',
+)
+
+
+def parse_since(value):
+    '''Метка выгрузки из даты или даты со временем в ISO 8601'''
+    since = parse_datetime(value)
+    if since is None:
+        date = parse_date(value)
+        if date is None:
+            raise ValueError(f'Неверная дата: {value}')
+        since = datetime.combine(date, time.min)
+    if timezone.is_naive(since):
+        since = timezone.make_aware(since)
+    return since
+
+
+def keyset_rows(queryset, fields, batch_size=BATCH_SIZE):
+    '''Словари записей по возрастанию ключа, диапазонами по batch_size'''
+    last = 0
+    while True:
+        rows = queryset.filter(pk__gt=last).order_by('pk').values(
+            *fields
+        )[:batch_size]
+        count = 0
+        for row in rows.iterator(chunk_size=batch_size):
+            yield row
+            count += 1
+            last = row['id']
+        if count < batch_size:
+            return
+
+
+def records(since=None, batch_size=BATCH_SIZE):
+    '''Записи выгрузки: сначала посты, затем комментарии'''
+    sources = (
+        ('post', Post.objects.all(), 'pub_date', False),
+        ('post', ArchivedPost.objects.all(), 'pub_date', True),
+        (
+            'comment',
+            Comment.objects.filter(post__is_deleted=False),
+            'created',
+            False,
+        ),
+        ('comment', ArchivedComment.objects.all(), 'created', True),
+    )
+    for model, queryset, date_field, archived in sources:
+        if since is not None:
+            queryset = queryset.filter(**{f'{date_field}__gt': since})
+        fields = POST_FIELDS if model == 'post' else COMMENT_FIELDS
+        for row in keyset_rows(queryset, fields, batch_size):
+            if archived:
+                row['archived'] = True
+            yield {'model': model, **row}
+
+
+def ndjson(since=None, batch_size=BATCH_SIZE):
+    '''Строки NDJSON в байтах'''
+    for record in records(since, batch_size):
+        yield json.dumps(
+            record, cls=DjangoJSONEncoder, ensure_ascii=False
+        ).encode() + b'\n'
+
+
+def gzipped(chunks, min_size=64 * 1024):
+    '''Сжимает поток байтов в формат gzip, отдавая куски
+       не меньше min_size'''
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    buffer = []
+    size = 0
+    for chunk in chunks:
+        buffer.append(compressor.compress(chunk))
+        size += len(buffer[-1])
+        if size >= min_size:
+            yield b''.join(buffer)
+            buffer, size = [], 0
+    buffer.append(compressor.flush())
+    yield b''.join(buffer)
@@ -0,0 +1,121 @@
+"""Граф подписок в кэше.
+
+Для каждого пользователя хранится множество id авторов, на которых
+он подписан, для каждого автора — число подписчиков. Проверка
+подписки — поиск в множестве без запроса к базе.
+
+Подписка и отписка — по одному идемпотентному SQL-запросу, которые
+возвращают число изменённых строк, так что кэш обновляется без
+повторного чтения. Записи в Follow через ORM (например, из админки)
+обновляют кэш через сигналы (см. posts.signals).
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+
+from . import versions
+from .models import Follow
+
+
+def following_key(user_id):
+    return f'following:{user_id}'
+
+
+def followers_count_key(author_id):
+    return f'followers_count:{author_id}'
+
+
+def following_ids(user_id) -> frozenset:
+    '''id авторов, на которых подписан пользователь'''
+    key = following_key(user_id)
+    ids = cache.get(key)
+    if ids is None:
+        ids = frozenset(
+            Follow.objects.filter(user_id=user_id).values_list(
+                'author_id', flat=True
+            )
+        )
+        cache.set(key, ids, settings.FOLLOW_GRAPH_TIMEOUT)
+    return ids
+
+
+def is_following(user, author) -> bool:
+    return user.is_authenticated and author.pk in following_ids(user.pk)
+
+
+def followers_count(author_id) -> int:
+    key = followers_count_key(author_id)
+    count = cache.get(key)
+    if count is None:
+        count = Follow.objects.filter(author_id=author_id).count()
+        cache.set(key, count, settings.FOLLOW_GRAPH_TIMEOUT)
+    return count
+
+
+def _execute(sql, params) -> int:
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.rowcount
+
+
+def _columns():
+    quote = connection.ops.quote_name
+    opts = Follow._meta
+    return (
+        quote(opts.db_table),
+        quote(opts.get_field('user').column),
+        quote(opts.get_field('author').column),
+    )
+
+
+def follow(user, author) -> int:
+    '''Подписывает user на author.
+
+    Возвращает число добавленных подписок: 0, если подписка уже была
+    (в том числе при одновременных запросах) или это сам автор.
+    '''
+    if user.pk == author.pk:
+        return 0
+    table, user_column, author_column = _columns()
+    if connection.vendor == 'mysql':
+        sql = (
+            f'INSERT IGNORE INTO {table} ({user_column}, {author_column}) '
+            'VALUES (%s, %s)'
+        )
+    else:
+        sql = (
+            f'INSERT INTO {table} ({user_column}, {author_column}) '
+            'VALUES (%s, %s) ON CONFLICT DO NOTHING'
+        )
+    inserted = _execute(sql, [user.pk, author.pk])
+    if inserted:
+        follow_changed(user.pk, author.pk, inserted)
+        versions.touch(versions.profile_key(author.username))
+    return inserted
+
+
+def unfollow(user, author) -> int:
+    '''Отписывает user от author; возвращает число удалённых подписок'''
+    table, user_column, author_column = _columns()
+    deleted = _execute(
+        f'DELETE FROM {table} '
+        f'WHERE {user_column} = %s AND {author_column} = %s',
+        [user.pk, author.pk],
+    )
+    if deleted:
+        follow_changed(user.pk, author.pk, -deleted)
+        versions.touch(versions.profile_key(author.username))
+    return deleted
+
+
+def follow_changed(user_id, author_id, delta):
+    '''Обновляет кэш после добавления (delta=1)
+       или удаления (delta=-1) подписки'''
+    # Множество пересчитывается при следующем чтении: так
+    # одновременные записи не затирают друг друга.
+    cache.delete(following_key(user_id))
+    try:
+        cache.incr(followers_count_key(author_id), delta)
+    except ValueError:
+        # Счётчика нет в кэше — он будет посчитан при чтении.
+        pass
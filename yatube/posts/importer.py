@@ -0,0 +1,333 @@
+"""Массовый импорт постов из NDJSON или архива tar/zip.
+
+Источник — строки NDJSON вида {"text": ..., "author": "username",
+"group": "slug", "pub_date": "...", "image": "путь/к/файлу"}; подходит
+и выгрузка export_ndjson (её записи комментариев пропускаются). Архив
+содержит файл .ndjson и картинки, на которые ссылаются записи; для
+NDJSON вне архива картинки ищутся рядом с файлом.
+
+Посты создаются пачками через bulk_create, исходная pub_date
+записывается следом одним UPDATE; картинки копируются в хранилище
+пулом потоков. Битые строки, записи без текста или автора, с картинкой
+вне источника, отсутствующей или не являющейся изображением
+пропускаются до записи в базу, о каждой сообщается. Авторы
+и группы ищутся по словарям, которые дополняются одним запросом на
+пачку. bulk_create не вызывает сигналов, поэтому поисковый индекс,
+версии лент и миниатюры обновляются здесь.
+"""
+import gzip
+import io
+import json
+import os
+import tarfile
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.validators import get_available_image_extensions
+from django.db import connections, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from PIL import Image
+from sorl.thumbnail import get_thumbnail
+
+from . import search, versions
+from .models import Group, Post
+from .tasks import POST_THUMBNAIL_GEOMETRY, POST_THUMBNAIL_OPTIONS
+
+User = get_user_model()
+
+UPLOAD_TO = Post._meta.get_field('image').upload_to
+IMAGE_EXTENSIONS = {
+    f'.{extension.lower()}' for extension in get_available_image_extensions()
+}
+
+
+class DirectorySource:
+    '''NDJSON-файл (можно .gz), картинки — относительно его каталога'''
+
+    def __init__(self, path):
+        self.path = path
+        self.base = os.path.dirname(os.path.realpath(path))
+
+    def lines(self):
+        opener = gzip.open if self.path.endswith('.gz') else open
+        with opener(self.path, 'rb') as file:
+            yield from file
+
+    def full_path(self, name):
+        '''Путь к картинке или None, если он ведёт за пределы
+           каталога источника'''
+        path = os.path.realpath(os.path.join(self.base, name))
+        if not path.startswith(self.base + os.sep):
+            return None
+        return path
+
+    def exists(self, name):
+        path = self.full_path(name)
+        return path is not None and os.path.isfile(path)
+
+    def reader(self, name):
+        # Файлы на диске можно читать из потоков пула.
+        path = self.full_path(name)
+
+        def read():
+            with open(path, 'rb') as file:
+                return file.read()
+        return read
+
+    def close(self):
+        pass
+
+
+class TarSource:
+    def __init__(self, path):
+        self.archive = tarfile.open(path)
+        self.members = {
+            member.name: member for member in self.archive.getmembers()
+        }
+
+    def lines(self):
+        for name in sorted(self.members):
+            if name.endswith('.ndjson'):
+                yield from self.archive.extractfile(self.members[name])
+
+    def exists(self, name):
+        return name in self.members and self.members[name].isfile()
+
+    def reader(self, name):
+        # Архив читается только из основного потока.
+        data = self.archive.extractfile(self.members[name]).read()
+        return lambda: data
+
+    def close(self):
+        self.archive.close()
+
+
+class ZipSource:
+    def __init__(self, path):
+        self.archive = zipfile.ZipFile(path)
+        self.names = set(self.archive.namelist())
+
+    def lines(self):
+        for name in sorted(self.archive.namelist()):
+            if name.endswith('.ndjson'):
+                with self.archive.open(name) as file:
+                    yield from io.BufferedReader(file)
+
+    def exists(self, name):
+        return name in self.names
+
+    def reader(self, name):
+        data = self.archive.read(name)
+        return lambda: data
+
+    def close(self):
+        self.archive.close()
+
+
+@contextmanager
+def open_source(path):
+    if zipfile.is_zipfile(path):
+        source = ZipSource(path)
+    elif not path.endswith(('.ndjson', '.ndjson.gz')) and (
+        tarfile.is_tarfile(path)
+    ):
+        source = TarSource(path)
+    else:
+        source = DirectorySource(path)
+    try:
+        yield source
+    finally:
+        source.close()
+
+
+def _read_image(read):
+    '''Содержимое картинки или None, если это не изображение
+       (проверка Pillow, как у ImageField)'''
+    if read is None:
+        return None
+    data = read()
+    try:
+        Image.open(io.BytesIO(data)).verify()
+    except Exception:
+        return None
+    return data
+
+
+def _save_image(name, data):
+    if not name:
+        return ''
+    return default_storage.save(
+        UPLOAD_TO + os.path.basename(name), ContentFile(data)
+    )
+
+
+def _make_thumbnail(name):
+    try:
+        get_thumbnail(name, POST_THUMBNAIL_GEOMETRY, **POST_THUMBNAIL_OPTIONS)
+    finally:
+        connections.close_all()
+
+
+class PostImporter:
+    def __init__(self, batch_size=500, workers=4, create_authors=False,
+                 log=None):
+        self.batch_size = batch_size
+        self.workers = workers
+        self.create_authors = create_authors
+        self.log = log or (lambda message: None)
+        self.authors = {}
+        self.groups = {}
+        self.feed_keys = {versions.index_key()}
+        self.stats = {'posts': 0, 'skipped': 0, 'images': 0}
+        # Сохранённые картинки — для миниатюр после импорта.
+        self.images = []
+
+    def run(self, path, thumbnails=False):
+        with open_source(path) as source, ThreadPoolExecutor(
+            self.workers
+        ) as pool:
+            batch = []
+            for number, line in enumerate(source.lines(), 1):
+                record = self.parse(line, number)
+                if record is None:
+                    continue
+                batch.append(record)
+                if len(batch) == self.batch_size:
+                    self.import_batch(batch, source, pool)
+                    batch = []
+            self.import_batch(batch, source, pool)
+            if thumbnails:
+                list(pool.map(_make_thumbnail, self.images))
+        versions.touch(*self.feed_keys)
+        return self.stats
+
+    def parse(self, line, number):
+        '''Запись из строки NDJSON; None — строку нужно пропустить'''
+        line = line.strip()
+        if not line:
+            return None
+        try:
+            record = json.loads(line)
+            if record.get('model', 'post') != 'post':
+                return None
+            return {
+                'text': record['text'],
+                'author': record.get(
+                    'author', record.get('author__username')
+                ),
+                'group': record.get('group', record.get('group__slug')),
+                'pub_date': record.get('pub_date'),
+                'image': record.get('image') or '',
+            }
+        except (ValueError, KeyError, AttributeError) as error:
+            self.skip(f'строка {number} не разобрана ({error!r})')
+            return None
+
+    def resolve(self, batch):
+        '''Дополняет словари авторов и групп одним запросом на пачку'''
+        usernames = {r['author'] for r in batch} - set(self.authors)
+        self.authors.update(User.objects.filter(
+            username__in=usernames
+        ).values_list('username', 'pk'))
+        missing = usernames - set(self.authors)
+        if missing and self.create_authors:
+            users = [User(username=username) for username in missing]
+            for user in users:
+                user.set_unusable_password()
+            User.objects.bulk_create(users)
+            self.authors.update(User.objects.filter(
+                username__in=missing
+            ).values_list('username', 'pk'))
+        slugs = {r['group'] for r in batch if r['group']} - set(self.groups)
+        self.groups.update(Group.objects.filter(
+            slug__in=slugs
+        ).values_list('slug', 'pk'))
+
+    def skip(self, problem):
+        self.stats['skipped'] += 1
+        self.log(f'Запись пропущена: {problem}')
+
+    def check(self, record, source):
+        '''Можно ли импортировать запись; о пропуске сообщается'''
+        image = record['image']
+        if record['author'] not in self.authors:
+            problem = f'нет автора {record["author"]}'
+        elif image and not source.exists(image):
+            problem = f'нет картинки {image}'
+        elif image and (
+            os.path.splitext(image)[1].lower() not in IMAGE_EXTENSIONS
+        ):
+            problem = f'картинка {image} — не изображение'
+        else:
+            return True
+        self.skip(problem)
+        return False
+
+    def import_batch(self, batch, source, pool):
+        if not batch:
+            return
+        self.resolve(batch)
+        records = [record for record in batch if self.check(record, source)]
+        contents = pool.map(_read_image, [
+            source.reader(record['image']) if record['image'] else None
+            for record in records
+        ])
+        checked = []
+        for record, data in zip(records, contents):
+            if record['image'] and data is None:
+                self.skip(f'картинка {record["image"]} — не изображение')
+            else:
+                checked.append((record, data))
+        records = [record for record, _ in checked]
+        images = pool.map(
+            _save_image,
+            [record['image'] for record in records],
+            [data for _, data in checked],
+        )
+        posts = []
+        for record, image in zip(records, images):
+            pub_date = parse_datetime(record['pub_date'] or '')
+            if pub_date and timezone.is_naive(pub_date):
+                pub_date = timezone.make_aware(pub_date)
+            posts.append(Post(
+                text=record['text'],
+                author_id=self.authors[record['author']],
+                group_id=self.groups.get(record['group']),
+                pub_date=pub_date or timezone.now(),
+                image=image,
+            ))
+            if image:
+                self.stats['images'] += 1
+                self.images.append(image)
+            self.feed_keys.add(versions.profile_key(record['author']))
+            if record['group'] in self.groups:
+                self.feed_keys.add(versions.group_key(record['group']))
+        if posts:
+            with transaction.atomic():
+                self.create(posts)
+            search.index_posts([(post.pk, post.text) for post in posts])
+        self.stats['posts'] += len(posts)
+        self.log(f'Импортировано постов: {self.stats["posts"]}')
+
+    def create(self, posts):
+        '''Создаёт посты пачкой с датами из источника'''
+        pub_dates = [post.pub_date for post in posts]
+        # auto_now_add заменяет pub_date текущим временем.
+        Post.objects.bulk_create(posts)
+        if posts[0].pk is None:
+            # База не возвращает ключи вставленных строк (SQLite).
+            # Пишущая транзакция держит блокировку базы, поэтому
+            # последние ключи таблицы — ключи этой пачки.
+            ids = Post.all_objects.order_by('-pk').values_list(
+                'pk', flat=True
+            )[:len(posts)]
+            for post, pk in zip(posts, reversed(list(ids))):
+                post.pk = pk
+        for post, pub_date in zip(posts, pub_dates):
+            post.pub_date = pub_date
+        Post.objects.bulk_update(posts, ['pub_date'])
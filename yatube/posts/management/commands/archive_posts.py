@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from posts import archive
+
+
+class Command(BaseCommand):
+    help = 'Переносит старые посты с комментариями в архивные таблицы'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than', type=int, default=settings.ARCHIVE_AFTER_DAYS,
+            help='Возраст постов в днях',
+        )
+        parser.add_argument(
+            '--batch-size', type=int,
+            default=settings.MODERATION_BATCH_SIZE,
+            help='Сколько постов переносить за одну транзакцию',
+        )
+
+    def handle(self, *args, **options):
+        posts, comments = archive.archive_posts(
+            archive.cutoff(options['older_than']), options['batch_size']
+        )
+        self.stdout.write(
+            f'В архив перенесено постов: {posts}, комментариев: {comments}'
+        )
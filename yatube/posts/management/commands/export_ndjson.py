@@ -0,0 +1,48 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import export
+
+
+class Command(BaseCommand):
+    help = 'Выгружает посты и комментарии в NDJSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--since',
+            help='Выгрузить только записи новее даты (ISO 8601)',
+        )
+        parser.add_argument(
+            '--output', '-o', default='-',
+            help='Файл выгрузки; по умолчанию стандартный вывод',
+        )
+        parser.add_argument(
+            '--gzip', action='store_true',
+            help='Сжать выгрузку gzip',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=export.BATCH_SIZE,
+            help='Сколько записей читать одним запросом',
+        )
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            try:
+                since = export.parse_since(options['since'])
+            except ValueError as exc:
+                raise CommandError(exc)
+        chunks = export.ndjson(since, options['batch_size'])
+        if options['gzip']:
+            chunks = export.gzipped(chunks)
+        if options['output'] == '-':
+            self.write(sys.stdout.buffer, chunks)
+        else:
+            with open(options['output'], 'wb') as file:
+                self.write(file, chunks)
+
+    def write(self, file, chunks):
+        for chunk in chunks:
+            file.write(chunk)
+        file.flush()
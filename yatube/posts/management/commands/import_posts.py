@@ -0,0 +1,47 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts.importer import PostImporter
+
+
+class Command(BaseCommand):
+    help = 'Импортирует посты с картинками из NDJSON или архива tar/zip'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'source',
+            help='Файл .ndjson (.ndjson.gz) или архив tar/zip',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Сколько постов создавать одним запросом',
+        )
+        parser.add_argument(
+            '--workers', type=int, default=4,
+            help='Число потоков, копирующих картинки',
+        )
+        parser.add_argument(
+            '--thumbnails', action='store_true',
+            help='Сразу построить миниатюры картинок',
+        )
+        parser.add_argument(
+            '--create-authors', action='store_true',
+            help='Создать неизвестных авторов без пароля '
+                 '(иначе их посты пропускаются)',
+        )
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        importer = PostImporter(
+            batch_size=options['batch_size'],
+            workers=options['workers'],
+            create_authors=options['create_authors'],
+            log=lambda message: self.stderr.write(message),
+        )
+        stats = importer.run(options['source'], options['thumbnails'])
+        self.stdout.write(
+            f'Постов: {stats["posts"]}, картинок: {stats["images"]}, '
+            f'пропущено: {stats["skipped"]}, '
+            f'за {time.perf_counter() - start:.1f} с'
+        )
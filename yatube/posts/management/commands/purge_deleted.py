@@ -0,0 +1,31 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from posts import moderation
+
+
+class Command(BaseCommand):
+    help = 'Стирает из базы посты и комментарии, удалённые давно'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than', type=int, default=settings.PURGE_AFTER_DAYS,
+            help='Сколько дней назад записи должны быть удалены',
+        )
+        parser.add_argument(
+            '--batch-size', type=int,
+            default=settings.MODERATION_BATCH_SIZE,
+            help='Сколько записей стирать за одну транзакцию',
+        )
+
+    def handle(self, *args, **options):
+        posts, comments = moderation.purge_deleted(
+            timezone.now() - timedelta(days=options['older_than']),
+            options['batch_size'],
+        )
+        self.stdout.write(
+            f'Стёрто постов: {posts}, комментариев: {comments}'
+        )
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import search
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает полнотекстовый индекс постов'
+
+    def handle(self, *args, **options):
+        if not search.fts_supported():
+            raise CommandError(
+                'База не поддерживает FTS5, поиск работает без индекса'
+            )
+        search.create_index()
+        count = search.rebuild()
+        self.stdout.write(f'Проиндексировано постов: {count}')
@@ -0,0 +1,27 @@
+from django.db import migrations
+
+from posts import search
+
+
+def create_search_index(apps, schema_editor):
+    if not search.fts_supported(schema_editor.connection):
+        return
+    search.create_index(schema_editor.connection)
+    Post = apps.get_model('posts', 'Post')
+    search.rebuild(Post.objects.all(), schema_editor.connection)
+
+
+def drop_search_index(apps, schema_editor):
+    if search.fts_supported(schema_editor.connection):
+        search.drop_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0009_follow_unique'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,22 @@
+from django.db import migrations
+from django.utils import timezone
+
+
+def tombstone_comments(apps, schema_editor):
+    '''Комментарии постов, удалённых до этой миграции, тоже
+       помечаются удалёнными'''
+    Comment = apps.get_model('posts', 'Comment')
+    Comment.objects.filter(
+        is_deleted=False, post__is_deleted=True
+    ).update(is_deleted=True, deleted_at=timezone.now())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0012_soft_delete'),
+    ]
+
+    operations = [
+        migrations.RunPython(tombstone_comments, migrations.RunPython.noop),
+    ]
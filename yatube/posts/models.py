@@ -1,16 +1,28 @@
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from core.models import SoftDeleteModel
 
 User = get_user_model()
 
 
-class Post(models.Model):
+class Post(SoftDeleteModel):
     class Meta:
         ordering = ['-pub_date']
+        indexes = [
+            # Ленты выбирают неудалённые посты по дате.
+            models.Index(fields=['is_deleted', '-pub_date']),
+        ]
 
     def __str__(self) -> str:
         return self.text[:15]
 
+    def delete(self, using=None, keep_parents=False):
+        '''Помечает удалёнными пост вместе с комментариями'''
+        self.comments.update(is_deleted=True, deleted_at=timezone.now())
+        return super().delete(using=using, keep_parents=keep_parents)
+
     text = models.TextField(
         verbose_name='Текст поста',
         help_text='Введите текст поста',
@@ -53,7 +65,12 @@ class Group(models.Model):
     description = models.TextField()
 
 
-class Comment(models.Model):
+class Comment(SoftDeleteModel):
+    class Meta:
+        indexes = [
+            models.Index(fields=['post', 'is_deleted']),
+        ]
+
     post = models.ForeignKey(
         Post,
         on_delete=models.CASCADE,
@@ -81,10 +98,12 @@ class Comment(models.Model):
 
 class Follow(models.Model):
     class Meta:
-        models.UniqueConstraint(
-            fields=['user', 'author'],
-            name='author_and_user_unique'
-        )
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'author'],
+                name='author_and_user_unique'
+            ),
+        ]
     user = models.ForeignKey(
         User,
         blank=True,
@@ -101,3 +120,68 @@ class Follow(models.Model):
         related_name='following',
         verbose_name='Автор'
     )
+
+
+class ArchivedPost(models.Model):
+    """Пост старше ARCHIVE_AFTER_DAYS, перенесённый из Post
+    командой archive_posts. id сохраняется, ссылки на пост
+    продолжают работать."""
+    class Meta:
+        ordering = ['-pub_date']
+
+    def __str__(self) -> str:
+        return self.text[:15]
+
+    id = models.IntegerField(primary_key=True)
+    text = models.TextField(
+        verbose_name='Текст поста',
+    )
+    pub_date = models.DateTimeField(
+        verbose_name='Дата публикации',
+        db_index=True,
+    )
+    group = models.ForeignKey(
+        Group,
+        on_delete=models.CASCADE,
+        related_name='archived_posts',
+        null=True,
+        blank=True,
+        verbose_name='Группа поста',
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='archived_posts',
+        blank=True,
+        null=True,
+        verbose_name='Автор поста',
+    )
+    image = models.ImageField(
+        verbose_name='Картинка',
+        upload_to='posts/',
+        blank=True,
+    )
+
+
+class ArchivedComment(models.Model):
+    """Комментарий к архивному посту."""
+    id = models.IntegerField(primary_key=True)
+    post = models.ForeignKey(
+        ArchivedPost,
+        on_delete=models.CASCADE,
+        related_name='comments',
+        verbose_name='Пост',
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='archived_comments',
+        verbose_name='Автор',
+    )
+    text = models.TextField(
+        verbose_name='Текст комментария',
+    )
+    created = models.DateTimeField(
+        verbose_name='Дата публикации комментария',
+        db_index=True,
+    )
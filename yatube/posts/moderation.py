@@ -0,0 +1,183 @@
+"""Массовые операции модерации над постами и комментариями.
+
+Записи обрабатываются пачками по MODERATION_BATCH_SIZE: id пачки
+выбираются по возрастанию ключа, затем одна пачка меняется одним
+UPDATE или DELETE без загрузки объектов и без сигналов. Поэтому всё,
+что обычно делают сигналы (версии лент, поисковый индекс), делается
+здесь для каждой пачки.
+
+Удаление только помечает записи удалёнными; строки вместе с файлами
+картинок удаляет purge_deleted спустя PURGE_AFTER_DAYS.
+
+Операции над большой выборкой выполняются в фоне (см. posts.tasks):
+задаче передаются id записей выборки.
+"""
+import logging
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+from sorl.thumbnail import delete as delete_image
+
+from . import search, versions
+from .models import ArchivedPost, Comment, Post
+
+logger = logging.getLogger('yatube.moderation')
+
+
+def chunks(ids, size=None):
+    '''Список id частями для условий pk__in'''
+    size = size or settings.MODERATION_BATCH_SIZE
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+
+def batches(queryset, size=None):
+    '''id записей выборки пачками по возрастанию'''
+    size = size or settings.MODERATION_BATCH_SIZE
+    ids = queryset.order_by('pk').values_list('pk', flat=True)
+    last = None
+    while True:
+        batch = ids.filter(pk__gt=last) if last is not None else ids
+        batch = list(batch[:size])
+        if not batch:
+            return
+        yield batch
+        last = batch[-1]
+
+
+def raw_delete(queryset):
+    # Один DELETE без сбора связанных объектов и без сигналов.
+    return queryset._raw_delete(queryset.db)
+
+
+def feed_keys(post_ids):
+    '''Ленты, в которых выводятся посты post_ids'''
+    keys = {versions.index_key()}
+    keys.update(versions.post_key(post_id) for post_id in post_ids)
+    rows = Post.objects.filter(pk__in=post_ids).values_list(
+        'author__username', 'group__slug'
+    ).distinct()
+    for username, slug in rows:
+        if username:
+            keys.add(versions.profile_key(username))
+        if slug:
+            keys.add(versions.group_key(slug))
+    return keys
+
+
+def _run(name, queryset, process, size=None):
+    done = 0
+    for batch in batches(queryset, size):
+        with transaction.atomic():
+            done += process(batch)
+        logger.info('%s: обработано %d', name, done)
+    return done
+
+
+def reassign_group(posts, group):
+    '''Переносит посты в группу group (None — убрать из групп)'''
+    def process(batch):
+        keys = feed_keys(batch)
+        if group is not None:
+            keys.add(versions.group_key(group.slug))
+        count = Post.objects.filter(pk__in=batch).update(group=group)
+        versions.touch(*keys)
+        return count
+    return _run('reassign_group', posts, process)
+
+
+def tombstone(queryset):
+    '''Помечает записи выборки удалёнными одним UPDATE'''
+    return queryset.update(is_deleted=True, deleted_at=timezone.now())
+
+
+def delete_posts(posts):
+    '''Помечает посты удалёнными вместе с их комментариями'''
+    def process(batch):
+        keys = feed_keys(batch)
+        tombstone(Comment.objects.filter(post_id__in=batch))
+        count = tombstone(Post.objects.filter(pk__in=batch))
+        search.remove_posts(batch)
+        versions.touch(*keys)
+        return count
+    return _run('delete_posts', posts, process)
+
+
+def delete_comments(comments):
+    def process(batch):
+        post_ids = set(
+            Comment.objects.filter(pk__in=batch).values_list(
+                'post_id', flat=True
+            )
+        )
+        count = tombstone(Comment.objects.filter(pk__in=batch))
+        versions.touch(*(versions.post_key(pk) for pk in post_ids))
+        return count
+    return _run('delete_comments', comments, process)
+
+
+def delete_user_content(user):
+    '''Блокирует пользователя и помечает удалёнными его посты
+       и комментарии; подписки удаляются сразу'''
+    user.is_active = False
+    user.save(update_fields=('is_active',))
+    delete_posts(Post.objects.filter(author=user))
+    delete_comments(Comment.objects.filter(author=user))
+    # Подписки удаляются по одной, чтобы сигналы обновили кэш подписок.
+    for follow in user.follower.all():
+        follow.delete()
+    for follow in user.following.all():
+        follow.delete()
+
+
+def _delete_unused_images(names):
+    '''Удаляет файлы и миниатюры картинок, на которые больше
+       не ссылается ни один пост'''
+    names = set(names)
+    in_use = set(
+        Post.all_objects.filter(image__in=names).values_list(
+            'image', flat=True
+        )
+    ) | set(
+        ArchivedPost.objects.filter(image__in=names).values_list(
+            'image', flat=True
+        )
+    )
+    for name in names - in_use:
+        if default_storage.exists(name):
+            delete_image(name)
+
+
+def purge_deleted(before, size=None):
+    '''Физически удаляет помеченные до before посты и комментарии.
+
+    Возвращает число удалённых постов и комментариев.
+    '''
+    comments = _run(
+        'purge_comments',
+        Comment.all_objects.filter(is_deleted=True, deleted_at__lt=before),
+        lambda batch: raw_delete(Comment.all_objects.filter(pk__in=batch)),
+        size,
+    )
+
+    images = []
+
+    def process(batch):
+        posts = Post.all_objects.filter(pk__in=batch)
+        images.extend(
+            posts.exclude(image='').values_list('image', flat=True)
+        )
+        raw_delete(Comment.all_objects.filter(post_id__in=batch))
+        return raw_delete(posts)
+
+    posts = _run(
+        'purge_posts',
+        Post.all_objects.filter(is_deleted=True, deleted_at__lt=before),
+        process,
+        size,
+    )
+    # Файлы удаляются после того, как строки удалены.
+    _delete_unused_images(images)
+    return posts, comments
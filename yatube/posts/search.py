@@ -0,0 +1,268 @@
+"""Полнотекстовый поиск по постам.
+
+Текст поста разбивается на слова, слова приводятся к основе
+стеммером Портера для русского языка (Snowball), и основы
+записываются в инвертированный индекс — виртуальную таблицу SQLite
+FTS5. Запрос обрабатывается так же, поэтому «подписки» находят пост
+со словом «подписка».
+
+Индекс обновляется сигналами при сохранении и удалении поста
+(см. posts.signals). Если база не поддерживает FTS5, поиск идёт
+по основам через LIKE без индекса.
+"""
+import re
+from functools import lru_cache
+
+from django.db import connection
+
+from .models import Post
+
+TABLE = 'posts_post_fts'
+BATCH_SIZE = 1000
+
+WORD_RE = re.compile(r'\w+')
+
+VOWELS = 'аеиоуыэюя'
+
+PERFECTIVE_GERUND = (
+    ('вшись', True), ('ившись', False), ('ывшись', False),
+    ('вши', True), ('ивши', False), ('ывши', False),
+    ('в', True), ('ив', False), ('ыв', False),
+)
+ADJECTIVE = (
+    'ее', 'ие', 'ые', 'ое', 'ими', 'ыми', 'ей', 'ий', 'ый', 'ой', 'ем',
+    'им', 'ым', 'ом', 'его', 'ого', 'ему', 'ому', 'их', 'ых', 'ую',
+    'юю', 'ая', 'яя', 'ою', 'ею',
+)
+PARTICIPLE = (
+    ('ем', True), ('нн', True), ('вш', True), ('ющ', True), ('щ', True),
+    ('ивш', False), ('ывш', False), ('ующ', False),
+)
+REFLEXIVE = (('ся', False), ('сь', False))
+VERB = tuple(
+    (ending, True) for ending in (
+        'ла', 'на', 'ете', 'йте', 'ли', 'й', 'л', 'ем', 'н', 'ло', 'но',
+        'ет', 'ют', 'ны', 'ть', 'ешь', 'нно',
+    )
+) + tuple(
+    (ending, False) for ending in (
+        'ила', 'ыла', 'ена', 'ейте', 'уйте', 'ите', 'или', 'ыли', 'ей',
+        'уй', 'ил', 'ыл', 'им', 'ым', 'ен', 'ило', 'ыло', 'ено', 'ят',
+        'ует', 'уют', 'ит', 'ыт', 'ены', 'ить', 'ыть', 'ишь', 'ую', 'ю',
+    )
+)
+NOUN = tuple((ending, False) for ending in (
+    'а', 'ев', 'ов', 'ие', 'ье', 'е', 'иями', 'ями', 'ами', 'еи', 'ии',
+    'и', 'ией', 'ей', 'ой', 'ий', 'й', 'иям', 'ям', 'ием', 'ем', 'ам',
+    'ом', 'о', 'у', 'ах', 'иях', 'ях', 'ы', 'ь', 'ию', 'ью', 'ю', 'ия',
+    'ья', 'я',
+))
+ADJECTIVAL = tuple(
+    (participle + adjective, after_a)
+    for participle, after_a in PARTICIPLE
+    for adjective in ADJECTIVE
+) + tuple((adjective, False) for adjective in ADJECTIVE)
+
+
+def _by_length(endings):
+    return sorted(endings, key=lambda item: -len(item[0]))
+
+
+PERFECTIVE_GERUND = _by_length(PERFECTIVE_GERUND)
+ADJECTIVAL = _by_length(ADJECTIVAL)
+REFLEXIVE = _by_length(REFLEXIVE)
+VERB = _by_length(VERB)
+NOUN = _by_length(NOUN)
+
+
+def _strip(word, endings):
+    '''Отрезает самое длинное подходящее окончание или возвращает None.
+
+    Окончания с флагом должны следовать за «а» или «я».
+    '''
+    for ending, after_a in endings:
+        if not word.endswith(ending):
+            continue
+        rest = word[:-len(ending)]
+        if after_a and not rest.endswith(('а', 'я')):
+            continue
+        return rest
+    return None
+
+
+def _region(word, start):
+    '''Начало области после первой пары «гласная, согласная»'''
+    for i in range(start + 1, len(word)):
+        if word[i] not in VOWELS and word[i - 1] in VOWELS:
+            return i + 1
+    return len(word)
+
+
+def stem(word):
+    '''Основа русского слова по алгоритму Snowball'''
+    word = word.lower().replace('ё', 'е')
+    rv = next(
+        (i + 1 for i, letter in enumerate(word) if letter in VOWELS),
+        len(word),
+    )
+    r2 = _region(word, _region(word, 0))
+    prefix, rest = word[:rv], word[rv:]
+    rest = _strip_inflection(rest)
+    # Шаг 2.
+    if rest.endswith('и'):
+        rest = rest[:-1]
+    # Шаг 3: словообразовательный суффикс в области R2.
+    if rest.endswith(('ост', 'ость')):
+        suffix = 4 if rest.endswith('ость') else 3
+        if rv + len(rest) - suffix >= r2:
+            rest = rest[:-suffix]
+    return prefix + _strip_superlative(rest)
+
+
+def _strip_inflection(rest):
+    '''Шаг 1: окончания деепричастий, прилагательных, глаголов
+       и существительных'''
+    stripped = _strip(rest, PERFECTIVE_GERUND)
+    if stripped is not None:
+        return stripped
+    unreflexive = _strip(rest, REFLEXIVE)
+    if unreflexive is not None:
+        rest = unreflexive
+    for endings in (ADJECTIVAL, VERB, NOUN):
+        stripped = _strip(rest, endings)
+        if stripped is not None:
+            return stripped
+    return rest
+
+
+def _strip_superlative(rest):
+    '''Шаг 4: превосходная степень, двойное «н» и мягкий знак'''
+    if rest.endswith('нн'):
+        rest = rest[:-1]
+    else:
+        for superlative in ('ейше', 'ейш'):
+            if rest.endswith(superlative):
+                rest = rest[:-len(superlative)]
+                if rest.endswith('нн'):
+                    rest = rest[:-1]
+                break
+        else:
+            if rest.endswith('ь'):
+                rest = rest[:-1]
+    return rest
+
+
+def terms(text):
+    '''Основы слов текста в порядке появления'''
+    return [stem(word) for word in WORD_RE.findall(text.lower())]
+
+
+def index_text(text):
+    '''Текст, который хранится в индексе для поста'''
+    return ' '.join(terms(text))
+
+
+@lru_cache(maxsize=None)
+def _fts_supported(vendor):
+    if vendor != 'sqlite':
+        return False
+    import sqlite3
+    probe = sqlite3.connect(':memory:')
+    try:
+        probe.execute('CREATE VIRTUAL TABLE probe USING fts5(body)')
+    except sqlite3.OperationalError:
+        return False
+    finally:
+        probe.close()
+    return True
+
+
+def fts_supported(conn=connection):
+    '''Есть ли у базы полнотекстовый индекс FTS5'''
+    return _fts_supported(conn.vendor)
+
+
+def create_index(conn=connection):
+    with conn.cursor() as cursor:
+        cursor.execute(
+            f'CREATE VIRTUAL TABLE IF NOT EXISTS {TABLE} USING fts5(body)'
+        )
+
+
+def drop_index(conn=connection):
+    with conn.cursor() as cursor:
+        cursor.execute(f'DROP TABLE IF EXISTS {TABLE}')
+
+
+def index_posts(rows, conn=connection):
+    '''Записывает в индекс пары (id поста, текст)'''
+    if not fts_supported(conn):
+        return
+    rows = [(post_id, index_text(text)) for post_id, text in rows]
+    with conn.cursor() as cursor:
+        cursor.executemany(
+            f'DELETE FROM {TABLE} WHERE rowid = %s',
+            [(post_id,) for post_id, _ in rows],
+        )
+        cursor.executemany(
+            f'INSERT INTO {TABLE} (rowid, body) VALUES (%s, %s)', rows
+        )
+
+
+def index_post(post):
+    index_posts([(post.pk, post.text)])
+
+
+def remove_posts(post_ids):
+    if not fts_supported():
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'DELETE FROM {TABLE} WHERE rowid = %s',
+            [(post_id,) for post_id in post_ids],
+        )
+
+
+def remove_post(post_id):
+    remove_posts([post_id])
+
+
+def rebuild(posts=None, conn=connection):
+    '''Пересобирает индекс; возвращает число проиндексированных постов'''
+    if not fts_supported(conn):
+        return 0
+    if posts is None:
+        posts = Post.objects.all()
+    with conn.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {TABLE}')
+    batch, count = [], 0
+    for row in posts.values_list('id', 'text').iterator(BATCH_SIZE):
+        batch.append(row)
+        if len(batch) == BATCH_SIZE:
+            index_posts(batch, conn)
+            count, batch = count + len(batch), []
+    index_posts(batch, conn)
+    return count + len(batch)
+
+
+def search(query, posts=None):
+    '''Посты, содержащие все слова запроса (с учётом словоформ)'''
+    if posts is None:
+        posts = Post.objects.all()
+    query_terms = [term for term in terms(query) if term]
+    if not query_terms:
+        return posts.none()
+    if not fts_supported():
+        for term in query_terms:
+            posts = posts.filter(text__icontains=term)
+        return posts
+    # Каждая основа ищется как префикс: «подпис»* находит и «подписка»,
+    # и «подписчики».
+    match = ' '.join(f'"{term}"*' for term in query_terms)
+    return posts.extra(
+        where=[
+            f'{Post._meta.db_table}.id IN '
+            f'(SELECT rowid FROM {TABLE} WHERE {TABLE} MATCH %s)'
+        ],
+        params=[match],
+    )
@@ -0,0 +1,66 @@
+"""Сериализация постов и комментариев для JSON API.
+
+Поля API сопоставлены полям запроса .values(): ответ строится
+из словарей без создания объектов моделей, а клиент может запросить
+только нужные поля параметром ?fields=id,text.
+"""
+from django.conf import settings
+
+POST_FIELDS = {
+    'id': 'id',
+    'text': 'text',
+    'pub_date': 'pub_date',
+    'author': 'author__username',
+    'group': 'group__slug',
+    'image': 'image',
+}
+
+COMMENT_FIELDS = {
+    'id': 'id',
+    'text': 'text',
+    'created': 'created',
+    'author': 'author__username',
+}
+
+# Поля, без которых не построить курсор следующей страницы.
+POST_CURSOR_FIELDS = ('id', 'pub_date')
+
+
+class InvalidParameter(ValueError):
+    '''Неверный параметр запроса API'''
+
+
+def parse_fields(value, field_map):
+    '''Поля из параметра ?fields= (все, если параметр не задан)'''
+    if not value:
+        return list(field_map)
+    fields = [field.strip() for field in value.split(',') if field.strip()]
+    unknown = set(fields) - set(field_map)
+    if unknown:
+        raise InvalidParameter(
+            'Неизвестные поля: ' + ', '.join(sorted(unknown))
+        )
+    return fields
+
+
+def values(queryset, fields, field_map, required=()):
+    '''Запрос словарей с полями fields (и служебными полями required)'''
+    columns = {field_map[field] for field in (*fields, *required)}
+    return queryset.values(*columns)
+
+
+def serialize(row, fields, field_map):
+    data = {field: row[field_map[field]] for field in fields}
+    if 'image' in data:
+        data['image'] = (
+            settings.MEDIA_URL + data['image'] if data['image'] else None
+        )
+    return data
+
+
+def serialize_posts(rows, fields):
+    return [serialize(row, fields, POST_FIELDS) for row in rows]
+
+
+def serialize_comments(rows, fields):
+    return [serialize(row, fields, COMMENT_FIELDS) for row in rows]
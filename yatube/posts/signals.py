@@ -0,0 +1,85 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import follows, search, tasks, versions
+from .models import Comment, Follow, Group, Post
+
+
+@receiver(pre_save, sender=Post)
+def remember_old_values(sender, instance, **kwargs):
+    '''Запоминает прежние группу и картинку: при смене группы
+       меняются обе ленты, при смене картинки нужна новая миниатюра'''
+    instance._old_group_slug = instance._old_image = None
+    if instance.pk:
+        instance._old_group_slug, instance._old_image = (
+            Post.objects.filter(pk=instance.pk).values_list(
+                'group__slug', 'image'
+            ).first() or (None, None)
+        )
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def touch_post_feeds(sender, instance, **kwargs):
+    keys = [versions.index_key(), versions.post_key(instance.pk)]
+    if instance.group_id:
+        keys.append(versions.group_key(instance.group.slug))
+    old_group_slug = getattr(instance, '_old_group_slug', None)
+    if old_group_slug:
+        keys.append(versions.group_key(old_group_slug))
+    if instance.author_id:
+        keys.append(versions.profile_key(instance.author.username))
+    versions.touch(*keys)
+
+
+@receiver(post_save, sender=Post)
+def enqueue_post_processing(sender, instance, created, **kwargs):
+    '''Миниатюра нужна только постам с картинкой: новым
+       или с заменённой картинкой'''
+    if not instance.image:
+        return
+    if created or instance.image.name != instance._old_image:
+        tasks.process_saved_post.delay(instance.pk)
+
+
+@receiver(post_save, sender=Post)
+def index_post(sender, instance, **kwargs):
+    if instance.is_deleted:
+        search.remove_post(instance.pk)
+    else:
+        search.index_post(instance)
+
+
+@receiver(post_delete, sender=Post)
+def unindex_post(sender, instance, **kwargs):
+    search.remove_post(instance.pk)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def touch_comment_feeds(sender, instance, **kwargs):
+    versions.touch(versions.post_key(instance.post_id))
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def touch_group_feed(sender, instance, **kwargs):
+    versions.touch(versions.group_key(instance.slug))
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def touch_profile_feed(sender, instance, **kwargs):
+    if instance.author_id:
+        versions.touch(versions.profile_key(instance.author.username))
+
+
+@receiver(post_save, sender=Follow)
+def add_to_follow_graph(sender, instance, created, **kwargs):
+    if created:
+        follows.follow_changed(instance.user_id, instance.author_id, 1)
+
+
+@receiver(post_delete, sender=Follow)
+def remove_from_follow_graph(sender, instance, **kwargs):
+    follows.follow_changed(instance.user_id, instance.author_id, -1)
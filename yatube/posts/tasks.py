@@ -0,0 +1,41 @@
+from sorl.thumbnail import get_thumbnail
+
+from core.tasks import task
+from . import moderation
+from .models import Comment, Group, Post
+
+# Миниатюра, которую выводят шаблоны posts/includes/post.html
+# и posts/post_detail.html.
+POST_THUMBNAIL_GEOMETRY = '960x339'
+POST_THUMBNAIL_OPTIONS = {'crop': 'center', 'upscale': True}
+
+
+@task
+def process_saved_post(post_id):
+    '''Побочные работы после сохранения поста'''
+    post = Post.objects.filter(pk=post_id).first()
+    if post is None:
+        return
+    if post.image:
+        get_thumbnail(
+            post.image, POST_THUMBNAIL_GEOMETRY, **POST_THUMBNAIL_OPTIONS
+        )
+
+
+@task
+def reassign_group(ids, group_id):
+    group = Group.objects.get(pk=group_id) if group_id else None
+    for chunk in moderation.chunks(ids):
+        moderation.reassign_group(Post.objects.filter(pk__in=chunk), group)
+
+
+@task
+def delete_posts(ids):
+    for chunk in moderation.chunks(ids):
+        moderation.delete_posts(Post.objects.filter(pk__in=chunk))
+
+
+@task
+def delete_comments(ids):
+    for chunk in moderation.chunks(ids):
+        moderation.delete_comments(Comment.objects.filter(pk__in=chunk))
@@ -0,0 +1,73 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+
+from posts.models import Group, Post
+from posts.utils import EstimatedCountPaginator
+
+User = get_user_model()
+
+
+class PostAdminTests(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='admin'
+        )
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+
+    def setUp(self) -> None:
+        self.client.force_login(self.user)
+
+    def test_changelist_without_group_choices(self) -> None:
+        '''В строках списка нет выпадающего списка всех групп'''
+        Post.objects.create(text='Пост', author=self.user, group=self.group)
+        Group.objects.create(
+            title='Другая группа', slug='other-slug', description=''
+        )
+        response = self.client.get(reverse('admin:posts_post_changelist'))
+        self.assertContains(response, 'Тестовая группа')
+        self.assertNotContains(response, 'Другая группа')
+
+    def test_search_without_words(self) -> None:
+        '''Поиск без слов даёт пустой список, а не ошибку'''
+        Post.objects.create(text='Пост', author=self.user)
+        response = self.client.get(
+            reverse('admin:posts_post_changelist'), {'q': '!!!'}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['cl'].result_count, 0)
+
+    def test_estimated_count(self) -> None:
+        '''Для большой таблицы без фильтров число постов оценивается,
+           для отфильтрованного запроса — считается'''
+        posts = [
+            Post.objects.create(text=f'Пост №{i}', author=self.user)
+            for i in range(3)
+        ]
+        posts[0].delete()
+        paginator = EstimatedCountPaginator(Post.objects.all(), 10)
+        paginator.threshold = 0
+        # Без статистики SQLite число считается точно.
+        self.assertEqual(paginator.count, 2)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        Post.all_objects.filter(pk=posts[1].pk).delete()
+        paginator = EstimatedCountPaginator(Post.objects.all(), 10)
+        paginator.threshold = 0
+        # Оценка берётся из статистики на момент ANALYZE.
+        self.assertEqual(paginator.count, 3)
+        paginator = EstimatedCountPaginator(
+            Post.objects.filter(author=self.user), 10
+        )
+        paginator.threshold = 0
+        self.assertEqual(paginator.count, 1)
+        self.assertEqual(
+            EstimatedCountPaginator(Post.objects.all(), 10).count, 1
+        )
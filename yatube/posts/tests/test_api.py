@@ -0,0 +1,113 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class ApiTests(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='TestUser')
+        cls.author = User.objects.create_user(username='TestAuthor')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.posts = [
+            Post.objects.create(
+                text=f'Тестовый пост №{i}',
+                author=cls.author,
+                group=cls.group if i % 2 else None,
+            )
+            for i in range(5)
+        ]
+        Comment.objects.create(
+            text='Тестовый комментарий', post=cls.posts[0], author=cls.user
+        )
+        Follow.objects.create(user=cls.user, author=cls.author)
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def test_cursor_pagination(self) -> None:
+        '''Лента листается курсором до конца без пропусков и повторов'''
+        ids, cursor = [], None
+        while True:
+            params = {'limit': 2}
+            if cursor:
+                params['cursor'] = cursor
+            data = self.client.get(reverse('api:index'), params).json()
+            self.assertLessEqual(len(data['results']), 2)
+            ids += [post['id'] for post in data['results']]
+            cursor = data['next']
+            if cursor is None:
+                break
+        self.assertEqual(ids, [post.pk for post in reversed(self.posts)])
+
+    def test_sparse_fields(self) -> None:
+        '''?fields= возвращает только запрошенные поля'''
+        data = self.client.get(
+            reverse('api:group_list', args=[self.group.slug]),
+            {'fields': 'text,author'},
+        ).json()
+        self.assertEqual(data['results'][0], {
+            'text': self.posts[3].text,
+            'author': self.author.username,
+        })
+        self.assertEqual(len(data['results']), 2)
+
+    def test_bad_parameters(self) -> None:
+        '''Неизвестные поля и испорченный курсор — ответ 400'''
+        for params in ({'fields': 'password'}, {'cursor': 'xxx'}):
+            with self.subTest(params=params):
+                response = self.client.get(reverse('api:index'), params)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('error', response.json())
+
+    def test_profile_and_follow(self) -> None:
+        '''Профиль и лента подписок повторяют HTML-страницы'''
+        self.client.force_login(self.user)
+        data = self.client.get(
+            reverse('api:profile', args=[self.author.username])
+        ).json()
+        self.assertEqual(data['author']['followers_count'], 1)
+        self.assertTrue(data['author']['following'])
+        self.assertEqual(len(data['results']), len(self.posts))
+        data = self.client.get(reverse('api:follow_index')).json()
+        self.assertEqual(len(data['results']), len(self.posts))
+
+    def test_follow_requires_login(self) -> None:
+        response = self.client.get(reverse('api:follow_index'))
+        self.assertEqual(response.status_code, 401)
+
+    def test_post_detail(self) -> None:
+        '''Пост отдаётся с первой страницей комментариев'''
+        data = self.client.get(
+            reverse('api:post_detail', args=[self.posts[0].pk])
+        ).json()
+        self.assertEqual(data['post']['text'], self.posts[0].text)
+        self.assertEqual(data['post']['image'], None)
+        self.assertEqual(
+            data['comments'][0]['author'], self.user.username
+        )
+        self.assertIsNone(data['comments_next'])
+        response = self.client.get(reverse('api:post_detail', args=[0]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_conditional_get(self) -> None:
+        '''API отвечает 304, пока лента не изменилась'''
+        url = reverse('api:group_list', args=[self.group.slug])
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        Post.objects.create(
+            text='Новый пост', author=self.author, group=self.group
+        )
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
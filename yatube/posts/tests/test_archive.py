@@ -0,0 +1,143 @@
+import io
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.models import ArchivedComment, ArchivedPost, Comment, Post
+from yatube.settings import ARCHIVE_AFTER_DAYS, POSTS_COUNT
+
+User = get_user_model()
+
+
+class ArchiveTests(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='TestAuthor')
+        cls.old_posts = [
+            Post.objects.create(text=f'Старый пост №{i}', author=cls.author)
+            for i in range(POSTS_COUNT)
+        ]
+        Post.objects.filter(pk__in=[p.pk for p in cls.old_posts]).update(
+            pub_date=timezone.now() - timedelta(days=ARCHIVE_AFTER_DAYS + 1)
+        )
+        cls.new_posts = [
+            Post.objects.create(text=f'Новый пост №{i}', author=cls.author)
+            for i in range(3)
+        ]
+        cls.comment = Comment.objects.create(
+            text='Тестовый комментарий',
+            post=cls.old_posts[0],
+            author=cls.author,
+        )
+
+    def setUp(self) -> None:
+        cache.clear()
+        call_command('archive_posts', stdout=io.StringIO())
+
+    def test_old_posts_moved(self) -> None:
+        '''Старые посты и их комментарии переносятся в архив
+           с прежними id'''
+        self.assertEqual(
+            set(Post.objects.all()), set(self.new_posts)
+        )
+        self.assertEqual(
+            set(ArchivedPost.objects.values_list('pk', flat=True)),
+            {post.pk for post in self.old_posts},
+        )
+        self.assertEqual(
+            ArchivedComment.objects.get().pk, self.comment.pk
+        )
+        self.assertFalse(Comment.objects.exists())
+
+    def test_index_shows_hot_posts_only(self) -> None:
+        response = self.client.get(reverse('posts:index'))
+        self.assertEqual(
+            list(response.context['page_obj']), self.new_posts[::-1]
+        )
+
+    def test_archived_post_detail(self) -> None:
+        '''Архивный пост открывается по прежней ссылке с комментариями'''
+        response = self.client.get(
+            reverse('posts:post_detail', args=[self.old_posts[0].pk])
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['archived'])
+        self.assertEqual(
+            response.context['post'].author_posts_count,
+            POSTS_COUNT + len(self.new_posts),
+        )
+        self.assertEqual(
+            [c.pk for c in response.context['comments']], [self.comment.pk]
+        )
+
+    def test_profile_chains_archive(self) -> None:
+        '''В профиле после новых постов идут архивные'''
+        url = reverse('posts:profile', args=[self.author.username])
+        response = self.client.get(url)
+        self.assertEqual(
+            response.context['count'], POSTS_COUNT + len(self.new_posts)
+        )
+        first_page = list(response.context['page_obj'])
+        self.assertEqual(first_page[:3], self.new_posts[::-1])
+        self.assertIsInstance(first_page[3], ArchivedPost)
+        response = self.client.get(url, {'page': 2})
+        self.assertEqual(len(response.context['page_obj']), 3)
+
+    def test_profile_merges_by_date(self) -> None:
+        '''Живой пост старше архивных (например, импортированный)
+           выводится в профиле по дате'''
+        old = Post.objects.create(text='Импортированный', author=self.author)
+        Post.objects.filter(pk=old.pk).update(
+            pub_date=timezone.now() - timedelta(days=ARCHIVE_AFTER_DAYS * 2)
+        )
+        url = reverse('posts:profile', args=[self.author.username])
+        response = self.client.get(url, {'page': 2})
+        posts = list(response.context['page_obj'])
+        self.assertEqual(posts[-1].pk, old.pk)
+        dates = [post.pub_date for post in posts]
+        self.assertEqual(dates, sorted(dates, reverse=True))
+
+    @override_settings(
+        QUERY_INSPECTION_ENABLED=True, QUERY_INSPECTION_RAISE=True
+    )
+    def test_api_reads_archive(self) -> None:
+        '''API отдаёт архивный пост, его комментарии и профиль
+           с архивными постами, слитыми по дате'''
+        old = Post.objects.create(text='Импортированный', author=self.author)
+        Post.objects.filter(pk=old.pk).update(
+            pub_date=timezone.now() - timedelta(days=ARCHIVE_AFTER_DAYS * 2)
+        )
+        archived = self.old_posts[0]
+        response = self.client.get(
+            reverse('api:post_detail', args=[archived.pk])
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['post']['id'], archived.pk)
+        self.assertEqual(
+            [c['id'] for c in response.json()['comments']], [self.comment.pk]
+        )
+        response = self.client.get(
+            reverse('api:post_comments', args=[archived.pk])
+        )
+        self.assertEqual(
+            [c['id'] for c in response.json()['results']], [self.comment.pk]
+        )
+        url = reverse('api:profile', args=[self.author.username])
+        ids, cursor = [], None
+        while True:
+            data = self.client.get(
+                url, {'limit': 4, **({'cursor': cursor} if cursor else {})}
+            ).json()
+            ids += [post['id'] for post in data['results']]
+            cursor = data['next']
+            if cursor is None:
+                break
+        self.assertEqual(len(ids), POSTS_COUNT + len(self.new_posts) + 1)
+        self.assertEqual(ids[-1], old.pk)
+        self.assertEqual(ids[:3], [p.pk for p in self.new_posts[::-1]])
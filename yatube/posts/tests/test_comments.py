@@ -0,0 +1,73 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from posts.models import Comment, Post
+from yatube.settings import COMMENTS_COUNT
+
+User = get_user_model()
+
+
+class CommentPaginationTests(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='TestUser')
+        cls.post = Post.objects.create(
+            text='Тестовый пост',
+            author=cls.user,
+        )
+        cls.more_comments_count = 5
+        Comment.objects.bulk_create(
+            Comment(
+                text=f'Тестовый комментарий №{i}',
+                post=cls.post,
+                author=cls.user,
+            )
+            for i in range(COMMENTS_COUNT + cls.more_comments_count)
+        )
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def test_first_page_inline(self) -> None:
+        '''На странице поста выводится первая страница комментариев'''
+        response = self.client.get(
+            reverse('posts:post_detail', args=[self.post.pk])
+        )
+        comments = response.context['comments']
+        self.assertEqual(len(comments), COMMENTS_COUNT)
+        self.assertEqual(response.context['next_cursor'], comments[-1].id)
+        self.assertContains(
+            response,
+            f'?after={comments[-1].id}',
+        )
+
+    def test_next_page_fragment(self) -> None:
+        '''Следующая страница отдаётся фрагментом без ссылки «ещё»'''
+        first_page = self.client.get(
+            reverse('posts:post_detail', args=[self.post.pk])
+        )
+        response = self.client.get(
+            reverse('posts:post_comments', args=[self.post.pk]),
+            {'after': first_page.context['next_cursor']},
+        )
+        self.assertEqual(
+            len(response.context['comments']), self.more_comments_count
+        )
+        self.assertNotContains(response, 'data-comments-more')
+        self.assertNotContains(response, '<html')
+
+    def test_json_page(self) -> None:
+        '''Комментарии отдаются в JSON с курсором следующей страницы'''
+        url = reverse('posts:post_comments', args=[self.post.pk])
+        with self.assertNumQueries(1):
+            data = self.client.get(url, {'format': 'json'}).json()
+        self.assertEqual(len(data['comments']), COMMENTS_COUNT)
+        self.assertEqual(data['comments'][0]['author__username'], 'TestUser')
+        data = self.client.get(
+            url, {'format': 'json', 'after': data['next']}
+        ).json()
+        self.assertEqual(len(data['comments']), self.more_comments_count)
+        self.assertIsNone(data['next'])
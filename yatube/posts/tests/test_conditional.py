@@ -0,0 +1,74 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from http import HTTPStatus
+
+from posts.models import Comment, Group, Post
+
+User = get_user_model()
+
+
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+        )
+        cls.user = User.objects.create_user(username='TestUser')
+        cls.post = Post.objects.create(
+            text='Тестовый пост',
+            author=cls.user,
+            group=cls.group,
+        )
+        cls.urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', args=[cls.group.slug]),
+            reverse('posts:profile', args=[cls.user.username]),
+            reverse('posts:post_detail', args=[cls.post.pk]),
+        )
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def test_not_modified_without_queries(self) -> None:
+        '''Неизменившаяся страница отдаётся как 304 без запросов к базе'''
+        for url in self.urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertTrue(response.has_header('Last-Modified'))
+                with self.assertNumQueries(0):
+                    response = self.client.get(
+                        url, HTTP_IF_NONE_MATCH=response['ETag']
+                    )
+                self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+
+    def test_changes_invalidate_etag(self) -> None:
+        '''Новый пост и комментарий меняют ETag лент'''
+        etags = {url: self.client.get(url)['ETag'] for url in self.urls}
+        Comment.objects.create(
+            text='Тестовый комментарий',
+            post=self.post,
+            author=self.user,
+        )
+        Post.objects.create(
+            text='Тестовый пост №2',
+            author=self.user,
+            group=self.group,
+        )
+        for url, etag in etags.items():
+            with self.subTest(url=url):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_etag_depends_on_user(self) -> None:
+        '''Авторизованный пользователь не получает чужую версию страницы'''
+        url = reverse('posts:profile', args=[self.user.username])
+        etag = self.client.get(url)['ETag']
+        authorized_client = Client()
+        authorized_client.force_login(self.user)
+        response = authorized_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertFalse(response.has_header('Last-Modified'))
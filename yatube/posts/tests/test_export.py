@@ -0,0 +1,102 @@
+import gzip
+import json
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from posts import archive, export
+from posts.models import Comment, Post
+
+User = get_user_model()
+
+TEMP_EXPORT_DIR = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+class ExportTests(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='TestUser')
+        cls.staff = User.objects.create_user(
+            username='Staff', is_staff=True
+        )
+        cls.posts = [
+            Post.objects.create(text=f'Тестовый пост №{i}', author=cls.user)
+            for i in range(5)
+        ]
+        cls.comment = Comment.objects.create(
+            text='Тестовый комментарий', post=cls.posts[0], author=cls.user
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_EXPORT_DIR, ignore_errors=True)
+
+    def parse(self, content):
+        return [json.loads(line) for line in content.splitlines()]
+
+    def test_all_rows_in_small_batches(self) -> None:
+        '''Все записи выгружаются и при чтении маленькими диапазонами'''
+        records = self.parse(b''.join(export.ndjson(batch_size=2)))
+        self.assertEqual(
+            [(record['model'], record['id']) for record in records],
+            [('post', post.pk) for post in self.posts]
+            + [('comment', self.comment.pk)],
+        )
+        self.assertEqual(records[0]['text'], self.posts[0].text)
+        self.assertEqual(records[-1]['author__username'], 'TestUser')
+
+    def test_archived_rows(self) -> None:
+        '''Архивные посты и комментарии выгружаются с пометкой'''
+        Post.objects.filter(pk=self.posts[0].pk).update(
+            pub_date=timezone.now() - timedelta(days=400)
+        )
+        archive.archive_posts(archive.cutoff(365))
+        records = list(export.records())
+        archived = [
+            (record['model'], record['id']) for record in records
+            if record.get('archived')
+        ]
+        self.assertEqual(archived, [
+            ('post', self.posts[0].pk), ('comment', self.comment.pk),
+        ])
+        self.assertEqual(len(records), 6)
+
+    def test_incremental_gzip_command(self) -> None:
+        '''Команда выгружает записи новее метки в файл gzip'''
+        Post.objects.filter(pk__in=[p.pk for p in self.posts[:3]]).update(
+            pub_date=timezone.now() - timedelta(days=2)
+        )
+        Comment.objects.update(created=timezone.now() - timedelta(days=2))
+        path = os.path.join(TEMP_EXPORT_DIR, 'export.ndjson.gz')
+        since = (timezone.now() - timedelta(days=1)).date().isoformat()
+        call_command('export_ndjson', since=since, output=path, gzip=True)
+        with gzip.open(path) as file:
+            records = self.parse(file.read())
+        self.assertEqual(
+            [record['id'] for record in records],
+            [post.pk for post in self.posts[3:]],
+        )
+
+    def test_endpoint_for_staff_only(self) -> None:
+        '''Выгрузка по HTTP доступна только сотрудникам'''
+        url = reverse('api:export')
+        self.assertEqual(self.client.get(url).status_code, 401)
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.client.force_login(self.staff)
+        response = self.client.get(url)
+        self.assertTrue(response.streaming)
+        records = self.parse(b''.join(response.streaming_content))
+        self.assertEqual(len(records), len(self.posts) + 1)
+        response = self.client.get(url, {'since': 'вчера'})
+        self.assertEqual(response.status_code, 400)
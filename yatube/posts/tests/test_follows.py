@@ -0,0 +1,113 @@
+import threading
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase, TransactionTestCase
+from django.urls import reverse
+
+from posts import follows
+from posts.models import Follow
+
+User = get_user_model()
+
+
+class FollowGraphTests(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='TestUser')
+        cls.other_user = User.objects.create_user(username='OtherUser')
+        cls.author = User.objects.create_user(username='TestAuthor')
+        cls.authorized_client = Client()
+        cls.authorized_client.force_login(cls.user)
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def test_follow_when_author_has_followers(self) -> None:
+        '''Можно подписаться на автора, у которого уже есть подписчики'''
+        Follow.objects.create(user=self.other_user, author=self.author)
+        self.authorized_client.get(
+            reverse('posts:profile_follow', args=[self.author.username])
+        )
+        self.assertTrue(
+            Follow.objects.filter(user=self.user, author=self.author).exists()
+        )
+
+    def test_cache_follows_writes(self) -> None:
+        '''Кэш подписок и счётчик подписчиков обновляются при записи'''
+        self.assertEqual(follows.following_ids(self.user.pk), frozenset())
+        self.assertEqual(follows.followers_count(self.author.pk), 0)
+        self.authorized_client.get(
+            reverse('posts:profile_follow', args=[self.author.username])
+        )
+        with self.assertNumQueries(1):
+            self.assertTrue(follows.is_following(self.user, self.author))
+        with self.assertNumQueries(0):
+            self.assertTrue(follows.is_following(self.user, self.author))
+            self.assertEqual(follows.followers_count(self.author.pk), 1)
+        self.authorized_client.get(
+            reverse('posts:profile_unfollow', args=[self.author.username])
+        )
+        self.assertFalse(follows.is_following(self.user, self.author))
+        self.assertEqual(follows.followers_count(self.author.pk), 0)
+
+    def test_follow_is_idempotent(self) -> None:
+        '''Повторная подписка и отписка ничего не меняют'''
+        self.assertEqual(follows.follow(self.user, self.author), 1)
+        self.assertEqual(follows.follow(self.user, self.author), 0)
+        self.assertEqual(follows.followers_count(self.author.pk), 1)
+        self.assertEqual(follows.unfollow(self.user, self.author), 1)
+        self.assertEqual(follows.unfollow(self.user, self.author), 0)
+        self.assertEqual(follows.followers_count(self.author.pk), 0)
+
+    def test_cannot_follow_self(self) -> None:
+        '''Нельзя подписаться на себя'''
+        self.assertFalse(follows.follow(self.user, self.user))
+        self.assertFalse(Follow.objects.filter(user=self.user).exists())
+
+
+class ConcurrentFollowTests(TransactionTestCase):
+    THREADS_COUNT = 8
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.user = User.objects.create_user(username='TestUser')
+        self.author = User.objects.create_user(username='TestAuthor')
+        self.clients = []
+        for _ in range(self.THREADS_COUNT):
+            client = Client()
+            client.force_login(self.user)
+            self.clients.append(client)
+
+    def test_concurrent_follow_creates_one_row(self) -> None:
+        '''Одновременные запросы на подписку создают одну подписку'''
+        url = reverse('posts:profile_follow', args=[self.author.username])
+        barrier = threading.Barrier(self.THREADS_COUNT)
+        errors = []
+
+        def hammer(client):
+            try:
+                barrier.wait()
+                for _ in range(5):
+                    client.get(url)
+            except Exception as error:
+                errors.append(error)
+            finally:
+                connection.close()
+
+        threads = [
+            threading.Thread(target=hammer, args=(client,))
+            for client in self.clients
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(
+            Follow.objects.filter(user=self.user, author=self.author).count(),
+            1,
+        )
+        self.assertEqual(follows.followers_count(self.author.pk), 1)
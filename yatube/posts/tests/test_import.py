@@ -0,0 +1,177 @@
+import io
+import json
+import os
+import shutil
+import tarfile
+import tempfile
+import zipfile
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from posts import search
+from posts.models import Group, Post
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ImportPostsTests(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='TestAuthor')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.records = [
+            {
+                'text': 'Импортированный пост с картинкой',
+                'author': 'TestAuthor',
+                'group': 'test-slug',
+                'pub_date': '2020-01-02T03:04:05+00:00',
+                'image': 'images/small.gif',
+            },
+            {
+                'text': 'Пост из выгрузки',
+                'author__username': 'TestAuthor',
+                'pub_date': '2021-01-01T00:00:00+00:00',
+            },
+            {'text': 'Пост нового автора', 'author': 'Newcomer'},
+            {'model': 'comment', 'text': 'Комментарий'},
+        ]
+        cls.ndjson = ''.join(
+            json.dumps(record, ensure_ascii=False) + '\n'
+            for record in cls.records
+        ).encode()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def write_tar(self, path):
+        with tarfile.open(path, 'w') as archive:
+            for name, data in (
+                ('posts.ndjson', self.ndjson),
+                ('images/small.gif', SMALL_GIF),
+            ):
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                archive.addfile(info, io.BytesIO(data))
+
+    def test_import_tar(self) -> None:
+        '''Посты из архива создаются с исходной датой, группой,
+           картинкой и попадают в поисковый индекс'''
+        path = os.path.join(TEMP_MEDIA_ROOT, 'import.tar')
+        self.write_tar(path)
+        call_command(
+            'import_posts', path, batch_size=2,
+            stdout=io.StringIO(), stderr=io.StringIO(),
+        )
+        post = Post.objects.get(text=self.records[0]['text'])
+        self.assertEqual(post.group, self.group)
+        self.assertEqual(post.pub_date.year, 2020)
+        self.assertTrue(post.image.name.startswith('posts/small'))
+        self.assertEqual(post.image.read(), SMALL_GIF)
+        self.assertEqual(
+            Post.objects.get(text='Пост из выгрузки').author, self.author
+        )
+        # Посты неизвестного автора пропускаются, комментарии — тоже.
+        self.assertEqual(Post.objects.count(), 2)
+        self.assertEqual(list(search.search('картинки')), [post])
+
+    def test_import_zip_creates_authors(self) -> None:
+        '''С --create-authors неизвестные авторы создаются'''
+        path = os.path.join(TEMP_MEDIA_ROOT, 'import.zip')
+        with zipfile.ZipFile(path, 'w') as archive:
+            archive.writestr('posts.ndjson', self.ndjson)
+            archive.writestr('images/small.gif', SMALL_GIF)
+        call_command(
+            'import_posts', path, create_authors=True,
+            stdout=io.StringIO(), stderr=io.StringIO(),
+        )
+        self.assertEqual(Post.objects.count(), 3)
+        newcomer = User.objects.get(username='Newcomer')
+        self.assertFalse(newcomer.has_usable_password())
+        self.assertEqual(newcomer.posts.count(), 1)
+
+    def test_missing_image_skipped(self) -> None:
+        '''Запись с отсутствующей картинкой пропускается, остальные
+           импортируются'''
+        path = os.path.join(TEMP_MEDIA_ROOT, 'broken.ndjson')
+        with open(path, 'wb') as file:
+            file.write(self.ndjson)
+        err = io.StringIO()
+        call_command('import_posts', path, stdout=io.StringIO(), stderr=err)
+        self.assertEqual(
+            list(Post.objects.values_list('text', flat=True)),
+            ['Пост из выгрузки'],
+        )
+        self.assertIn('нет картинки images/small.gif', err.getvalue())
+        self.assertTrue(Post._meta.get_field('pub_date').auto_now_add)
+
+    def test_unsafe_images_skipped(self) -> None:
+        '''Картинки вне каталога источника и файлы, которые
+           не являются изображениями, не копируются в media'''
+        base = tempfile.mkdtemp(dir=TEMP_MEDIA_ROOT)
+        with open(os.path.join(base, 'fake.gif'), 'w') as file:
+            file.write('<script>alert(1)</script>')
+        with open(os.path.join(base, 'page.html'), 'wb') as file:
+            file.write(SMALL_GIF)
+        images = [
+            os.path.join(settings.BASE_DIR, 'yatube', 'settings.py'),
+            '../import.tar',
+            'fake.gif',
+            'page.html',
+        ]
+        path = os.path.join(base, 'unsafe.ndjson')
+        with open(path, 'w') as file:
+            for image in images:
+                file.write(json.dumps({
+                    'text': 'Пост', 'author': 'TestAuthor', 'image': image,
+                }) + '\n')
+        media = os.path.join(TEMP_MEDIA_ROOT, 'posts')
+        os.makedirs(media, exist_ok=True)
+        files = set(os.listdir(media))
+        err = io.StringIO()
+        call_command('import_posts', path, stdout=io.StringIO(), stderr=err)
+        self.assertFalse(Post.objects.exists())
+        self.assertEqual(err.getvalue().count('Запись пропущена'), 4)
+        self.assertEqual(set(os.listdir(media)), files)
+
+    def test_bad_lines_skipped(self) -> None:
+        '''Битая строка и запись без текста пропускаются с номером
+           строки, остальные импортируются'''
+        path = os.path.join(TEMP_MEDIA_ROOT, 'bad.ndjson')
+        with open(path, 'w') as file:
+            file.write('{"text": "Первый", "author": "TestAuthor"}\n')
+            file.write('{не json\n')
+            file.write('{"author": "TestAuthor"}\n')
+            file.write('{"text": "Последний", "author": "TestAuthor"}\n')
+        err = io.StringIO()
+        call_command(
+            'import_posts', path, batch_size=1,
+            stdout=io.StringIO(), stderr=err,
+        )
+        self.assertEqual(
+            set(Post.objects.values_list('text', flat=True)),
+            {'Первый', 'Последний'},
+        )
+        self.assertIn('строка 2 не разобрана', err.getvalue())
+        self.assertIn('строка 3 не разобрана', err.getvalue())
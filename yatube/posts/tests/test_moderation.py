@@ -0,0 +1,118 @@
+import json
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core import tasks
+from core.models import Task
+from posts import moderation, search, versions
+from posts.models import Comment, Group, Post
+
+User = get_user_model()
+
+
+class ModerationActionsTests(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='admin'
+        )
+        cls.spammer = User.objects.create_user(username='Spammer')
+        cls.author = User.objects.create_user(username='TestAuthor')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.client.force_login(self.admin)
+        self.spam = [
+            Post.objects.create(text=f'Спам №{i}', author=self.spammer)
+            for i in range(3)
+        ]
+        self.post = Post.objects.create(text='Пост', author=self.author)
+        Comment.objects.create(
+            text='Спам', post=self.post, author=self.spammer
+        )
+        Comment.objects.create(
+            text='Спам', post=self.spam[0], author=self.author
+        )
+
+    def act(self, model, action, objects, **params):
+        return self.client.post(
+            reverse(f'admin:posts_{model}_changelist'),
+            {
+                'action': action,
+                '_selected_action': [obj.pk for obj in objects],
+                **params,
+            },
+        )
+
+    def test_batches(self) -> None:
+        '''Выборка разбивается на пачки id по возрастанию'''
+        ids = sorted(Post.objects.values_list('pk', flat=True))
+        self.assertEqual(
+            list(moderation.batches(Post.objects.all(), size=3)),
+            [ids[:3], ids[3:]],
+        )
+
+    def test_reassign_group(self) -> None:
+        '''Выбранные посты переносятся в группу, лента группы меняется'''
+        versions.touch(versions.group_key(self.group.slug))
+        old_version = versions.get_version(versions.group_key(self.group.slug))
+        self.act('post', 'reassign_group', self.spam[:2], group=self.group.pk)
+        self.assertEqual(
+            set(self.group.posts.all()), set(self.spam[:2])
+        )
+        self.assertGreater(
+            versions.get_version(versions.group_key(self.group.slug)),
+            old_version,
+        )
+
+    def test_delete_authors_posts(self) -> None:
+        '''Все посты автора помечаются удалёнными и пропадают
+           из поискового индекса'''
+        self.act('post', 'delete_authors_posts', self.spam[:1])
+        self.assertEqual(list(Post.objects.all()), [self.post])
+        self.assertEqual(Post.all_objects.filter(is_deleted=True).count(), 3)
+        self.assertFalse(search.search('спам').exists())
+
+    def test_purge_by_date(self) -> None:
+        '''Удаляются выбранные посты только за указанный период'''
+        Post.objects.filter(pk=self.spam[0].pk).update(
+            pub_date=timezone.now() - timedelta(days=10)
+        )
+        today = timezone.now().date()
+        self.act(
+            'post', 'purge_by_date', Post.objects.all(),
+            date_from=today - timedelta(days=1), date_to=today,
+        )
+        self.assertEqual(list(Post.objects.all()), [self.spam[0]])
+
+    def test_delete_authors_comments(self) -> None:
+        '''Удаляются все комментарии автора'''
+        comment = Comment.objects.get(author=self.spammer)
+        self.act('comment', 'delete_authors_comments', [comment])
+        self.assertFalse(Comment.objects.filter(author=self.spammer).exists())
+        self.assertEqual(Comment.objects.count(), 1)
+
+    @override_settings(MODERATION_BACKGROUND_THRESHOLD=1)
+    def test_large_selection_in_background(self) -> None:
+        '''Большая выборка обрабатывается фоновой задачей'''
+        self.act('post', 'delete_authors_posts', self.spam[:1])
+        self.assertEqual(Post.objects.count(), 4)
+        task = Task.objects.get(name='posts.tasks.delete_posts')
+        # Задаче передаются только id выборки.
+        self.assertEqual(
+            json.loads(task.payload)['args'],
+            [[post.pk for post in self.spam]],
+        )
+        tasks.work('test', burst=True)
+        self.assertEqual(list(Post.objects.all()), [self.post])
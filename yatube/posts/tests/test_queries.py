@@ -0,0 +1,185 @@
+import logging
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.template.loader import get_template
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core.queries import QueryBudgetExceeded, QueryInspector
+from posts import views
+from posts.models import Comment, Follow, Group, Post
+from yatube.settings import POSTS_COUNT
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(
+    QUERY_INSPECTION_ENABLED=True,
+    QUERY_INSPECTION_RAISE=True,
+    MEDIA_ROOT=TEMP_MEDIA_ROOT,
+)
+class QueryBudgetTests(TestCase):
+    '''Страницы укладываются в объявленный бюджет SQL-запросов
+       и не делают запросов на каждый пост'''
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+        )
+        cls.user = User.objects.create_user(username='TestUser')
+        User.objects.bulk_create(
+            User(username=f'author{i}') for i in range(POSTS_COUNT)
+        )
+        authors = User.objects.filter(username__startswith='author')
+        Post.objects.bulk_create(
+            Post(text=f'Тестовый пост №{i}', author=author, group=cls.group)
+            for i, author in enumerate(authors)
+        )
+        Follow.objects.bulk_create(
+            Follow(user=cls.user, author=author) for author in authors
+        )
+        Post.objects.bulk_create(
+            Post(text=f'Пост автора №{i}', author=cls.user, group=cls.group)
+            for i in range(POSTS_COUNT)
+        )
+        cls.post = Post.objects.filter(author=cls.user).first()
+        Comment.objects.bulk_create(
+            Comment(text='Тестовый комментарий', post=cls.post, author=author)
+            for author in authors
+        )
+        cls.authorized_client = Client()
+        cls.authorized_client.force_login(cls.user)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def test_feeds_fit_query_budget(self) -> None:
+        '''Ленты не превышают бюджет запросов'''
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', args=[self.group.slug]),
+            reverse('posts:follow_index'),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.authorized_client.get(url)
+                self.assertEqual(
+                    len(response.context['page_obj']), POSTS_COUNT
+                )
+
+    def test_profile_fits_query_budget(self) -> None:
+        '''Профиль укладывается в бюджет и верно показывает подписку'''
+        author = User.objects.get(username='author0')
+        urls = {
+            reverse('posts:profile', args=[self.user.username]): False,
+            reverse('posts:profile', args=[author.username]): True,
+        }
+        for url, following in urls.items():
+            with self.subTest(url=url):
+                response = self.authorized_client.get(url)
+                self.assertEqual(response.context['following'], following)
+        response = self.authorized_client.get(
+            reverse('posts:profile', args=[self.user.username])
+        )
+        self.assertEqual(response.context['count'], POSTS_COUNT)
+
+    def test_post_detail_fits_query_budget(self) -> None:
+        '''Страница поста укладывается в бюджет'''
+        for client in (self.client, self.authorized_client):
+            with self.subTest(client=client):
+                response = client.get(
+                    reverse('posts:post_detail', args=[self.post.pk])
+                )
+                self.assertEqual(
+                    response.context['post'].author_posts_count,
+                    POSTS_COUNT,
+                )
+                self.assertEqual(
+                    len(response.context['comments']), POSTS_COUNT
+                )
+
+    def test_image_post_fits_query_budget(self) -> None:
+        '''Страницы с картинкой, миниатюры которой ещё нет в кэше,
+           укладываются в бюджет и для авторизованного пользователя'''
+        author = User.objects.get(username='author0')
+        post = Post.objects.create(
+            text='Пост с картинкой',
+            author=author,
+            group=self.group,
+            image=SimpleUploadedFile(
+                name='small.gif',
+                content=(
+                    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+                    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+                    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+                    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+                    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+                    b'\x0A\x00\x3B'
+                ),
+                content_type='image/gif',
+            ),
+        )
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', args=[self.group.slug]),
+            reverse('posts:search') + '?q=картинкой',
+            reverse('posts:profile', args=[author.username]),
+            reverse('posts:post_detail', args=[post.pk]),
+            reverse('posts:follow_index'),
+            reverse('api:index'),
+            reverse('api:group_list', args=[self.group.slug]),
+            reverse('api:profile', args=[author.username]),
+            reverse('api:follow_index'),
+            reverse('api:post_detail', args=[post.pk]),
+            reverse('api:post_detail', args=[0]),
+            reverse('api:post_comments', args=[post.pk]),
+            reverse('api:post_comments', args=[0]),
+        )
+        for client in (self.client, self.authorized_client):
+            for url in urls:
+                with self.subTest(url=url, client=client):
+                    cache.clear()
+                    response = client.get(url)
+                    self.assertLess(response.status_code, 500)
+
+    def test_budget_violation_fails(self) -> None:
+        '''Превышение бюджета приводит к ошибке'''
+        budget = views.index.query_budget
+        views.index.query_budget = 0
+        try:
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client.get(reverse('posts:index'))
+        finally:
+            views.index.query_budget = budget
+
+    def test_repeated_queries_point_to_template(self) -> None:
+        '''Повторяющиеся запросы указывают на строку шаблона'''
+        inspector = QueryInspector(logging.getLogger(__name__))
+        template = get_template('posts/includes/post.html')
+        with connection.execute_wrapper(inspector):
+            for post in Post.objects.all():
+                template.render({'post': post})
+        repeated = {
+            sql: locations
+            for sql, count, locations in inspector.repeated(POSTS_COUNT)
+        }
+        author_queries = [
+            locations for sql, locations in repeated.items()
+            if 'FROM "auth_user"' in sql
+        ]
+        self.assertEqual(author_queries, [['posts/includes/post.html:5']])
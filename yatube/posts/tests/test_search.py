@@ -0,0 +1,102 @@
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from posts import search
+from posts.models import Post
+from yatube.settings import POSTS_COUNT
+
+User = get_user_model()
+
+
+class StemmerTests(SimpleTestCase):
+    def test_word_forms_share_stem(self) -> None:
+        '''Формы одного слова приводятся к одной основе'''
+        forms = {
+            'подписк': ('подписка', 'подписки', 'подпиской'),
+            'красив': ('красивая', 'красивые', 'красивого'),
+            'чита': ('читал', 'читали', 'читала'),
+            'елк': ('ёлка', 'елки'),
+        }
+        for expected, words in forms.items():
+            for word in words:
+                with self.subTest(word=word):
+                    self.assertEqual(search.stem(word), expected)
+
+
+class SearchTests(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='TestUser')
+        cls.post = Post.objects.create(
+            text='Красивая подписка на журнал',
+            author=cls.user,
+        )
+        cls.other_post = Post.objects.create(
+            text='Совсем другой текст',
+            author=cls.user,
+        )
+
+    def test_search_by_word_form(self) -> None:
+        '''Пост находится по другой форме слова'''
+        self.assertEqual(list(search.search('подписки')), [self.post])
+        self.assertEqual(list(search.search('красивые подписки')), [self.post])
+        self.assertFalse(search.search('подписки другие').exists())
+        self.assertFalse(search.search('   ').exists())
+
+    def test_index_follows_post_changes(self) -> None:
+        '''Индекс обновляется при правке и удалении поста'''
+        other_post = Post.objects.get(pk=self.other_post.pk)
+        other_post.text = 'Подписка оформлена'
+        other_post.save()
+        self.assertEqual(search.search('подписка').count(), 2)
+        Post.objects.get(pk=self.post.pk).delete()
+        self.assertEqual(list(search.search('подписка')), [self.other_post])
+
+    def test_rebuild(self) -> None:
+        '''Пересборка индекса восстанавливает поиск'''
+        if not search.fts_supported():
+            self.skipTest('FTS5 недоступен')
+        search.drop_index()
+        search.create_index()
+        self.assertFalse(search.search('подписка').exists())
+        self.assertEqual(search.rebuild(), 2)
+        self.assertEqual(list(search.search('подписка')), [self.post])
+
+
+class SearchViewTests(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='admin'
+        )
+        cls.extra_posts = 3
+        Post.objects.bulk_create(
+            Post(text=f'Запись о поиске №{i}', author=cls.user)
+            for i in range(POSTS_COUNT + cls.extra_posts)
+        )
+        search.rebuild()
+
+    def test_search_page_paginated(self) -> None:
+        '''Результаты поиска разбиты на страницы, запрос сохраняется
+           в ссылках паджинатора'''
+        response = self.client.get(reverse('posts:search'), {'q': 'поиск'})
+        self.assertEqual(len(response.context['page_obj']), POSTS_COUNT)
+        self.assertContains(response, 'q=%D0%BF%D0%BE%D0%B8%D1%81%D0%BA&')
+        response = self.client.get(
+            reverse('posts:search'), {'q': 'поиск', 'page': 2}
+        )
+        self.assertEqual(len(response.context['page_obj']), self.extra_posts)
+
+    def test_admin_search_uses_index(self) -> None:
+        '''Поиск в админке находит посты по форме слова'''
+        self.client.force_login(self.user)
+        response = self.client.get(
+            reverse('admin:posts_post_changelist'), {'q': 'поиски'}
+        )
+        self.assertEqual(
+            response.context['cl'].result_count,
+            POSTS_COUNT + self.extra_posts,
+        )
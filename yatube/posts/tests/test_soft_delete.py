@@ -0,0 +1,138 @@
+import io
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from posts import export, moderation, search
+from posts.models import Comment, Follow, Post
+from yatube.settings import PURGE_AFTER_DAYS
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class SoftDeleteTests(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='TestAuthor')
+        cls.reader = User.objects.create_user(username='TestReader')
+        cls.admin = User.objects.create_superuser(
+            'TestAdmin', 'admin@example.com', 'password'
+        )
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.post = Post.objects.create(
+            text='Удаляемый пост',
+            author=self.author,
+            image=SimpleUploadedFile('small.gif', SMALL_GIF, 'image/gif'),
+        )
+        self.comment = Comment.objects.create(
+            text='Комментарий', post=self.post, author=self.reader
+        )
+        self.client.force_login(self.admin)
+
+    def test_delete_hides_post(self) -> None:
+        '''Удалённый пост скрыт из лент, страницы и поиска,
+           но остаётся в таблице'''
+        Post.objects.get(pk=self.post.pk).delete()
+        response = self.client.get(reverse('posts:index'))
+        self.assertNotIn(self.post, response.context['page_obj'])
+        response = self.client.get(
+            reverse('posts:post_detail', args=[self.post.pk])
+        )
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(search.search('удаляемый').exists())
+        self.assertTrue(Post.all_objects.get(pk=self.post.pk).is_deleted)
+
+    def test_comments_of_deleted_post_hidden(self) -> None:
+        '''Комментарии удалённого поста не отдаются страницей
+           комментариев, API и выгрузкой'''
+        Post.objects.get(pk=self.post.pk).delete()
+        self.assertTrue(Comment.all_objects.get().is_deleted)
+        for url in (
+            reverse('posts:post_comments', args=[self.post.pk]),
+            reverse('api:post_detail', args=[self.post.pk]),
+            reverse('api:post_comments', args=[self.post.pk]),
+        ):
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 404)
+        self.assertFalse(
+            [r for r in export.records() if r['model'] == 'comment']
+        )
+
+    def test_moderation_deletes_comments(self) -> None:
+        '''Массовое удаление постов помечает и их комментарии'''
+        moderation.delete_posts(Post.objects.filter(pk=self.post.pk))
+        self.assertFalse(Comment.objects.exists())
+        response = self.client.get(
+            reverse('api:post_comments', args=[self.post.pk])
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_admin_delete_selected(self) -> None:
+        '''«Удалить выбранные» в админке только помечает записи'''
+        self.client.post(reverse('admin:posts_comment_changelist'), {
+            'action': 'delete_selected',
+            '_selected_action': [self.comment.pk],
+            'post': 'yes',
+        })
+        self.assertFalse(Comment.objects.exists())
+        self.assertTrue(Comment.all_objects.get().is_deleted)
+
+    def test_purge_deleted(self) -> None:
+        '''Давно удалённые посты стираются вместе с комментариями
+           и картинкой, недавно удалённые — остаются'''
+        recent = Post.objects.create(text='Недавний', author=self.author)
+        Post.objects.get(pk=self.post.pk).delete()
+        recent.delete()
+        Post.all_objects.filter(pk=self.post.pk).update(
+            deleted_at=timezone.now() - timedelta(days=PURGE_AFTER_DAYS + 1)
+        )
+        path = os.path.join(TEMP_MEDIA_ROOT, self.post.image.name)
+        self.assertTrue(os.path.exists(path))
+        call_command('purge_deleted', stdout=io.StringIO())
+        self.assertEqual(list(Post.all_objects.all()), [recent])
+        self.assertFalse(Comment.all_objects.exists())
+        self.assertFalse(os.path.exists(path))
+
+    def test_delete_user(self) -> None:
+        '''Удаление пользователя блокирует его и помечает удалёнными
+           его посты; подписки удаляются'''
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.client.post(
+            reverse('admin:auth_user_delete', args=[self.author.pk]),
+            {'post': 'yes'},
+        )
+        self.author.refresh_from_db()
+        self.assertFalse(self.author.is_active)
+        self.assertFalse(Post.objects.exists())
+        self.assertTrue(Post.all_objects.exists())
+        self.assertFalse(Follow.objects.exists())
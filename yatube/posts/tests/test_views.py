@@ -324,6 +324,7 @@ class PaginatorViewsTest(TestCase):
                 Post(
                     text=f'Тестовый пост №{i}',
                     author=cls.user,
+                    group=cls.group,
                 )
                 for i in range(test_posts_count)
             ]
@@ -14,6 +14,11 @@ urlpatterns = [
         views.index,
         name='index'
     ),
+    path(
+        'search/',
+        views.search_posts,
+        name='search'
+    ),
     path(
         'profile/<str:username>/',
         views.profile,
@@ -39,6 +44,11 @@ urlpatterns = [
         views.access_denied,
         name='access_denied'
     ),
+    path(
+        'posts/<int:post_id>/comments/',
+        views.post_comments,
+        name='post_comments',
+    ),
     path(
         'posts/<int:post_id>/comment/',
         views.add_comment,
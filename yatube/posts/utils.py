@@ -1,6 +1,15 @@
+import base64
+import heapq
+import itertools
+
 from django.core.paginator import Paginator
-from yatube.settings import POSTS_COUNT
-from yatube.settings import POSTS_COUNT
+from django.db import connections
+from django.db.models import Q, QuerySet
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+from yatube.settings import (
+    COMMENTS_COUNT, ESTIMATED_COUNT_THRESHOLD, POSTS_COUNT
+)
 
 
 def paginator(request, posts):
@@ -8,3 +17,186 @@ def paginator(request, posts):
     paginator = Paginator(posts, POSTS_COUNT)
     page_number = request.GET.get('page')
     return paginator.get_page(page_number)
+
+
+def comments_page(comments, after=None):
+    '''Страница комментариев, следующих за комментарием с id after.
+
+    Возвращает комментарии и курсор следующей страницы (None, если
+    страница последняя). Курсор по первичному ключу не требует
+    подсчёта всех комментариев и не замедляется на дальних страницах.
+    '''
+    if after is not None:
+        comments = comments.filter(id__gt=after)
+    page = list(comments.order_by('id')[:COMMENTS_COUNT + 1])
+    if len(page) <= COMMENTS_COUNT:
+        return page, None
+    last = page[COMMENTS_COUNT - 1]
+    cursor = last['id'] if isinstance(last, dict) else last.id
+    return page[:COMMENTS_COUNT], cursor
+
+
+class MergedQuerySets:
+    '''Несколько запросов, упорядоченных по убыванию order_by, как одна
+       последовательность для Paginator.
+
+    Для среза [start:stop] из каждого запроса берутся первые stop
+    записей и сливаются в общем порядке, так что дальние страницы
+    дороже ближних.
+    '''
+
+    def __init__(self, *querysets, order_by=('-pub_date', '-pk')):
+        self.querysets = [
+            queryset.order_by(*order_by) for queryset in querysets
+        ]
+        self.fields = [field.lstrip('-') for field in order_by]
+
+    @cached_property
+    def counts(self):
+        return [queryset.count() for queryset in self.querysets]
+
+    def count(self):
+        return sum(self.counts)
+
+    def __len__(self):
+        return self.count()
+
+    def sort_key(self, obj):
+        return tuple(getattr(obj, field) for field in self.fields)
+
+    def __getitem__(self, key):
+        start, stop = key.start or 0, key.stop
+        if stop is None:
+            stop = self.count()
+        merged = heapq.merge(
+            *(
+                queryset[:stop]
+                for queryset, count in zip(self.querysets, self.counts)
+                if count
+            ),
+            key=self.sort_key,
+            reverse=True,
+        )
+        return list(itertools.islice(merged, start, stop))
+
+
+def encode_cursor(pub_date, post_id):
+    raw = f'{pub_date.isoformat()}|{post_id}'
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    '''Дата и id последнего поста предыдущей страницы.
+
+    Для испорченного курсора выбрасывает ValueError.
+    '''
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        pub_date, post_id = raw.rsplit('|', 1)
+        pub_date = parse_datetime(pub_date)
+    except (ValueError, UnicodeError):
+        raise ValueError('Неверный курсор')
+    if pub_date is None:
+        raise ValueError('Неверный курсор')
+    return pub_date, int(post_id)
+
+
+def posts_page(posts, after=None, limit=POSTS_COUNT):
+    '''Страница ленты после поста after = (pub_date, id), новые
+       посты первыми.
+
+    posts — запрос словарей с полями id и pub_date или список таких
+    запросов (например, живые и архивные посты): страницы запросов
+    сливаются по дате. Возвращает посты и курсор следующей страницы
+    (None, если страница последняя). Курсор по паре (pub_date, id)
+    однозначен даже для постов с одинаковой датой.
+    '''
+    if isinstance(posts, QuerySet):
+        posts = [posts]
+    pages = []
+    for queryset in posts:
+        queryset = queryset.order_by('-pub_date', '-id')
+        if after is not None:
+            pub_date, post_id = after
+            queryset = queryset.filter(
+                Q(pub_date__lt=pub_date)
+                | Q(pub_date=pub_date, id__lt=post_id)
+            )
+        pages.append(queryset[:limit + 1])
+    page = list(itertools.islice(
+        heapq.merge(
+            *pages,
+            key=lambda row: (row['pub_date'], row['id']),
+            reverse=True,
+        ),
+        limit + 1,
+    ))
+    if len(page) <= limit:
+        return page, None
+    last = page[limit - 1]
+    return page[:limit], encode_cursor(last['pub_date'], last['id'])
+
+
+def _where(queryset):
+    query = queryset.query
+    return query.get_compiler(queryset.db).compile(query.where)
+
+
+def estimated_count(queryset):
+    '''Оценка числа строк таблицы по статистике базы без COUNT(*).
+
+    Возвращает None, если оценить нельзя: запрос с условиями или
+    заведомо пустой, неизвестная база или SQLite без собранной
+    ANALYZE статистики.
+    Условие менеджера по умолчанию (скрытие удалённых записей)
+    условием не считается: помеченных строк мало.
+    '''
+    if not isinstance(queryset, QuerySet) or queryset.query.is_empty():
+        # Условие пустого запроса (none()) не компилируется.
+        return None
+    if _where(queryset) != _where(queryset.model._default_manager.all()):
+        return None
+    connection = connections[queryset.db]
+    opts = queryset.model._meta
+    if connection.vendor == 'postgresql':
+        sql = 'SELECT reltuples::bigint FROM pg_class WHERE relname = %s'
+        params = [opts.db_table]
+    elif connection.vendor == 'mysql':
+        sql = (
+            'SELECT table_rows FROM information_schema.tables '
+            'WHERE table_schema = DATABASE() AND table_name = %s'
+        )
+        params = [opts.db_table]
+    elif connection.vendor == 'sqlite':
+        # Число строк записывает ANALYZE в sqlite_stat1 первым числом
+        # поля stat. Без статистики оценки нет — считается COUNT(*).
+        # Максимальный ключ не годится: после архивации и очистки
+        # он сильно завышает число строк.
+        if 'sqlite_stat1' not in connection.introspection.table_names():
+            return None
+        sql = 'SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1'
+        params = [opts.db_table]
+    else:
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        row = cursor.fetchone()
+    if not row or row[0] is None:
+        return None
+    if connection.vendor == 'sqlite':
+        return int(row[0].split()[0])
+    return row[0]
+
+
+class EstimatedCountPaginator(Paginator):
+    '''Паджинатор для больших таблиц: число записей без фильтров
+       берётся из статистики базы, точный COUNT(*) — только для
+       небольших таблиц и отфильтрованных запросов'''
+    threshold = ESTIMATED_COUNT_THRESHOLD
+
+    @cached_property
+    def count(self):
+        estimate = estimated_count(self.object_list)
+        if estimate is None or estimate < self.threshold:
+            return super().count
+        return estimate
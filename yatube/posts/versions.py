@@ -0,0 +1,142 @@
+"""Версии лент для условных GET-запросов.
+
+Версия ленты — момент её последнего изменения. Версии хранятся
+в кэше и обновляются сигналами при записи постов, комментариев,
+групп и подписок, поэтому ETag и Last-Modified вычисляются без
+запроса списка постов и без рендеринга шаблона.
+"""
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.http import http_date
+from django.views.decorators.http import condition
+
+from .models import ArchivedPost, Post
+
+
+def index_key():
+    return 'feed:index'
+
+
+def group_key(slug):
+    return f'feed:group:{slug}'
+
+
+def profile_key(username):
+    return f'feed:profile:{username}'
+
+
+def post_key(post_id):
+    return f'feed:post:{post_id}'
+
+
+def post_author_key(post_id):
+    return f'post_author:{post_id}'
+
+
+def post_detail_keys(post_id):
+    '''Страница поста зависит и от профиля автора:
+       на ней выводится число его постов'''
+    author_key = post_author_key(post_id)
+    username = cache.get(author_key)
+    if username is None:
+        username = Post.objects.filter(pk=post_id).values_list(
+            'author__username', flat=True
+        ).first() or ArchivedPost.objects.filter(pk=post_id).values_list(
+            'author__username', flat=True
+        ).first()
+        cache.set(author_key, username, None)
+    return post_key(post_id), profile_key(username)
+
+
+def touch(*keys):
+    '''Отмечает ленты изменёнными'''
+    now = timezone.now()
+    cache.set_many(
+        {key: now for key in keys},
+        settings.FEED_VERSION_TIMEOUT,
+    )
+
+
+def get_version(*keys):
+    '''Самая поздняя версия из версий лент keys'''
+    versions = cache.get_many(keys)
+    missing = [key for key in keys if key not in versions]
+    if missing:
+        # Версии неизвестны (холодный кэш): считаем ленты изменёнными
+        # сейчас, клиенты один раз получат полный ответ.
+        now = timezone.now()
+        for key in missing:
+            cache.add(key, now, settings.FEED_VERSION_TIMEOUT)
+        versions.update(cache.get_many(missing))
+    return max(versions.values())
+
+
+def _as_tuple(keys):
+    return keys if isinstance(keys, tuple) else (keys,)
+
+
+def _etag_func(keys_func):
+    def etag(request, *args, **kwargs):
+        keys = _as_tuple(keys_func(*args, **kwargs))
+        version = get_version(*keys)
+        raw = ':'.join((
+            *keys,
+            version.isoformat(),
+            request.GET.urlencode(),
+            str(request.user.pk),
+        ))
+        return hashlib.md5(raw.encode()).hexdigest()
+    return etag
+
+
+def _last_modified_func(keys_func):
+    def last_modified(request, *args, **kwargs):
+        # Страницы авторизованных пользователей персональны,
+        # для них достаточно ETag.
+        if request.user.is_authenticated:
+            return None
+        return get_version(*_as_tuple(keys_func(*args, **kwargs)))
+    return last_modified
+
+
+def conditional(keys_func):
+    '''Отвечает 304, если версия ленты не изменилась с прошлого запроса.
+
+    keys_func получает аргументы view и возвращает ключ версии ленты
+    (или кортеж ключей).
+    '''
+    return condition(
+        etag_func=_etag_func(keys_func),
+        last_modified_func=_last_modified_func(keys_func),
+    )
+
+
+def stamp(keys_func):
+    '''Проставляет ETag и Last-Modified, вычисленные до вызова view.
+
+    Нужен под cache_page: закэшированный ответ хранит заголовки той
+    версии, по которой он был построен.
+    '''
+    etag_func = _etag_func(keys_func)
+    last_modified_func = _last_modified_func(keys_func)
+
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            etag = etag_func(request, *args, **kwargs)
+            last_modified = last_modified_func(request, *args, **kwargs)
+            response = view_func(request, *args, **kwargs)
+            if response.status_code == 200:
+                response.setdefault('ETag', f'"{etag}"')
+                if last_modified:
+                    response.setdefault(
+                        'Last-Modified',
+                        http_date(last_modified.timestamp()),
+                    )
+            return response
+        return wrapper
+    return decorator
@@ -1,14 +1,28 @@
 from django.contrib.auth.decorators import login_required
-from .utils import paginator
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.http import Http404, JsonResponse
+from .utils import MergedQuerySets, comments_page, paginator
 from django.views.decorators.cache import cache_page
 from django.shortcuts import render, get_object_or_404, redirect
-from .models import Post, Group, Follow, User
+from .models import (
+    ArchivedComment, ArchivedPost, Post, Group, User, Comment
+)
 from .forms import PostForm, CommentForm
+from . import follows, search, versions
+from core import metrics
+from core.breaker import degrade
+from core.queries import query_budget
+from core.ratelimit import ratelimit
 
 
+@query_budget(5)
+@degrade('index')
+@versions.conditional(versions.index_key)
 @cache_page(20, key_prefix='index_page')
+@versions.stamp(versions.index_key)
 def index(request):
-    posts = Post.objects.all()
+    posts = Post.objects.select_related('author', 'group')
     template = 'posts/index.html'
     page_obj = paginator(request=request, posts=posts)
     context = {
@@ -17,10 +31,13 @@ def index(request):
     return render(request, template, context)
 
 
+@query_budget(6)
+@degrade('group_posts')
+@versions.conditional(versions.group_key)
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
     template = 'posts/group_list.html'
-    posts = Post.objects.all()
+    posts = group.posts.select_related('author')
     page_obj = paginator(request=request, posts=posts)
     context = {
         'group': group,
@@ -29,44 +46,130 @@ def group_posts(request, slug):
     return render(request, template, context)
 
 
+@query_budget(5)
+def search_posts(request):
+    query = request.GET.get('q', '').strip()
+    posts = search.search(query, Post.objects.select_related(
+        'author', 'group'
+    ))
+    template = 'posts/search.html'
+    page_obj = paginator(request=request, posts=posts)
+    context = {
+        'page_obj': page_obj,
+        'query': query,
+    }
+    return render(request, template, context)
+
+
+@query_budget(9)
+@versions.conditional(versions.profile_key)
 def profile(request, username):
     author = get_object_or_404(User, username=username)
-    following = True
-    if request.user.is_authenticated:
-        following = Follow.objects.filter(
-            user=request.user,
-            author=author,
-        ).exists
+    following = follows.is_following(request.user, author)
     template = 'posts/profile.html'
-    page_obj = paginator(request=request, posts=author.posts.all())
-    posts = author.posts.all()
-    count = posts.count()
+    # Импортированные посты бывают старше архивных, поэтому
+    # страница собирается слиянием по дате.
+    page_obj = paginator(
+        request=request,
+        posts=MergedQuerySets(
+            author.posts.select_related('group'),
+            author.archived_posts.select_related('group'),
+        ),
+    )
     context = {
         'page_obj': page_obj,
         'author': author,
-        'count': count,
+        'count': page_obj.paginator.count,
         'following': following,
+        'followers_count': follows.followers_count(author.pk),
     }
     return render(request, template, context)
 
 
+def _author_posts_count():
+    '''Число постов автора поста, включая архивные'''
+    hot, archived = (
+        model.objects.filter(author=OuterRef('author')).order_by().values(
+            'author'
+        ).annotate(count=Count('pk')).values('count')
+        for model in (Post, ArchivedPost)
+    )
+    return sum(
+        Coalesce(Subquery(query, output_field=IntegerField()), 0)
+        for query in (hot, archived)
+    )
+
+
+@query_budget(6)
+@versions.conditional(versions.post_detail_keys)
 def post_detail(request, post_id):
     template = 'posts/post_detail.html'
-    post = get_object_or_404(Post, id=post_id)
-    all_posts = Post.objects.all()
-    counter = all_posts.count()
+    post = Post.objects.select_related('author', 'group').annotate(
+        author_posts_count=_author_posts_count()
+    ).filter(id=post_id).first()
+    archived = post is None
+    if archived:
+        post = get_object_or_404(
+            ArchivedPost.objects.select_related('author', 'group').annotate(
+                author_posts_count=_author_posts_count()
+            ),
+            id=post_id,
+        )
     form = CommentForm()
-    comments = post.comments.all()
+    comments, next_cursor = comments_page(
+        post.comments.select_related('author')
+    )
     context = {
         'post': post,
-        'counter': counter,
         'form': form,
         'comments': comments,
+        'next_cursor': next_cursor,
+        'archived': archived,
     }
     return render(request, template, context)
 
 
+@versions.conditional(versions.post_key)
+def post_comments(request, post_id):
+    '''Следующая страница комментариев: HTML-фрагмент
+       или JSON при ?format=json'''
+    try:
+        after = int(request.GET.get('after', 0))
+    except ValueError:
+        raise Http404
+    as_json = request.GET.get('format') == 'json'
+
+    def page(model):
+        comments = model.objects.filter(post_id=post_id)
+        if as_json:
+            comments = comments.values(
+                'id', 'text', 'created', 'author__username'
+            )
+        else:
+            comments = comments.select_related('author')
+        return comments_page(comments, after)
+
+    comments, next_cursor = page(Comment)
+    if not comments:
+        # Пустая страница — возможно, пост уже в архиве или удалён.
+        comments, next_cursor = page(ArchivedComment)
+        if not comments and not (
+            Post.objects.filter(pk=post_id).exists()
+            or ArchivedPost.objects.filter(pk=post_id).exists()
+        ):
+            raise Http404
+    if as_json:
+        return JsonResponse({'comments': comments, 'next': next_cursor})
+    context = {
+        'post_id': post_id,
+        'comments': comments,
+        'next_cursor': next_cursor,
+    }
+    return render(request, 'posts/includes/comment_list.html', context)
+
+
 @login_required
+@ratelimit('post_create')
 def post_create(request):
     template = 'posts/create_post.html'
     form = PostForm()
@@ -78,6 +181,8 @@ def post_create(request):
         files=request.FILES or None,
     )
     if form.is_valid():
+        if 'image' in request.FILES:
+            metrics.IMAGE_UPLOAD_BYTES.observe(request.FILES['image'].size)
         post = form.save(commit=False)
         post.author = request.user
         post.save()
@@ -102,6 +207,8 @@ def post_edit(request, post_id):
     if post.author != request.user:
         return redirect('posts:access_denied')
     if form.is_valid():
+        if 'image' in request.FILES:
+            metrics.IMAGE_UPLOAD_BYTES.observe(request.FILES['image'].size)
         form.save()
         return redirect('posts:post_detail', post_id)
     return render(request, template, context)
@@ -113,6 +220,7 @@ def access_denied(request):
 
 
 @login_required
+@ratelimit('add_comment')
 def add_comment(request, post_id):
     post = get_object_or_404(Post, id=post_id)
     form = CommentForm(request.POST or None)
@@ -125,9 +233,14 @@ def add_comment(request, post_id):
     return redirect('posts:post_detail', post_id=post_id)
 
 
+@query_budget(5)
 @login_required
 def follow_index(request):
-    posts = Post.objects.filter(author__following__user=request.user).all()
+    # Соединение с Follow вместо списка id из кэша: запрос не растёт
+    # с числом подписок и не зависит от устаревшего кэша.
+    posts = Post.objects.filter(
+        author__following__user=request.user
+    ).select_related('author', 'group')
     template = 'posts/follow.html'
     page_obj = paginator(request=request, posts=posts)
     context = {
@@ -137,25 +250,15 @@ def follow_index(request):
 
 
 @login_required
+@ratelimit('profile_follow', methods=('GET', 'POST'))
 def profile_follow(request, username):
     author = get_object_or_404(User, username=username)
-    user = request.user
-    if author == user:
-        return redirect('posts:profile', username=username)
-    if Follow.objects.filter(author=author).exists():
-        return redirect('posts:profile', username=username)
-    Follow.objects.create(
-        author=author,
-        user=user
-    )
+    follows.follow(request.user, author)
     return redirect('posts:profile', username=username)
 
 
 @login_required
 def profile_unfollow(request, username):
-    user = request.user
-    Follow.objects.filter(
-        user=user,
-        author__username=username
-    ).delete()
+    author = get_object_or_404(User, username=username)
+    follows.unfollow(request.user, author)
     return redirect('posts:profile', username=username)
@@ -0,0 +1,23 @@
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.contrib.auth.admin import UserAdmin
+
+from posts import moderation
+
+User = get_user_model()
+
+
+class SoftDeleteUserAdmin(UserAdmin):
+    '''Удаление пользователя блокирует его и помечает удалёнными
+       его посты и комментарии (см. posts.moderation)'''
+
+    def delete_model(self, request, obj):
+        moderation.delete_user_content(obj)
+
+    def delete_queryset(self, request, queryset):
+        for user in queryset:
+            moderation.delete_user_content(user)
+
+
+admin.site.unregister(User)
+admin.site.register(User, SoftDeleteUserAdmin)
@@ -0,0 +1,4 @@
+from core.asgi import WsgiToAsgi
+from yatube.wsgi import application as wsgi_application
+
+application = WsgiToAsgi(wsgi_application)
@@ -1,4 +1,5 @@
 import os
+import sys
 
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -13,6 +14,9 @@ SECRET_KEY = 'q0fjzi%$om(5+@_efh0rsae&*h(+o%qgc6o)8bx((das8eci#8'
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = True
 
+# manage.py test: логи проекта и выборка таймингов отключены.
+TESTING = sys.argv[1:2] == ['test']
+
 ALLOWED_HOSTS = [
     'localhost',
     '127.0.0.1',
@@ -35,10 +39,12 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'sorl.thumbnail',
-    'debug_toolbar',
 ]
 
 MIDDLEWARE = [
+    'core.middleware.PerformanceMiddleware',
+    'core.middleware.QueryInspectionMiddleware',
+    'core.middleware.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -46,21 +52,39 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'debug_toolbar.middleware.DebugToolbarMiddleware',
 ]
 
+# Панель отладки загружается только при разработке: её импорт
+# заметно замедляет запуск воркера.
+if DEBUG:
+    INSTALLED_APPS.append('debug_toolbar')
+    MIDDLEWARE.append('debug_toolbar.middleware.DebugToolbarMiddleware')
+
 INTERNAL_IPS = [
     '127.0.0.1',
 ]
 
+# Шаблоны приложений грузит core.loaders.AppDirectoriesLoader,
+# APP_DIRS для этого не нужен.
+SILENCED_SYSTEM_CHECKS = ['debug_toolbar.W006']
+
 ROOT_URLCONF = 'yatube.urls'
 
+# Загрузчики убирают отступы из шаблонов при загрузке; вне DEBUG
+# скомпилированные шаблоны кэшируются.
+TEMPLATE_LOADERS = [
+    'core.loaders.FilesystemLoader',
+    'core.loaders.AppDirectoriesLoader',
+]
+
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'core.template_backends.TimedDjangoTemplates',
         'DIRS': [os.path.join(BASE_DIR, 'templates')],
-        'APP_DIRS': True,
         'OPTIONS': {
+            'loaders': TEMPLATE_LOADERS if DEBUG else [
+                ('django.template.loaders.cached.Loader', TEMPLATE_LOADERS),
+            ],
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -73,6 +97,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'yatube.wsgi.application'
+ASGI_THREADS = 16  # Потоков для запросов при запуске через yatube.asgi
 
 
 # Database
@@ -126,6 +151,14 @@ STATIC_URL = '/static/'
 
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
 
+STATIC_ROOT = os.path.join(BASE_DIR, 'collected_static')
+
+# collectstatic добавляет хэш содержимого к именам и сжимает файлы.
+STATICFILES_STORAGE = 'core.static.CompressedManifestStaticFilesStorage'
+
+# Раздавать статику из STATIC_ROOT самим Django (без фронт-сервера).
+SERVE_STATIC = False
+
 LOGIN_URL = 'users:login'
 
 LOGIN_REDIRECT_URL = 'posts:index'
@@ -136,6 +169,13 @@ EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
 POSTS_COUNT = 10  # Кол-во выводимых постов
 
+COMMENTS_COUNT = 20  # Кол-во комментариев на одной странице
+
+API_MAX_LIMIT = 100  # Наибольший размер страницы API (?limit=)
+
+# С какого числа записей админка показывает оценку вместо COUNT(*)
+ESTIMATED_COUNT_THRESHOLD = 10000
+
 CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
 
 # Static files (CSS, JavaScript, Images)
@@ -143,9 +183,106 @@ CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+# Раздача MEDIA_ROOT через core.media.serve; отключается, если файлы
+# отдаёт фронт-сервер напрямую.
+SERVE_MEDIA = True
+# Кто отдаёт сам файл: None — Django (FileResponse), 'x-accel-redirect'
+# — nginx с internal location MEDIA_ACCEL_PREFIX, 'x-sendfile' —
+# Apache mod_xsendfile или lighttpd.
+MEDIA_ACCEL = None
+MEDIA_ACCEL_PREFIX = '/protected-media/'
+MEDIA_CACHE_MAX_AGE = 60 * 60 * 24 * 30  # Секунды кэширования в браузере
 
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'BACKEND': 'core.cache.InstrumentedLocMemCache',
     }
 }
+
+THUMBNAIL_BACKEND = 'core.thumbnails.TimedThumbnailBackend'
+
+# Доля запросов, для которых пишется тайминг
+PERFORMANCE_SAMPLE_RATE = 0 if TESTING else 0.05
+
+# При METRICS_SAMPLE_RATE = 1 замеряется каждый запрос: каждый
+# SQL-запрос, шаблон и обращение к кэшу проходят через обёртку
+# (единицы микросекунд на вызов). При большой нагрузке долю можно
+# снизить — счётчики тогда покрывают только замеренные запросы.
+METRICS_ENABLED = True
+METRICS_SAMPLE_RATE = 1.0  # Доля запросов, попадающих в метрики view
+# Токен Prometheus (Authorization: Bearer <токен>) для /metrics/
+# с адресов не из INTERNAL_IPS.
+METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+# Общий каталог для снимков метрик воркеров; без него метрики
+# отдаются только по текущему процессу.
+METRICS_DIR = os.getenv('METRICS_DIR')
+METRICS_FLUSH_INTERVAL = 5  # Секунды между сбросами снимка на диск
+
+QUERY_INSPECTION_ENABLED = DEBUG
+QUERY_INSPECTION_RAISE = False  # Включается в тестах бюджетов запросов
+SLOW_QUERY_MS = 100
+N_PLUS_ONE_THRESHOLD = 5  # Сколько одинаковых запросов считать N+1
+
+# Срок жизни версий лент (ETag/Last-Modified). С общим кэшем можно
+# хранить бессрочно (None); с LocMem у каждого воркера свои версии,
+# и срок ограничивает устаревание.
+FEED_VERSION_TIMEOUT = 300
+
+# Предохранитель лент при перегрузке базы (core.breaker)
+BREAKER_FAILURES = 5  # Сколько неудачных запросов подряд размыкают его
+BREAKER_SLOW_SECONDS = 2  # Запрос дольше считается неудачным
+BREAKER_RESET_SECONDS = 30  # Сколько отдавать копии до пробного запроса
+FEED_STALE_TIMEOUT = 10 * 60  # Сколько хранить копию удачной страницы
+FEED_STALE_REFRESH_SECONDS = 30  # Как часто обновлять эту копию
+
+FOLLOW_GRAPH_TIMEOUT = 60 * 60  # Срок жизни подписок и счётчиков в кэше
+
+# Ограничение частоты запросов (core.ratelimit): имя -> (запросов, секунд).
+# Пустое значение снимает ограничение.
+RATELIMITS = {
+    'post_create': (10, 60 * 60),
+    'add_comment': (30, 10 * 60),
+    'profile_follow': (60, 60 * 60),
+}
+
+# Прогрев после запуска (core.warmup, manage.py warmup)
+WARMUP_ON_STARTUP = False  # Прогревать кэш каждого воркера при старте
+WARMUP_PAGES = 5  # Первые страницы главной
+WARMUP_GROUPS = 10  # Группы с наибольшим числом постов
+WARMUP_PROFILES = 10  # Профили с наибольшим числом подписчиков
+WARMUP_THUMBNAILS = 200  # Миниатюры свежих постов
+WARMUP_WORKERS = 4  # Потоков прогрева
+
+ARCHIVE_AFTER_DAYS = 365  # Посты старше переносятся в архив
+
+# Массовые действия в админке (posts.moderation)
+MODERATION_BATCH_SIZE = 1000  # Записей в одном UPDATE/DELETE
+MODERATION_BACKGROUND_THRESHOLD = 10000  # С какого объёма — в фоне
+PURGE_AFTER_DAYS = 7  # Через сколько дней удалённое стирается из базы
+
+# Фоновые задачи (core.tasks, manage.py runworker)
+TASKS_ALWAYS_EAGER = False  # Выполнять задачи сразу, без очереди
+TASKS_POLL_INTERVAL = 1  # Секунды между опросами пустой очереди
+TASKS_RETRY_DELAY = 10  # Задержка перед первым повтором, секунды
+TASKS_LOCK_TIMEOUT = 10 * 60  # Через сколько считать задачу зависшей
+TASKS_KEEP_DONE_DAYS = 1  # Сколько дней хранить выполненные задачи
+
+COMPRESSION_MIN_SIZE = 1024  # Ответы меньше этого размера не сжимаются
+BROTLI_QUALITY = 5
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'yatube': {
+            'handlers': ['console'],
+            # Тесты, проверяющие логи, перехватывают их assertLogs.
+            'level': 'CRITICAL' if TESTING else 'INFO',
+        },
+    },
+}
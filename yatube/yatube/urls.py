@@ -1,7 +1,9 @@
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from django.conf import settings
-from django.conf.urls.static import static
+
+from core import media, static as static_files
+from core.views import metrics
 
 handler404 = 'core.views.page_not_found'
 handler403 = 'core.views.permission_denied_view'
@@ -9,14 +11,27 @@ handler500 = 'core.views.internal_server_error'
 
 urlpatterns = [
     path('', include('posts.urls', namespace='posts')),
+    path('api/v1/', include('posts.api_urls', namespace='api')),
     path('auth/', include('users.urls', namespace='auth')),
     path('auth/', include('django.contrib.auth.urls')),
     path('admin/', admin.site.urls),
     path('about/', include('about.urls', namespace='about')),
+    path('metrics/', metrics, name='metrics'),
 ]
+if settings.SERVE_STATIC:
+    urlpatterns += (
+        re_path(
+            r'^{}(?P<path>.*)$'.format(settings.STATIC_URL.lstrip('/')),
+            static_files.serve,
+        ),
+    )
+if settings.SERVE_MEDIA:
+    urlpatterns += (
+        re_path(
+            r'^{}(?P<path>.*)$'.format(settings.MEDIA_URL.lstrip('/')),
+            media.serve,
+        ),
+    )
 if settings.DEBUG:
     import debug_toolbar
     urlpatterns += (path('__debug__/', include(debug_toolbar.urls)),)
-    urlpatterns += static(
-        settings.MEDIA_URL, document_root=settings.MEDIA_ROOT
-    )
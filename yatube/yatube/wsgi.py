@@ -1,7 +1,19 @@
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
+from core.startup import load_static_manifest, populate_url_resolvers
+
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
 
 application = get_wsgi_application()
+
+# URLconf, views и манифест статики загружаются при старте воркера,
+# а не на первом запросе.
+populate_url_resolvers()
+load_static_manifest()
+
+if settings.WARMUP_ON_STARTUP:
+    from core.warmup import warm_up_in_background
+    warm_up_in_background()